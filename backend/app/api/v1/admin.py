@@ -3,28 +3,42 @@ Administration endpoints — background generator + email config
 backend/app/api/v1/admin.py
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
 import random
 import time
 from threading import Thread
 
-from app.db.session import SessionLocal
-from app.models.incident import Incident
-from app.services.anomaly_detector import AnomalyDetector
-from app.services.incident_manager import IncidentManager
+from app.services.incident_manager import IncidentManager, SOURCE_NAMES, reload_severity_thresholds
 from app.services.storage import IncidentStorage
+from app.services.synthetic_data import TYPE_GENERATORS
+from app.services.backfill import BackfillJob
+from app.services.scoring_engine import get_scoring_engine
+from app.services.rate_limiter import admission_controller
+from app.services.correlation import correlation_engine
+from app.services.detectors import DETECTOR_BACKENDS, detector_registry
+from app.services.explainer import explainer
+from app.services.kpi_counters import kpi_counters
+from app.services.purge import PurgeBusy, purge_job
 from app.services.notifications.notification_service import NotificationService
 from app.services.notifications.email_notifier import EmailNotifier
 from app.services.notifications.slack_notifier import SlackNotifier
+from app.services.notifications.rules import alert_rules, normalize_rule
+from app.services.profiler import ProfilerBusy, profiler
 from app.core import runtime_config
+from app.core.scheduler import scheduler
 from app.core.config import get_settings
+from app.core.http_cache import conditional_json
+from app.core.security import require_admin
 
 router = APIRouter()
-detector = AnomalyDetector()
 incident_manager = IncidentManager()
 storage = IncidentStorage()
+backfill_job = BackfillJob(get_scoring_engine(), incident_manager)
 
 # Build notification service (same logic as ingest.py)
 def _build_notifier() -> NotificationService:
@@ -66,143 +80,6 @@ generator_state = {
 }
 
 
-# ---------------------------------------------------------------------------
-# Realistic per-type data generators
-# Each returns (source: str, values: dict) with 4 numeric features.
-# "Normal" values are tight clusters; "anomaly" values are clear outliers.
-# ---------------------------------------------------------------------------
-
-def _payment(anomaly: bool):
-    if anomaly:
-        return "sensor-payment", {
-            "amount":           round(random.uniform(3000, 50000), 2),
-            "response_time_ms": random.randint(2000, 8000),
-            "failed_attempts":  random.randint(3, 10),
-            "num_items":        random.randint(1, 3),
-        }
-    return "sensor-payment", {
-        "amount":           round(random.uniform(5, 500), 2),
-        "response_time_ms": random.randint(80, 500),
-        "failed_attempts":  0,
-        "num_items":        random.randint(1, 10),
-    }
-
-
-def _login(anomaly: bool):
-    if anomaly:
-        return "sensor-login", {
-            "attempt_count":     random.randint(10, 50),
-            "session_duration_s": random.randint(1, 5),
-            "failed_count_24h":  random.randint(5, 20),
-            "new_device":        1,
-        }
-    return "sensor-login", {
-        "attempt_count":     1,
-        "session_duration_s": random.randint(120, 3600),
-        "failed_count_24h":  random.randint(0, 1),
-        "new_device":        0,
-    }
-
-
-def _api(anomaly: bool):
-    if anomaly:
-        return "sensor-api", {
-            "response_time_ms": random.randint(5000, 30000),
-            "error_rate_pct":   round(random.uniform(30, 100), 1),
-            "requests_per_min": random.randint(500, 5000),
-            "timeout_count":    random.randint(5, 50),
-        }
-    return "sensor-api", {
-        "response_time_ms": random.randint(50, 300),
-        "error_rate_pct":   round(random.uniform(0, 2), 1),
-        "requests_per_min": random.randint(10, 100),
-        "timeout_count":    0,
-    }
-
-
-def _database(anomaly: bool):
-    if anomaly:
-        return "sensor-database", {
-            "query_time_ms":      random.randint(5000, 30000),
-            "rows_affected":      random.randint(50000, 1000000),
-            "pool_usage_pct":     round(random.uniform(90, 100), 1),
-            "deadlocks":          random.randint(1, 10),
-        }
-    return "sensor-database", {
-        "query_time_ms":      random.randint(10, 200),
-        "rows_affected":      random.randint(1, 1000),
-        "pool_usage_pct":     round(random.uniform(10, 50), 1),
-        "deadlocks":          0,
-    }
-
-
-def _mail(anomaly: bool):
-    if anomaly:
-        return "sensor-mail", {
-            "send_time_ms":      random.randint(5000, 20000),
-            "recipient_count":   random.randint(1000, 50000),
-            "spam_score_pct":    round(random.uniform(70, 100), 1),
-            "bounce_rate_pct":   round(random.uniform(30, 90), 1),
-        }
-    return "sensor-mail", {
-        "send_time_ms":      random.randint(100, 500),
-        "recipient_count":   random.randint(1, 10),
-        "spam_score_pct":    round(random.uniform(0, 10), 1),
-        "bounce_rate_pct":   round(random.uniform(0, 3), 1),
-    }
-
-
-def _checkout(anomaly: bool):
-    if anomaly:
-        return "sensor-checkout", {
-            "cart_value":          round(random.uniform(5000, 50000), 2),
-            "payment_time_s":      random.randint(60, 300),
-            "retry_count":         random.randint(3, 10),
-            "failed_payment_24h":  random.randint(5, 20),
-        }
-    return "sensor-checkout", {
-        "cart_value":          round(random.uniform(10, 300), 2),
-        "payment_time_s":      random.randint(2, 10),
-        "retry_count":         0,
-        "failed_payment_24h":  random.randint(0, 1),
-    }
-
-
-def _search(anomaly: bool):
-    if anomaly:
-        return "sensor-search", {
-            "query_time_ms":      random.randint(5000, 20000),
-            "results_count":      0,
-            "query_length":       random.randint(500, 5000),
-            "cache_miss_rate_pct": round(random.uniform(80, 100), 1),
-        }
-    return "sensor-search", {
-        "query_time_ms":      random.randint(20, 200),
-        "results_count":      random.randint(5, 100),
-        "query_length":       random.randint(3, 50),
-        "cache_miss_rate_pct": round(random.uniform(0, 20), 1),
-    }
-
-
-def _upload(anomaly: bool):
-    if anomaly:
-        return "sensor-upload", {
-            "file_size_mb":      round(random.uniform(500, 5000), 1),
-            "upload_duration_s": random.randint(600, 3600),
-            "error_count":       random.randint(1, 10),
-            "retry_count":       random.randint(3, 10),
-        }
-    return "sensor-upload", {
-        "file_size_mb":      round(random.uniform(0.1, 50), 1),
-        "upload_duration_s": random.randint(1, 30),
-        "error_count":       0,
-        "retry_count":       0,
-    }
-
-
-TYPE_GENERATORS = [_payment, _login, _api, _database, _mail, _checkout, _search, _upload]
-
-
 def generate_random_incident(anomaly_rate: int = 30):
     is_anomaly = random.random() < (anomaly_rate / 100)
     gen = random.choice(TYPE_GENERATORS)
@@ -214,8 +91,13 @@ def generate_random_incident(anomaly_rate: int = 30):
         "values": values,
     }
 
-    anomaly_result = detector.predict(datapoint["values"])
+    started = time.perf_counter()
+    anomaly_result = detector_registry.for_source(source).predict(values)
+    anomaly_result["contributions"] = explainer.explain_one(
+        source, values, anomaly_result["is_anomaly"], time.perf_counter() - started
+    )
     incident = incident_manager.create_incident(datapoint, anomaly_result)
+    correlation_engine.attach(incident)
     saved = storage.save(incident)
     notifier.notify_if_needed(incident)   # trigger email/slack if threshold met
     return saved
@@ -243,6 +125,12 @@ def background_generator_task():
             interval = settings.get("interval", 3)
             anomaly_rate = settings.get("anomalyRate", 30)
 
+            # The generator is subject to the same global budget as real sensors
+            admitted, retry_after = admission_controller.admit("admin-generator")
+            if not admitted:
+                time.sleep(min(retry_after, interval))
+                continue
+
             incident = generate_random_incident(anomaly_rate)
             generator_state["generated_count"] += 1
 
@@ -270,7 +158,7 @@ async def start_generator(settings: GeneratorSettings):
     generator_state["settings"] = settings.dict()
     generator_state["generated_count"] = 0
 
-    thread = Thread(target=background_generator_task, daemon=True)
+    thread = Thread(target=background_generator_task, name="incident-generator", daemon=True)
     thread.start()
     generator_state["thread"] = thread
 
@@ -343,50 +231,131 @@ async def create_crisis_scenario():
 
 
 @router.delete("/clear-database")
-async def clear_database():
+def clear_database():
+    # TRUNCATE on PostgreSQL, otherwise short id-range batches: never one
+    # long transaction holding locks over the whole table
     try:
-        db = SessionLocal()
-        try:
-            count = db.query(Incident).count()
-            db.query(Incident).delete()
-            db.commit()
-            generator_state["generated_count"] = 0
-            return {
-                "deleted": count,
-                "message": f"{count} incidents deleted",
-            }
-        finally:
-            db.close()
-    except Exception as e:
+        result = purge_job.run()
+    except PurgeBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    generator_state["generated_count"] = 0
+    return {
+        "deleted": result["deleted"],
+        "method": result["method"],
+        "message": f"{result['deleted']} incidents deleted",
+    }
+
+
+class PurgeRequest(BaseModel):
+    source: Optional[str] = None
+    severity: Optional[str] = None
+    before: Optional[datetime] = None
+    batch_size: int = 5000
+    pause_ms: int = 20
+
+
+@router.post("/purge")
+async def start_purge(request: PurgeRequest):
+    if request.batch_size < 1:
+        raise HTTPException(status_code=422, detail="batch_size must be positive")
+    if request.severity is not None and request.severity not in ("low", "medium", "high", "critical"):
+        raise HTTPException(status_code=422, detail="severity must be low, medium, high or critical")
+
+    started = purge_job.start(
+        source=request.source,
+        severity=request.severity,
+        before=request.before,
+        batch_size=request.batch_size,
+        pause_s=request.pause_ms / 1000,
+    )
+    if not started:
+        raise HTTPException(status_code=409, detail="a purge is already running")
+
+    return {"status": "started", **purge_job.status()}
+
+
+@router.get("/purge/status")
+async def get_purge_status():
+    return purge_job.status()
+
+
+@router.post("/purge/stop")
+async def stop_purge():
+    if not purge_job.stop():
+        return {"status": "not_running", **purge_job.status()}
+    return {"status": "stopping", **purge_job.status()}
+
 
 @router.get("/stats")
-async def get_admin_stats():
-    try:
-        db = SessionLocal()
-        try:
-            total = db.query(Incident).count()
-            today = db.query(Incident).filter(
-                Incident.timestamp >= datetime.now().replace(hour=0, minute=0, second=0)
-            ).count()
-
-            last_incident = db.query(Incident).order_by(Incident.id.desc()).first()
-
-            return {
-                "total_incidents": total,
-                "today_count": today,
-                "last_incident": {
-                    "timestamp": last_incident.timestamp.isoformat() if last_incident else None,
-                    "severity": last_incident.severity if last_incident else None,
-                } if last_incident else None,
-                "generator_running": generator_state["running"],
-                "generator_count": generator_state["generated_count"],
-            }
-        finally:
-            db.close()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_admin_stats(request: Request):
+    # O(1): served from the incremental counters, no table scan per poll
+    counters = kpi_counters.snapshot()
+    return conditional_json(request, "admin-stats", {
+        "total_incidents": counters["total_incidents"],
+        "today_count": counters["today_count"],
+        "by_severity": counters["by_severity"],
+        "last_incident": counters["last_incident"],
+        "generator_running": generator_state["running"],
+        "generator_count": generator_state["generated_count"],
+    })
+
+
+# ---------------------------------------------------------------------------
+# Historical re-scoring (backfill) after a model or threshold change
+# ---------------------------------------------------------------------------
+
+class BackfillRequest(BaseModel):
+    chunk_size: int = 1000
+    max_rows_per_sec: int = 2000   # 0 = unthrottled
+    restart: bool = False          # ignore the checkpoint and start from id 0
+
+
+@router.post("/backfill/start")
+async def start_backfill(request: BackfillRequest):
+    if request.chunk_size < 1:
+        raise HTTPException(status_code=422, detail="chunk_size must be positive")
+
+    if not backfill_job.start(request.chunk_size, request.max_rows_per_sec, request.restart):
+        return {"status": "already_running", **backfill_job.status()}
+
+    return {"status": "started", **backfill_job.status()}
+
+
+@router.post("/backfill/stop")
+async def stop_backfill():
+    if not backfill_job.stop():
+        return {"status": "not_running", **backfill_job.status()}
+
+    return {"status": "stopping", **backfill_job.status()}
+
+
+@router.get("/backfill/status")
+async def get_backfill_status():
+    return backfill_job.status()
+
+
+# ---------------------------------------------------------------------------
+# Scheduled jobs
+# ---------------------------------------------------------------------------
+
+@router.get("/jobs")
+async def list_jobs():
+    return scheduler.snapshot()
+
+
+@router.post("/jobs/{name}/run")
+async def run_job_now(name: str):
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{name}'")
+
+    ran = await scheduler.trigger(name)
+    return {
+        "status": "completed" if ran else "skipped",
+        "job": scheduler.jobs[name].snapshot(),
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -399,6 +368,59 @@ class EmailConfigRequest(BaseModel):
     threshold: str = "critical"   # "critical" | "high"
 
 
+class IngestLimitsRequest(BaseModel):
+    enabled: bool = True
+    per_source_rate: float = 20.0
+    per_source_burst: int = 40
+    global_rate: float = 200.0
+    global_burst: int = 400
+    priority_sources: List[str] = []
+    hot_source_ttl_s: int = 300
+
+
+class SeverityThresholdsRequest(BaseModel):
+    # {"default": [critical, high, medium], "sensor-api": [...], ...}
+    thresholds: Dict[str, List[float]]
+
+
+class DetectorConfigRequest(BaseModel):
+    default: str = "isolation_forest"
+    sources: Dict[str, str] = {}   # {"sensor-login": "robust_z", ...}
+
+
+class AlertChannelRequest(BaseModel):
+    type: str                     # "email" | "slack"
+    target: str = ""              # email address / Slack webhook; empty = configured default
+
+
+class FeaturePredicateRequest(BaseModel):
+    feature: str
+    op: str                       # > >= < <= == !=
+    value: float
+
+
+class AlertRuleRequest(BaseModel):
+    id: Optional[str] = None
+    name: str = ""
+    enabled: bool = True
+    sources: List[str] = []       # exact names or glob patterns; empty = every source
+    min_severity: Optional[str] = None
+    score_min: Optional[float] = None
+    score_max: Optional[float] = None
+    features: List[FeaturePredicateRequest] = []
+    hours: List[int] = []         # [start, end) local hour, may wrap midnight
+    days: List[int] = []          # 0 = Monday
+    channels: List[AlertChannelRequest]
+    stop: bool = False
+
+
+class AlertRuleTestRequest(BaseModel):
+    source: str = ""
+    severity: str = "low"
+    score: float = 0.0
+    values: Dict[str, float] = {}
+
+
 class SMTPConfigRequest(BaseModel):
     host: str
     port: int = 465
@@ -408,8 +430,8 @@ class SMTPConfigRequest(BaseModel):
 
 
 @router.get("/email-config")
-async def get_email_config():
-    return runtime_config.email_config
+async def get_email_config(request: Request):
+    return conditional_json(request, "email-config", runtime_config.email_config)
 
 
 @router.post("/email-config")
@@ -427,15 +449,15 @@ async def update_email_config(config: EmailConfigRequest):
 
 
 @router.get("/smtp-config")
-async def get_smtp_config():
+async def get_smtp_config(request: Request):
     s = get_settings()
-    return {
+    return conditional_json(request, "smtp-config", {
         "host": runtime_config.smtp_config.get("host") or s.smtp_host,
         "port": runtime_config.smtp_config.get("port") or s.smtp_port,
         "username": runtime_config.smtp_config.get("username") or s.smtp_username,
         "password": runtime_config.smtp_config.get("password") or s.smtp_password,
         "sender": runtime_config.smtp_config.get("sender") or s.smtp_sender,
-    }
+    })
 
 
 @router.post("/smtp-config")
@@ -452,3 +474,187 @@ async def update_smtp_config(config: SMTPConfigRequest):
     _rebuild_notifier()
 
     return {"status": "updated", "config": runtime_config.smtp_config}
+
+
+@router.get("/ingest-limits")
+async def get_ingest_limits(request: Request):
+    return conditional_json(request, "ingest-limits", runtime_config.ingest_limits)
+
+
+@router.post("/ingest-limits")
+async def update_ingest_limits(config: IngestLimitsRequest):
+    if min(config.per_source_rate, config.global_rate) <= 0:
+        raise HTTPException(status_code=422, detail="rates must be positive")
+    if min(config.per_source_burst, config.global_burst) < 1:
+        raise HTTPException(status_code=422, detail="bursts must be at least 1")
+
+    runtime_config.ingest_limits.update(config.dict())
+    admission_controller.reconfigure(runtime_config.ingest_limits)
+
+    return {"status": "updated", "config": runtime_config.ingest_limits}
+
+
+@router.get("/severity-thresholds")
+async def get_severity_thresholds(request: Request):
+    return conditional_json(request, "severity-thresholds", runtime_config.severity_thresholds)
+
+
+@router.post("/severity-thresholds")
+async def update_severity_thresholds(config: SeverityThresholdsRequest):
+    for name, cutoffs in config.thresholds.items():
+        if name != "default" and name not in SOURCE_NAMES:
+            raise HTTPException(status_code=422, detail=f"unknown source '{name}'")
+        if len(cutoffs) != 3 or not cutoffs[0] <= cutoffs[1] <= cutoffs[2]:
+            raise HTTPException(
+                status_code=422,
+                detail=f"'{name}' needs ascending [critical, high, medium] cut-offs",
+            )
+
+    runtime_config.severity_thresholds.clear()
+    runtime_config.severity_thresholds.update(config.thresholds)
+    runtime_config.severity_thresholds.setdefault("default", [-0.20, -0.10, -0.05])
+    reload_severity_thresholds()
+
+    return {"status": "updated", "config": runtime_config.severity_thresholds}
+
+
+@router.get("/detectors")
+async def get_detector_config(request: Request):
+    return conditional_json(request, "detectors", {"backends": list(DETECTOR_BACKENDS), **detector_registry.snapshot()})
+
+
+@router.post("/detectors")
+async def update_detector_config(config: DetectorConfigRequest):
+    for name, backend in {"default": config.default, **config.sources}.items():
+        if backend not in DETECTOR_BACKENDS:
+            raise HTTPException(status_code=422, detail=f"'{name}': unknown detector '{backend}'")
+
+    runtime_config.detector_config.clear()
+    runtime_config.detector_config.update(config.model_dump())
+
+    return {"status": "updated", "config": runtime_config.detector_config}
+
+
+# ------------------------------------------------------------
+# ALERT RULES (admin only: targets are URLs the server posts to)
+# ------------------------------------------------------------
+def _rule_index(rule_id: str) -> int:
+    for n, rule in enumerate(runtime_config.alert_rules):
+        if rule["id"] == rule_id:
+            return n
+    raise HTTPException(status_code=404, detail=f"no alert rule '{rule_id}'")
+
+
+def _validated_rule(config: AlertRuleRequest) -> dict:
+    try:
+        return normalize_rule(config.model_dump())
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/alert-rules", dependencies=[Depends(require_admin)])
+async def get_alert_rules(request: Request):
+    return conditional_json(request, "alert-rules", {
+        "rules": runtime_config.alert_rules,
+        "stats": alert_rules.snapshot(),
+    })
+
+
+@router.post("/alert-rules", dependencies=[Depends(require_admin)])
+async def create_alert_rule(config: AlertRuleRequest):
+    rule = _validated_rule(config)
+    if any(r["id"] == rule["id"] for r in runtime_config.alert_rules):
+        raise HTTPException(status_code=409, detail=f"alert rule '{rule['id']}' already exists")
+
+    runtime_config.alert_rules.append(rule)
+    alert_rules.load(runtime_config.alert_rules)
+
+    return {"status": "created", "rule": rule}
+
+
+@router.put("/alert-rules/{rule_id}", dependencies=[Depends(require_admin)])
+async def update_alert_rule(rule_id: str, config: AlertRuleRequest):
+    n = _rule_index(rule_id)
+    rule = _validated_rule(config.model_copy(update={"id": rule_id}))
+
+    runtime_config.alert_rules[n] = rule
+    alert_rules.load(runtime_config.alert_rules)
+
+    return {"status": "updated", "rule": rule}
+
+
+@router.delete("/alert-rules/{rule_id}", dependencies=[Depends(require_admin)])
+async def delete_alert_rule(rule_id: str):
+    rule = runtime_config.alert_rules.pop(_rule_index(rule_id))
+    alert_rules.load(runtime_config.alert_rules)
+
+    return {"status": "deleted", "rule": rule}
+
+
+@router.post("/alert-rules/test", dependencies=[Depends(require_admin)])
+async def test_alert_rules(incident: AlertRuleTestRequest):
+    """Which rules (and channels) a sample incident would be routed to; nothing is sent."""
+    sample = incident.model_dump()
+    return {
+        "matched": [
+            {"id": r.id, "name": r.spec.get("name"), "channels": [{"type": t, "target": g} for t, g in r.channels]}
+            for r in alert_rules.match(sample, record=False)
+        ],
+    }
+
+
+# ------------------------------------------------------------
+# PROFILING (admin only)
+# ------------------------------------------------------------
+def _profile_seconds(seconds: float) -> float:
+    limit = get_settings().profile_max_seconds
+    if not 0 < seconds <= limit:
+        raise HTTPException(status_code=422, detail=f"seconds must be in (0, {limit:g}]")
+    return seconds
+
+
+@router.get("/profile", dependencies=[Depends(require_admin)])
+async def get_profiler_status():
+    return profiler.snapshot()
+
+
+@router.post("/profile/cpu", dependencies=[Depends(require_admin)])
+async def profile_cpu(
+    seconds: float = 10.0,
+    interval_ms: float = Query(5.0, ge=1.0, le=1000.0),
+    thread: Optional[str] = Query(None, description="only threads whose name starts with this"),
+    top: int = Query(25, ge=1, le=500),
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+):
+    """Samples every thread's stack for ``seconds``; format=collapsed returns flamegraph.pl input."""
+    try:
+        result = await asyncio.to_thread(
+            profiler.sample_cpu, _profile_seconds(seconds), interval_ms, thread_prefix=thread, top=top,
+        )
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse("\n".join(result["collapsed"]) + "\n")
+    return result
+
+
+@router.post("/profile/memory", dependencies=[Depends(require_admin)])
+async def profile_memory(
+    seconds: float = 10.0,
+    top: int = Query(25, ge=1, le=500),
+    frames: int = Query(10, ge=1, le=100),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Allocation growth between two tracemalloc snapshots ``seconds`` apart."""
+    try:
+        return await asyncio.to_thread(
+            profiler.memory_diff, _profile_seconds(seconds), top=top, frames=frames, group_by=group_by,
+        )
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/profile/threads", dependencies=[Depends(require_admin)])
+async def get_thread_stacks():
+    return {"threads": profiler.thread_stacks()}
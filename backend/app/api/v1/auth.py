@@ -9,7 +9,6 @@ from datetime import timedelta
 from app.core.security import (
     verify_password, 
     create_access_token, 
-    get_password_hash,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     verify_token
 )
@@ -28,16 +27,17 @@ class Token(BaseModel):
 
 # Base de données utilisateurs (en dur pour la démo)
 # EN PRODUCTION : Utilisez une vraie base de données !
+# Hashes bcrypt précalculés (admin123 / demo123) : pas de hachage au démarrage
 DEMO_USERS = {
     "admin": {
         "username": "admin",
-        "password": get_password_hash("admin123"),
+        "password": "$2b$12$ghMjEk2HYzc5/46Ez6Ra9.BiEZc0eN4jrrwgC6Fh/b/EM6/F4K9N2",
         "role": "admin",
         "email": "admin@aisentinel.com"
     },
     "demo": {
         "username": "demo",
-        "password": get_password_hash("demo123"),
+        "password": "$2b$12$YhjrysGnqpvHtcHDWegNDOeGGTUoZQS6Cz2cI8LF.HahdGo81kK5q",
         "role": "viewer",
         "email": "demo@aisentinel.com"
     }
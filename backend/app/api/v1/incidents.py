@@ -1,13 +1,36 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
+from app.core.http_cache import cacheable_json, etag_for, not_modified
 from app.db.session import SessionLocal
 from app.models.incident import Incident
+from app.services.query_cache import query_cache
+from app.services.watermark import data_watermark
 
 router = APIRouter()
 
 @router.get("/")
-def list_incidents():
+def list_incidents(request: Request, grouped: bool = Query(False, description="Only parent incidents (one row per correlated problem)")):
+    # Unchanged data since the client's last poll: 304 without running the list query
+    watermark = data_watermark.current()
+    etag = etag_for("incidents", grouped, *watermark)
+    last_modified = data_watermark.last_modified()
+    cached = not_modified(request, "incidents", etag, last_modified, saves_query=True)
+    if cached is not None:
+        return cached
+
+    # Same watermark in the key as in the ETag: the body always matches it
+    result = query_cache.get_or_compute(
+        "incidents", {"grouped": grouped, "watermark": watermark}, lambda: _load_incidents(grouped),
+        keyed_by_watermark=True,
+    )
+    return cacheable_json("incidents", result, etag, last_modified)
+
+
+def _load_incidents(grouped: bool) -> list:
     db = SessionLocal()
-    incidents = db.query(Incident).order_by(Incident.id.desc()).all()
+    query = db.query(Incident)
+    if grouped:
+        query = query.filter(Incident.parent_id.is_(None))
+    incidents = query.order_by(Incident.id.desc()).all()
 
     result = []
     for i in incidents:
@@ -18,9 +41,13 @@ def list_incidents():
             "values": i.values,
             "score": i.score,
             "is_anomaly": bool(i.is_anomaly),
+            "contributions": i.contributions,
             "severity": i.severity,
             "type": i.type,
-            "message": i.message
+            "message": i.message,
+            "parent_id": i.parent_id,
+            "occurrences": i.occurrences or 1,
+            "last_seen": i.last_seen,
         })
     db.close()
     return result
@@ -1,19 +1,31 @@
-from fastapi import APIRouter
+import math
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Body, Header, HTTPException, Response
 
 from app.core.config import get_settings
 from app.schemas.ingest_schema import DataPoint
-from app.services.anomaly_detector import AnomalyDetector
+from app.services.correlation import correlation_engine
+from app.services.detectors import detector_registry, utc_epoch
+from app.services.explainer import explainer
+from app.services.frame_codec import FRAME_CONTENT_TYPE, decode_frame
 from app.services.incident_manager import IncidentManager
 from app.services.notifications.email_notifier import EmailNotifier
 from app.services.notifications.notification_service import NotificationService
 from app.services.notifications.slack_notifier import SlackNotifier
+from app.services.idempotency import derive_idempotency_key, idempotency_cache
+from app.services.journal import DB_UNAVAILABLE, JournalFull, ingest_journal
+from app.services.rate_limiter import admission_controller
+from app.services.scoring_engine import get_scoring_engine
 from app.services.storage import IncidentStorage
 
 router = APIRouter()
 settings = get_settings()
 
 storage = IncidentStorage()
-detector = AnomalyDetector()
 incident_manager = IncidentManager()
 
 
@@ -46,19 +58,197 @@ def _build_notifier() -> NotificationService:
 notifier = _build_notifier()
 
 
+def _reject(source: str, retry_after: float):
+    raise HTTPException(
+        status_code=429,
+        detail=f"Ingest rate limit exceeded for source '{source}'",
+        headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))},
+    )
+
+
+def _journal(incidents: list, keys: Optional[list], response: Response):
+    """Durably queues incidents for the replayer (202); 503 once the journal is full too."""
+    try:
+        ingest_journal.append_many(incidents, keys)
+    except JournalFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Database unavailable and ingest journal full",
+            headers={"Retry-After": "30"},
+        )
+    response.status_code = 202
+
+
 @router.post("/")
-def ingest_data(data: DataPoint):
+def ingest_data(
+    data: DataPoint,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+):
+    key = idempotency_key
+    if key is None and settings.idempotency_derive_key:
+        key = derive_idempotency_key(data.source, data.timestamp, data.values)
+
+    # Retries are answered from memory — no scoring, insert or notification
+    if key is not None:
+        cached = idempotency_cache.get(key)
+        if cached is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return cached
+
+    admitted, retry_after = admission_controller.admit(data.source)
+    if not admitted:
+        _reject(data.source, retry_after)
+
     datapoint = data.model_dump()
 
-    anomaly_result = detector.predict(datapoint["values"])
+    started = time.perf_counter()
+    detector = detector_registry.for_source(data.source)
+    anomaly_result = detector.predict(datapoint["values"], utc_epoch(data.timestamp))
+    anomaly_result["contributions"] = explainer.explain_one(
+        data.source, datapoint["values"], anomaly_result["is_anomaly"], time.perf_counter() - started
+    )
     incident = incident_manager.create_incident(datapoint, anomaly_result)
-
-    saved = storage.save(incident)
-    notifier.notify_if_needed(incident)
-
-    return {
+    if incident["severity"] in ("high", "critical"):
+        admission_controller.mark_hot(incident["source"])
+    correlation_engine.attach(incident)
+
+    saved = None
+    if settings.journal_mode != "always":
+        try:
+            if key is None:
+                saved, created = storage.save(incident), True
+            else:
+                saved, created = storage.save_idempotent(incident, key)
+        except DB_UNAVAILABLE as e:
+            if settings.journal_mode == "off":
+                raise
+            print(f"Database unavailable, journaling incident: {e}")
+
+    if saved is None:
+        # Accepted but not yet in the database: the journal replayer inserts it
+        _journal([incident], [key], response)
+        notifier.notify_if_needed(incident)
+        incident.pop("escalated", None)
+        result = {"message": "data journaled", "incident": incident, "id": None, "journaled": True}
+        if key is not None:
+            idempotency_cache.put(key, result)
+        return result
+
+    if not created:
+        # Duplicate caught by the unique constraint (LRU miss or another worker)
+        response.headers["Idempotent-Replayed"] = "true"
+        incident = {
+            "timestamp": saved.timestamp,
+            "source": saved.source,
+            "values": saved.values,
+            "score": saved.score,
+            "is_anomaly": bool(saved.is_anomaly),
+            "contributions": saved.contributions,
+            "severity": saved.severity,
+            "type": saved.type,
+            "message": saved.message,
+            "parent_id": saved.parent_id,
+        }
+    else:
+        notifier.notify_if_needed(incident)
+        incident.pop("escalated", None)   # notifier-only flag, not part of the response
+
+    result = {
         "message": "data received",
         "incident": incident,
         "id": saved.id,
     }
-
+    if key is not None:
+        idempotency_cache.put(key, result)
+    return result
+
+
+@router.post("/frame")
+def ingest_frame(response: Response, payload: bytes = Body(..., media_type=FRAME_CONTENT_TYPE)):
+    """
+    Fast-path batch ingest of a binary columnar frame (see services/frame_codec.py).
+
+    The feature matrix goes to the source's detector as-is (IsolationForest sources
+    through the shared ScoringEngine, which shards big frames across processes);
+    per-point dicts are only built for the rows written to the database.
+    """
+    try:
+        frame = decode_frame(payload, max_points=settings.ingest_frame_max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid frame: {str(e)}")
+
+    n_points = len(frame.timestamps)
+    if n_points == 0:
+        return {"message": "frame received", "received": 0, "anomalies": 0, "ids": []}
+
+    admitted, retry_after = admission_controller.admit(frame.source, cost=n_points)
+    if not admitted:
+        _reject(frame.source, retry_after)
+
+    # Columns in the detectors' feature order (sorted names), as for JSON points
+    order = sorted(range(len(frame.feature_names)), key=frame.feature_names.__getitem__)
+    names = [frame.feature_names[c] for c in order]
+    matrix = frame.matrix[:, order].astype(np.float64)
+    started = time.perf_counter()
+    detector = detector_registry.for_source(frame.source)
+    engine = get_scoring_engine()
+    if detector is engine.detector:
+        # IsolationForest is stateless per row: big frames are sharded across the worker pool
+        scores = engine.score(matrix)
+    else:
+        scores = detector.score_batch(matrix, frame.timestamps)   # streaming baselines learn in order
+    contributions = explainer.explain_batch(
+        frame.source, names, matrix, scores < 0, time.perf_counter() - started
+    )
+
+    datapoints = [
+        {
+            "timestamp": datetime.utcfromtimestamp(ts),
+            "source": frame.source,
+            "values": dict(zip(names, row)),
+        }
+        for ts, row in zip(frame.timestamps.tolist(), matrix.tolist())
+    ]
+    incidents = incident_manager.create_incidents(
+        datapoints, scores, scores < 0,
+        source_ids=incident_manager.source_ids([frame.source]),
+        contributions=contributions,
+    )
+
+    for incident in incidents:
+        correlation_engine.attach(incident)
+
+    ids = None
+    if settings.journal_mode != "always":
+        try:
+            ids = storage.save_many(incidents)
+        except DB_UNAVAILABLE as e:
+            if settings.journal_mode == "off":
+                raise
+            print(f"Database unavailable, journaling frame: {e}")
+
+    if ids is None:
+        _journal(incidents, None, response)
+
+    anomalies = 0
+    for incident in incidents:
+        anomalies += incident["is_anomaly"]
+        if incident["severity"] in ("high", "critical"):
+            admission_controller.mark_hot(incident["source"])
+        notifier.notify_if_needed(incident)
+
+    if ids is None:
+        return {
+            "message": "frame journaled",
+            "received": n_points,
+            "anomalies": anomalies,
+            "ids": [],
+            "journaled": True,
+        }
+    return {
+        "message": "frame received",
+        "received": n_points,
+        "anomalies": anomalies,
+        "ids": ids,
+    }
@@ -1,7 +1,125 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.http_cache import http_cache_stats
+from app.core.scheduler import scheduler
+from app.db.session import SessionLocal
+from app.services.correlation import correlation_engine
+from app.services.explainer import explainer
+from app.services.features import aggregate_feature, hot_feature_averages
+from app.services.idempotency import idempotency_cache
+from app.services.journal import ingest_journal
+from app.services.query_cache import query_cache
+from app.services.rate_limiter import admission_controller
+from app.services.report_store import resolve_period
+from app.services.sketches import STREAMS, incident_sketches
+from app.services.timeseries import BUCKET_UNITS, incident_timeseries
 
 router = APIRouter()
 
 @router.get("/")
 def metrics_test():
     return {"metrics": "ok"}
+
+
+@router.get("/ingest")
+def ingest_metrics():
+    """Admission control counters: admitted, shed (per source), priority lane usage."""
+    return {
+        **admission_controller.snapshot(),
+        "idempotency": idempotency_cache.snapshot(),
+        "explainer": explainer.snapshot(),
+        "journal": ingest_journal.snapshot(),
+    }
+
+
+@router.get("/query-cache")
+def query_cache_metrics():
+    """Shared query result cache: hits, misses, coalesced misses, evictions, invalidations."""
+    return query_cache.snapshot()
+
+
+@router.get("/correlation")
+def correlation_metrics():
+    """Open correlation groups and grouping counters."""
+    return correlation_engine.snapshot()
+
+
+@router.get("/jobs")
+def job_metrics():
+    """Scheduler jobs with run counts, failures, overruns and timings."""
+    return scheduler.snapshot()
+
+
+@router.get("/http")
+def http_metrics():
+    """Conditional GET hits (304s, bytes and queries saved) and gzip savings."""
+    return http_cache_stats.snapshot()
+
+
+@router.get("/top")
+def top_metrics(
+    stream: str = Query("source", description=f"one of: {', '.join(STREAMS)}"),
+    window_s: int = Query(3600, ge=1, description="look-back window in seconds"),
+    n: int = Query(10, ge=1, le=100),
+):
+    """Heavy hitters over recent ingest (e.g. top noisy sources in the last hour), from in-memory sketches."""
+    try:
+        result = incident_sketches.top(stream, window_s, n)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "sketches": incident_sketches.snapshot()}
+
+
+@router.get("/features")
+def feature_metrics(
+    feature: Optional[str] = Query(None, description="Feature name in incident values, e.g. response_time_ms"),
+    source: Optional[str] = Query(None),
+    period: str = Query("day", description="day, week, month, all"),
+):
+    """Server-side feature aggregates; without ``feature``, hot-feature averages per source."""
+    try:
+        start, end = resolve_period(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def compute():
+        db = SessionLocal()
+        try:
+            if feature is None:
+                return {"period": period, "sources": hot_feature_averages(db, start, end)}
+            return {"period": period, **aggregate_feature(db, feature, source, start, end)}
+        finally:
+            db.close()
+
+    # Keyed on the period name, not its bounds: "day" ending now is the same query for a few seconds
+    return query_cache.get_or_compute(
+        "features", {"feature": feature, "source": source, "period": period}, compute,
+    )
+
+
+@router.get("/timeseries")
+def timeseries_metrics(
+    period: str = Query("day", description="day, week, month, all"),
+    unit: Optional[str] = Query(None, description="minute, hour, day, week, month (default: from period length)"),
+):
+    """Incidents per time bucket (total, high/critical, busiest sources), one bucketed aggregation."""
+    if unit is not None and unit not in BUCKET_UNITS:
+        raise HTTPException(status_code=400, detail=f"unknown unit: {unit}")
+    try:
+        start, end = resolve_period(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def compute():
+        db = SessionLocal()
+        try:
+            return {"period": period, **incident_timeseries(db, start, end, unit)}
+        finally:
+            db.close()
+
+    try:
+        return query_cache.get_or_compute("timeseries", {"period": period, "unit": unit}, compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -5,54 +5,51 @@ backend/app/api/v1/reports.py
 
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
-from datetime import datetime, timedelta
 from typing import Optional
-import os
 
-from app.services.pdf_report_generator import PDFReportGenerator
+from app.core.config import get_settings
+from app.services.report_store import PRERENDERED_PERIODS, report_store, resolve_period
 from app.db.session import SessionLocal
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/generate")
 async def generate_report(
     start_date: Optional[str] = Query(None, description="Date de début (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Date de fin (YYYY-MM-DD)"),
-    period: Optional[str] = Query("day", description="Période: day, week, month, all")
+    period: Optional[str] = Query("day", description="Période: day, week, month, all"),
+    fresh: bool = Query(False, description="Ignorer le rapport pré-généré et recalculer"),
 ):
     """
     Génère un rapport PDF d'analyse pour une période donnée.
+
+    Les rapports day/week/month sont pré-générés par le scheduler : le plus
+    récent est servi directement s'il a moins de report_max_age_s secondes.
     """
     
     try:
-        # Déterminer les dates
-        now = datetime.now()
-        
-        if start_date and end_date:
-            # Mode personnalisé
-            start = datetime.fromisoformat(start_date)
-            end = datetime.fromisoformat(end_date)
-        
-        elif period == "day":
-            start = datetime(now.year, now.month, now.day)
-            end = now
-        
-        elif period == "week":
-            start = now - timedelta(days=7)
-            end = now
-        
-        elif period == "month":
-            start = now - timedelta(days=30)
-            end = now
-        
-        elif period == "all":
-            start = datetime(2020, 1, 1)  # ancien historique large
-            end = now
-        
-        else:
+        custom = bool(start_date and end_date)
+
+        if not custom and period in PRERENDERED_PERIODS and not fresh:
+            artifact = report_store.latest(period, settings.report_max_age_s)
+            if artifact is not None:
+                return FileResponse(
+                    artifact.path,
+                    media_type="application/pdf",
+                    filename=f"rapport_incidents_{artifact.start_date.strftime('%Y%m%d')}_{artifact.end_date.strftime('%Y%m%d')}.pdf",
+                    headers={"X-Report-Generated-At": artifact.created_at.isoformat() + "Z"},
+                )
+
+        if not custom and period not in ("day", "week", "month", "all"):
             raise HTTPException(status_code=400, detail="Période invalide")
+
+        # Déterminer les dates
+        start, end = resolve_period(period, start_date, end_date)
         
-        # Génération du PDF
+        # Génération du PDF (ReportLab n'est chargé qu'ici)
+        from app.services.pdf_report_generator import PDFReportGenerator
+
         db = SessionLocal()
         try:
             generator = PDFReportGenerator(db)
@@ -67,6 +64,8 @@ async def generate_report(
         finally:
             db.close()
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Date invalide: {str(e)}")
     except Exception as e:
@@ -32,6 +32,65 @@ class Settings(BaseSettings):
     smtp_sender: str = ""
     smtp_receiver: str = ""
 
+    # Parallel scoring (batch ingest, backfills) — 0 workers means one per CPU core
+    scoring_workers: int = 0
+    scoring_min_parallel_rows: int = 4096
+
+    # Idempotent ingest — without an Idempotency-Key header the key is derived
+    # from source + timestamp + values when this is enabled
+    idempotency_derive_key: bool = True
+    idempotency_cache_size: int = 100_000
+
+    # Binary frame ingest (POST /v1/ingest/frame)
+    ingest_frame_max_points: int = 50_000
+
+    # In-process scheduler for periodic maintenance jobs
+    scheduler_enabled: bool = True
+
+    # Pre-rendered day/week/month reports (empty dir = <tmp>/sentinel_reports)
+    reports_dir: str = ""
+    report_prerender_interval_s: int = 900
+    report_max_age_s: int = 1800
+    reports_keep_per_period: int = 3
+    report_appendix_max_rows: int = 0   # high-severity appendix; 0 lists them all
+
+    # Admin KPI counters are recomputed from the database this often
+    kpi_reconcile_interval_s: int = 120
+
+    # Purges: TRUNCATE for unfiltered clears on PostgreSQL, else batched deletes
+    purge_allow_truncate: bool = True
+    purge_batch_size: int = 5000
+    retention_days: int = 0   # 0 keeps incidents forever
+
+    # Per-feature z-score explanations of anomalies; suspended while they cost
+    # more than explain_budget_ratio of the scoring time
+    explain_enabled: bool = True
+    explain_top_k: int = 3
+    explain_budget_ratio: float = 0.10
+
+    # Local ingest journal (empty dir = <tmp>/sentinel_journal):
+    # "fallback" journals only when the database is unavailable, "always"
+    # journals every point and lets the replayer insert, "off" fails ingest
+    journal_mode: str = "fallback"
+    journal_dir: str = ""
+    journal_segment_bytes: int = 16 * 1024 * 1024
+    journal_max_bytes: int = 1024 * 1024 * 1024
+    journal_fsync_interval_ms: float = 5.0
+    journal_replay_interval_s: float = 2.0
+
+    # Shared query result cache for polled reads (0 TTL disables it)
+    query_cache_ttl_s: float = 5.0
+    query_cache_max_entries: int = 256
+
+    # Heavy-hitter sketches over recent ingest (window = bucket_s × buckets)
+    sketch_bucket_s: int = 60
+    sketch_buckets: int = 60
+    sketch_cms_width: int = 1024
+    sketch_top_k: int = 50
+
+    # On-demand profiling (admin): longest CPU / memory session allowed
+    profile_max_seconds: float = 60.0
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
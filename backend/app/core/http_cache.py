@@ -0,0 +1,131 @@
+"""
+Conditional GET (ETag / Last-Modified) and response size accounting
+backend/app/core/http_cache.py
+
+Polled endpoints answer ``If-None-Match`` with a 304 when their ETag has
+not changed. For DB-backed lists the ETag comes from a data watermark
+(services/watermark.py), so an unchanged poll costs one index lookup
+instead of the full query. Responses carry ``Cache-Control: no-cache``:
+browsers revalidate on every poll and fetch() handles the 304 itself.
+"""
+
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from threading import Lock
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def etag_for(*parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, default=str, sort_keys=True).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+def _not_modified_since(request: Request, last_modified: Optional[float]) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None or request.headers.get("if-none-match"):
+        return False   # If-None-Match takes precedence (RFC 9110)
+    try:
+        return int(last_modified) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class HttpCacheStats:
+    def __init__(self):
+        self._lock = Lock()
+        self._last_body: dict = {}
+        self.endpoints: dict = {}
+        self.transfer = {"bytes_uncompressed": 0, "bytes_sent": 0}
+
+    def record(self, endpoint: str, not_modified: bool, body_bytes: int = 0, saves_query: bool = False):
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                "requests": 0, "not_modified": 0, "bytes_saved": 0, "queries_saved": 0,
+            })
+            stats["requests"] += 1
+            if not_modified:
+                stats["not_modified"] += 1
+                stats["bytes_saved"] += self._last_body.get(endpoint, 0)
+                stats["queries_saved"] += int(saves_query)
+            else:
+                self._last_body[endpoint] = body_bytes
+
+    def add_transfer(self, key: str, n_bytes: int):
+        with self._lock:
+            self.transfer[key] += n_bytes
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            sent, raw = self.transfer["bytes_sent"], self.transfer["bytes_uncompressed"]
+            return {
+                "endpoints": {k: dict(v) for k, v in self.endpoints.items()},
+                "transfer": {
+                    **self.transfer,
+                    "compression_saved_bytes": raw - sent,
+                    "compression_ratio": round(sent / raw, 3) if raw else None,
+                },
+            }
+
+
+http_cache_stats = HttpCacheStats()
+
+
+def _cache_headers(etag: str, last_modified: Optional[float]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(request: Request, endpoint: str, etag: str, last_modified: Optional[float] = None,
+                 saves_query: bool = False) -> Optional[Response]:
+    """A 304 response if the client's copy is current, else None (caller builds the body)."""
+    if _etag_matches(request, etag) or _not_modified_since(request, last_modified):
+        http_cache_stats.record(endpoint, True, saves_query=saves_query)
+        return Response(status_code=304, headers=_cache_headers(etag, last_modified))
+    return None
+
+
+def cacheable_json(endpoint: str, payload, etag: str, last_modified: Optional[float] = None) -> JSONResponse:
+    response = JSONResponse(jsonable_encoder(payload), headers=_cache_headers(etag, last_modified))
+    http_cache_stats.record(endpoint, False, body_bytes=len(response.body))
+    return response
+
+
+def conditional_json(request: Request, endpoint: str, payload) -> Response:
+    """For cheap in-memory payloads: the ETag is a hash of the payload itself."""
+    etag = etag_for(jsonable_encoder(payload))
+    return not_modified(request, endpoint, etag) or cacheable_json(endpoint, payload, etag)
+
+
+class ByteCounterMiddleware:
+    """Counts response body bytes at its position in the middleware stack."""
+
+    def __init__(self, app, key: str):
+        self.app = app
+        self.key = key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def counting_send(message):
+            if message["type"] == "http.response.body":
+                http_cache_stats.add_transfer(self.key, len(message.get("body", b"")))
+            await send(message)
+
+        await self.app(scope, receive, counting_send)
@@ -14,3 +14,40 @@ smtp_config: dict = {
     "password": "",
     "sender": "",
 }
+
+# Ingest admission control (token buckets) — see services/rate_limiter.py
+ingest_limits: dict = {
+    "enabled": True,
+    "per_source_rate": 20.0,     # sustained points/sec per source
+    "per_source_burst": 40,      # bucket capacity per source
+    "global_rate": 200.0,        # sustained points/sec for all sources together
+    "global_burst": 400,
+    "priority_sources": [],      # never shed (e.g. known-critical sensors)
+    "hot_source_ttl_s": 300,     # a source that just raised high/critical stays prioritized
+}
+
+# Incident correlation — see services/correlation.py
+correlation_config: dict = {
+    "enabled": True,
+    "window_s": 300,             # sliding window: a group stays open while events keep arriving
+    "source_groups": [           # sources whose anomalies are one problem when they co-occur
+        ["sensor-api", "sensor-database"],
+    ],
+}
+
+# Severity cut-offs on the detector score, per source — [critical, high, medium]:
+# score < critical → "critical", < high → "high", < medium → "medium", else "low"
+severity_thresholds: dict = {
+    "default": [-0.20, -0.10, -0.05],
+}
+
+# Detector backend per source — see services/detectors/
+# "isolation_forest" | "robust_z" (median/MAD) | "ewma" | "ewma_seasonal" (per hour of day)
+detector_config: dict = {
+    "default": "isolation_forest",
+    "sources": {},               # e.g. {"sensor-login": "robust_z"}
+}
+
+# Alert routing rules — see services/notifications/rules.py
+# Empty: notifications use email_config["threshold"] as before
+alert_rules: list = []
@@ -0,0 +1,206 @@
+"""
+In-process periodic job scheduler
+backend/app/core/scheduler.py
+
+Each job runs in its own asyncio task on a fixed-rate schedule; the job body
+is executed in a worker thread so blocking DB work never stalls the event
+loop. A job never overlaps itself: a run that overruns its interval makes the
+missed ticks count as ``overruns`` instead of stacking up, and a manual
+trigger while a run is in progress is refused.
+
+Jobs marked ``leader_only`` run in a single process across all workers: on
+PostgreSQL the scheduler holds a session-level advisory lock per job on a
+dedicated connection, other processes skip those jobs while the lock is held
+elsewhere. On other databases every process is the leader.
+"""
+
+import asyncio
+import time
+import zlib
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], object], interval_s: float,
+                 leader_only: bool = False, initial_delay_s: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval_s = interval_s
+        self.leader_only = leader_only
+        self.initial_delay_s = interval_s if initial_delay_s is None else initial_delay_s
+        self.lock_key = zlib.crc32(f"sentinel-job:{name}".encode())
+
+        self.running = False
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "overruns": 0,
+            "skipped_not_leader": 0,
+            "last_started": None,
+            "last_duration_ms": None,
+            "max_duration_ms": 0.0,
+            "total_duration_ms": 0.0,
+            "last_result": None,
+            "last_error": None,
+        }
+
+    def snapshot(self) -> dict:
+        runs = self.stats["runs"]
+        return {
+            "name": self.name,
+            "interval_s": self.interval_s,
+            "leader_only": self.leader_only,
+            "running": self.running,
+            **self.stats,
+            "avg_duration_ms": round(self.stats["total_duration_ms"] / runs, 2) if runs else None,
+        }
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: list = []
+        self._engine = None
+        self._lock_conn = None
+        self._held_locks: set = set()
+        self._conn_lock = Lock()   # the lock connection is shared by job threads
+
+    def add_job(self, name: str, func: Callable[[], object], interval_s: float,
+                leader_only: bool = False, initial_delay_s: Optional[float] = None) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"job '{name}' already registered")
+        job = Job(name, func, interval_s, leader_only, initial_delay_s)
+        self.jobs[name] = job
+        return job
+
+    # ------------------------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------------------------
+    async def start(self, engine=None):
+        """Starts one loop per job; ``engine`` enables advisory-lock leader election."""
+        self._engine = engine
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"job:{job.name}"))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await asyncio.to_thread(self._release_locks)
+
+    # ------------------------------------------------------------
+    # EXECUTION
+    # ------------------------------------------------------------
+    async def _loop(self, job: Job):
+        next_run = time.monotonic() + job.initial_delay_s
+        while True:
+            await asyncio.sleep(max(0.0, next_run - time.monotonic()))
+            await self.run_job(job)
+
+            next_run += job.interval_s
+            now = time.monotonic()
+            if next_run < now:
+                missed = int((now - next_run) // job.interval_s) + 1
+                job.stats["overruns"] += missed
+                next_run += missed * job.interval_s
+
+    async def run_job(self, job: Job) -> bool:
+        """Runs a job once; returns False if it was already running or not ours to run."""
+        if job.running:
+            return False
+        # Claimed before the first await: a manual trigger and the loop can't both get past here
+        job.running = True
+        try:
+            leader = not job.leader_only or await asyncio.to_thread(self._is_leader, job)
+        except BaseException:
+            job.running = False
+            raise
+        if not leader:
+            job.stats["skipped_not_leader"] += 1
+            job.running = False
+            return False
+
+        job.stats["last_started"] = datetime.utcnow().isoformat()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(job.func)
+            job.stats["last_result"] = result if isinstance(result, (int, float, str, dict, type(None))) else str(result)
+            job.stats["last_error"] = None
+        except Exception as e:
+            job.stats["failures"] += 1
+            job.stats["last_error"] = str(e)
+            print(f"Job {job.name} failed: {e}")
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            job.stats["runs"] += 1
+            job.stats["last_duration_ms"] = round(elapsed_ms, 2)
+            job.stats["max_duration_ms"] = round(max(job.stats["max_duration_ms"], elapsed_ms), 2)
+            job.stats["total_duration_ms"] += elapsed_ms
+            job.running = False
+        return True
+
+    async def trigger(self, name: str) -> bool:
+        return await self.run_job(self.jobs[name])
+
+    # ------------------------------------------------------------
+    # LEADER ELECTION (PostgreSQL advisory locks)
+    # ------------------------------------------------------------
+    def _is_leader(self, job: Job) -> bool:
+        if self._engine is None or self._engine.dialect.name != "postgresql":
+            return True
+        with self._conn_lock:
+            return self._try_lock(job)
+
+    def _try_lock(self, job: Job) -> bool:
+        try:
+            if self._lock_conn is None:
+                self._lock_conn = self._engine.connect()
+            if job.lock_key in self._held_locks:
+                # Still leader as long as the session holding the lock is alive
+                self._lock_conn.execute(text("SELECT 1"))
+                self._lock_conn.commit()
+                return True
+            acquired = self._lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}
+            ).scalar()
+            self._lock_conn.commit()
+        except Exception as e:
+            # Connection lost: the server released our locks with it
+            print(f"Scheduler leader election failed: {e}")
+            self._drop_lock_conn()
+            return False
+        if acquired:
+            self._held_locks.add(job.lock_key)
+        return bool(acquired)
+
+    def _drop_lock_conn(self):
+        if self._lock_conn is not None:
+            try:
+                self._lock_conn.invalidate()
+            except Exception:
+                pass
+        self._lock_conn = None
+        self._held_locks.clear()
+
+    def _release_locks(self):
+        with self._conn_lock:
+            if self._lock_conn is None:
+                return
+            try:
+                self._lock_conn.execute(text("SELECT pg_advisory_unlock_all()"))
+                self._lock_conn.close()
+            except Exception:
+                pass
+            self._lock_conn = None
+            self._held_locks.clear()
+
+    def snapshot(self) -> list:
+        return [job.snapshot() for job in self.jobs.values()]
+
+
+scheduler = Scheduler()
@@ -0,0 +1,228 @@
+"""
+Idempotent schema upgrade for existing databases
+backend/app/db/upgrade.py
+
+``create_all`` creates missing tables but never alters existing ones, so a
+database created before the dictionary encoding still has the string
+columns source/severity/type/message on ``incidents``. ``upgrade_schema``
+runs at startup (after ``create_all`` and the dictionary seed) and brings
+such a table to the current model, in one transaction:
+
+  * adds every model column missing from the table (nullable, with the
+    foreign key when there is one; scalar defaults are filled in),
+  * fills the lookup tables from the distinct legacy strings, sets the
+    ``*_id``/``severity_code`` columns from them, then drops the string
+    columns and their indexes,
+  * converts ``values`` from JSON to JSONB (PostgreSQL) and fills the
+    extracted hot-feature columns when they were just added,
+  * creates the model indexes missing from the table; before a unique one
+    (``idempotency_key``) duplicate keys are cleared on all but the oldest
+    row, so the index can be built,
+  * adds the severity CHECK constraint (PostgreSQL).
+
+Every step checks the live schema first, so running it again on an
+up-to-date database does nothing.
+"""
+
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.dictionary import SEVERITY_LEVELS, IncidentSource
+from app.models.incident import Incident
+from app.services.features import EXTRACTED_COLUMNS, HOT_FEATURES
+
+LEGACY_COLUMNS = ("source", "severity", "type", "message")
+
+
+def upgrade_schema(engine: Engine) -> list:
+    """Applies the pending steps; returns what was done (empty when up to date)."""
+    inspector = inspect(engine)
+    if not inspector.has_table(Incident.__tablename__):
+        return []
+    existing = {c["name"] for c in inspector.get_columns(Incident.__tablename__)}
+
+    done = []
+    with engine.begin() as conn:
+        done += _add_missing_columns(conn, existing)
+        if existing & set(LEGACY_COLUMNS):
+            done += _convert_dictionary_columns(conn, existing, inspector)
+        if conn.dialect.name == "postgresql":
+            done += _convert_values_to_jsonb(conn, inspector)
+        if set(EXTRACTED_COLUMNS) - existing:
+            done += _fill_hot_features(conn)
+        done += _add_missing_indexes(conn)
+        if conn.dialect.name == "postgresql":
+            done += _add_check_constraints(conn, inspector)
+
+    for step in done:
+        print(f"Schema upgrade: {step}")
+    return done
+
+
+def _q(conn: Connection, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+# ------------------------------------------------------------
+# COLONNES MANQUANTES
+# ------------------------------------------------------------
+def _add_missing_columns(conn: Connection, existing: set) -> list:
+    table = Incident.__table__
+    done = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = f"ALTER TABLE {_q(conn, table.name)} ADD COLUMN {_q(conn, column.name)} " \
+              f"{column.type.compile(dialect=conn.dialect)}"
+        for fk in column.foreign_keys:
+            ddl += f" REFERENCES {_q(conn, fk.column.table.name)} ({_q(conn, fk.column.name)})"
+        conn.execute(text(ddl))
+
+        default = column.default
+        if default is not None and default.is_scalar:
+            conn.execute(
+                table.update().where(column.is_(None)).values({column.name: default.arg})
+            )
+        done.append(f"added column incidents.{column.name}")
+    return done
+
+
+# ------------------------------------------------------------
+# COLONNES TEXTE → DICTIONNAIRE
+# ------------------------------------------------------------
+def _convert_dictionary_columns(conn: Connection, existing: set, inspector) -> list:
+    incidents = _q(conn, Incident.__tablename__)
+    legacy = {name: _q(conn, name) for name in LEGACY_COLUMNS if name in existing}
+
+    # Lookup rows for every legacy value not known yet
+    if "source" in legacy:
+        conn.execute(text(
+            f"INSERT INTO incident_sources (name) SELECT DISTINCT {legacy['source']} FROM {incidents} "
+            f"WHERE {legacy['source']} IS NOT NULL "
+            f"AND {legacy['source']} NOT IN (SELECT name FROM incident_sources)"
+        ))
+    if "message" in legacy:
+        conn.execute(text(
+            f"INSERT INTO message_templates (text) SELECT DISTINCT {legacy['message']} FROM {incidents} "
+            f"WHERE {legacy['message']} IS NOT NULL "
+            f"AND {legacy['message']} NOT IN (SELECT text FROM message_templates)"
+        ))
+    if "type" in legacy:
+        # Type ids are code-defined (not autoincrement): unknown legacy types get the next free ids
+        known = set(conn.execute(text("SELECT name FROM incident_types")).scalars())
+        next_id = conn.execute(text("SELECT COALESCE(MAX(id), -1) + 1 FROM incident_types")).scalar()
+        names = conn.execute(text(
+            f"SELECT DISTINCT {legacy['type']} FROM {incidents} WHERE {legacy['type']} IS NOT NULL"
+        )).scalars()
+        for name in sorted(set(names) - known):
+            conn.execute(text("INSERT INTO incident_types (id, name) VALUES (:id, :name)"),
+                         {"id": next_id, "name": name})
+            next_id += 1
+
+    # Ids from the strings (rows already converted are left alone)
+    lookups = {
+        "source": ("source_id", "incident_sources", "name"),
+        "type": ("type_code", "incident_types", "name"),
+        "message": ("message_id", "message_templates", "text"),
+    }
+    for name, (id_column, lookup, attr) in lookups.items():
+        if name in legacy:
+            conn.execute(text(
+                f"UPDATE {incidents} SET {id_column} = (SELECT id FROM {lookup} "
+                f"WHERE {lookup}.{attr} = {incidents}.{legacy[name]}) "
+                f"WHERE {id_column} IS NULL AND {legacy[name]} IS NOT NULL"
+            ))
+    if "severity" in legacy:
+        cases = " ".join(f"WHEN '{level}' THEN {code}" for code, level in enumerate(SEVERITY_LEVELS))
+        conn.execute(text(
+            f"UPDATE {incidents} SET severity_code = CASE {legacy['severity']} {cases} END "
+            f"WHERE severity_code IS NULL AND {legacy['severity']} IS NOT NULL"
+        ))
+
+    # Indexes first: SQLite refuses to drop an indexed column
+    for index in inspector.get_indexes(Incident.__tablename__):
+        if set(index["column_names"]) & set(legacy):
+            conn.execute(text(f"DROP INDEX {_q(conn, index['name'])}"))
+    for quoted in legacy.values():
+        conn.execute(text(f"ALTER TABLE {incidents} DROP COLUMN {quoted}"))
+
+    return [f"converted incidents.{', '.join(legacy)} to lookup ids and dropped them"]
+
+
+# ------------------------------------------------------------
+# VALUES : JSONB + COLONNES EXTRAITES
+# ------------------------------------------------------------
+def _convert_values_to_jsonb(conn: Connection, inspector) -> list:
+    column = next(c for c in inspector.get_columns(Incident.__tablename__) if c["name"] == "values")
+    if column["type"].__visit_name__.upper() == "JSONB":
+        return []
+    conn.execute(text(
+        f'ALTER TABLE {_q(conn, Incident.__tablename__)} ALTER COLUMN "values" TYPE JSONB USING "values"::jsonb'
+    ))
+    return ["converted incidents.values to JSONB"]
+
+
+def _is_number(conn: Connection, feature: str):
+    if conn.dialect.name == "postgresql":
+        return func.jsonb_typeof(Incident.values[feature]) == "number"
+    return func.json_type(Incident.values, f'$."{feature}"').in_(("integer", "real"))
+
+
+def _fill_hot_features(conn: Connection) -> list:
+    """Same extraction as features.extract_hot_features, done by the database."""
+    updated = 0
+    for source, features in HOT_FEATURES.items():
+        source_id = select(IncidentSource.id).where(IncidentSource.name == source).scalar_subquery()
+        for feature, column in features.items():
+            target = getattr(Incident, column)
+            updated += conn.execute(
+                update(Incident)
+                .where(Incident.source_id == source_id, target.is_(None), _is_number(conn, feature))
+                .values({column: Incident.values[feature].as_float()})
+            ).rowcount
+    return [f"filled hot-feature columns ({updated} values)"]
+
+
+# ------------------------------------------------------------
+# INDEX ET CONTRAINTES
+# ------------------------------------------------------------
+def _add_missing_indexes(conn: Connection) -> list:
+    # Read after the column changes: dropped legacy indexes are gone
+    present = {i["name"] for i in inspect(conn).get_indexes(Incident.__tablename__)}
+    done = []
+    for index in Incident.__table__.indexes:
+        ddl_if = getattr(index, "_ddl_if", None)   # e.g. the GIN index is PostgreSQL only
+        if index.name in present or (ddl_if is not None and ddl_if.dialect not in (None, conn.dialect.name)):
+            continue
+        if index.unique:
+            done += _clear_duplicate_keys(conn, [c.name for c in index.columns])
+        index.create(conn)
+        done.append(f"created index {index.name}")
+    return done
+
+
+def _clear_duplicate_keys(conn: Connection, columns: list) -> list:
+    """NULLs a unique-to-be key on every row but the oldest one holding it."""
+    incidents = _q(conn, Incident.__tablename__)
+    keys = ", ".join(_q(conn, c) for c in columns)
+    not_null = " AND ".join(f"{_q(conn, c)} IS NOT NULL" for c in columns)
+    cleared = conn.execute(text(
+        f"UPDATE {incidents} SET {', '.join(f'{_q(conn, c)} = NULL' for c in columns)} "
+        f"WHERE {not_null} AND id NOT IN ("
+        f"SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM {incidents} WHERE {not_null} GROUP BY {keys}) AS keep)"
+    )).rowcount
+    return [f"cleared {cleared} duplicate {keys} values"] if cleared else []
+
+
+def _add_check_constraints(conn: Connection, inspector) -> list:
+    present = {c["name"] for c in inspector.get_check_constraints(Incident.__tablename__)}
+    done = []
+    for constraint in Incident.__table__.constraints:
+        if constraint.__visit_name__ != "check_constraint" or constraint.name in present:
+            continue
+        conn.execute(text(
+            f"ALTER TABLE {_q(conn, Incident.__tablename__)} ADD CONSTRAINT {_q(conn, constraint.name)} "
+            f"CHECK ({constraint.sqltext})"
+        ))
+        done.append(f"added constraint {constraint.name}")
+    return done
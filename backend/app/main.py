@@ -1,15 +1,47 @@
+from contextlib import asynccontextmanager
+
 from app.db.base import Base
 from app.db.session import engine
+from app.db.upgrade import upgrade_schema
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.api.router import api_router
 from app.core.config import get_settings
+from app.core.http_cache import ByteCounterMiddleware
+from app.core.scheduler import scheduler
+from app.models.dictionary import dictionary
+from app.services.incident_manager import MESSAGE_TEMPLATES, TYPE_NAMES
+from app.services.jobs import register_jobs
+from app.services.journal import ingest_journal
+from app.services.kpi_counters import kpi_counters
+from app.services.scoring_engine import get_scoring_engine
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB work happens here, not at import: importing the app stays cheap
+    Base.metadata.create_all(bind=engine)
+    dictionary.seed(TYPE_NAMES, MESSAGE_TEMPLATES)   # type ids are the TYPE_CODES used at ingest
+    upgraded = upgrade_schema(engine)   # existing databases: columns create_all does not add
+    # The snapshot is only a stand-in until the first scheduled reconcile: count now
+    # when there is none, when it predates an upgrade, or when no scheduler will run
+    if upgraded or not settings.scheduler_enabled or not kpi_counters.load():
+        kpi_counters.reconcile()
+    if settings.scheduler_enabled:
+        await scheduler.start(engine)
+    yield
+    await scheduler.stop()
+    get_scoring_engine().close()   # scoring worker processes, if a big frame or backfill started them
+    ingest_journal.close()
+
+
 app = FastAPI(
     title=settings.app_name,
-    version=settings.app_version
+    version=settings.app_version,
+    lifespan=lifespan,
 )
 
 # Open CORS — JWT is stored in localStorage (not cookies) so wildcard is safe
@@ -21,9 +53,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Base.metadata.create_all(bind=engine)
+# Compression: the last middleware added is the outermost, so the counters
+# see the body before (bytes_uncompressed) and after (bytes_sent) gzip
+app.add_middleware(ByteCounterMiddleware, key="bytes_uncompressed")
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+app.add_middleware(ByteCounterMiddleware, key="bytes_sent")
+
 app.include_router(api_router)
 
+register_jobs(scheduler)
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
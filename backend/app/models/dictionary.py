@@ -0,0 +1,164 @@
+"""
+Dictionary-encoded incident attributes
+backend/app/models/dictionary.py
+
+Sources, incident types and message templates repeat on every incident, so
+each row only stores small integer ids into these lookup tables; severity is
+a SmallInteger code into SEVERITY_LEVELS. ``dictionary`` keeps both
+directions of every table in memory — ids are never reassigned, so cached
+entries stay valid forever and only an unknown value hits the database
+(one SELECT, then one INSERT if it is really new).
+"""
+
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import Column, Integer, SmallInteger, String
+from sqlalchemy.exc import IntegrityError
+
+from app.db.base import Base
+from app.db.session import SessionLocal
+
+SEVERITY_LEVELS = ("low", "medium", "high", "critical")   # severity_code = position
+SEVERITY_CODES = {name: code for code, name in enumerate(SEVERITY_LEVELS)}
+
+
+class IncidentSource(Base):
+    __tablename__ = "incident_sources"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class IncidentType(Base):
+    __tablename__ = "incident_types"
+
+    id = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String, unique=True, nullable=False)
+
+
+class MessageTemplate(Base):
+    __tablename__ = "message_templates"
+
+    id = Column(Integer, primary_key=True)
+    text = Column(String, unique=True, nullable=False)
+
+
+class _Lookup:
+    """Two-way id <-> value cache over one lookup table, filled on demand."""
+
+    def __init__(self, model, attr: str):
+        self.model = model
+        self.attr = attr
+        self._by_value: dict = {}
+        self._by_id: dict = {}
+        self._lock = Lock()
+
+    def _remember(self, row_id: int, value: str):
+        self._by_value[value] = row_id
+        self._by_id[row_id] = value
+
+    def _load(self):
+        db = SessionLocal()
+        try:
+            for row in db.query(self.model).all():
+                self._remember(row.id, getattr(row, self.attr))
+        finally:
+            db.close()
+
+    def _fetch(self, db, value: str) -> Optional[int]:
+        return db.query(self.model.id).filter(getattr(self.model, self.attr) == value).scalar()
+
+    def id_for(self, value: str, create: bool = True) -> Optional[int]:
+        row_id = self._by_value.get(value)
+        if row_id is not None:
+            return row_id
+
+        with self._lock:
+            if value in self._by_value:
+                return self._by_value[value]
+
+            db = SessionLocal()
+            try:
+                row_id = self._fetch(db, value)   # another worker may have created it
+                if row_id is None and create:
+                    row = self.model(**{self.attr: value})
+                    db.add(row)
+                    try:
+                        db.commit()
+                        row_id = row.id
+                    except IntegrityError:
+                        db.rollback()   # lost the race: read the winner's id
+                        row_id = self._fetch(db, value)
+            finally:
+                db.close()
+            if row_id is not None:
+                self._remember(row_id, value)
+            return row_id
+
+    def value_for(self, row_id: Optional[int]) -> Optional[str]:
+        if row_id is None:
+            return None
+        value = self._by_id.get(row_id)
+        if value is None:
+            with self._lock:
+                db = SessionLocal()
+                try:
+                    row = db.get(self.model, row_id)
+                    value = getattr(row, self.attr) if row is not None else None
+                finally:
+                    db.close()
+                if value is not None:
+                    self._remember(row_id, value)
+        return value
+
+    def seed(self, values_by_id: dict):
+        """Inserts fixed ids (e.g. code-defined enums) that are not in the table yet."""
+        with self._lock:
+            self._load()
+            missing = {i: v for i, v in values_by_id.items() if i not in self._by_id}
+            if missing:
+                db = SessionLocal()
+                try:
+                    db.add_all(self.model(id=i, **{self.attr: v}) for i, v in missing.items())
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()   # seeded concurrently by another worker
+                finally:
+                    db.close()
+                self._load()
+
+    def clear(self):
+        with self._lock:
+            self._by_value.clear()
+            self._by_id.clear()
+
+
+class Dictionary:
+    def __init__(self):
+        self.sources = _Lookup(IncidentSource, "name")
+        self.types = _Lookup(IncidentType, "name")
+        self.messages = _Lookup(MessageTemplate, "text")
+
+    def source_id(self, name: str, create: bool = True) -> Optional[int]:
+        return self.sources.id_for(name, create)
+
+    def source_name(self, source_id: Optional[int]) -> Optional[str]:
+        return self.sources.value_for(source_id)
+
+    def type_name(self, type_code: Optional[int]) -> Optional[str]:
+        return self.types.value_for(type_code)
+
+    def message_id(self, text: str) -> int:
+        return self.messages.id_for(text)
+
+    def message_text(self, message_id: Optional[int]) -> Optional[str]:
+        return self.messages.value_for(message_id)
+
+    def seed(self, type_names, message_texts):
+        self.types.seed(dict(enumerate(type_names)))
+        for text in message_texts:
+            self.messages.id_for(text)
+
+
+dictionary = Dictionary()
@@ -1,16 +1,61 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime
+from sqlalchemy import CheckConstraint, Column, ForeignKey, Index, Integer, SmallInteger, String, Float, JSON, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
 from app.db.base import Base
+from app.models.dictionary import SEVERITY_LEVELS, dictionary
 from datetime import datetime
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        CheckConstraint("severity_code BETWEEN 0 AND 3", name="ck_incidents_severity_code"),
+        # Containment queries (values @> '{"deadlocks": 0}'); jsonb_path_ops keeps the index small
+        Index(
+            "ix_incidents_values_gin", "values",
+            postgresql_using="gin", postgresql_ops={"values": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_incidents_source_latency", "source_id", "latency_ms"),
+        # Report and chart range scans (timestamp BETWEEN start AND end)
+        Index("ix_incidents_timestamp", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    source = Column(String, index=True)
-    values = Column(JSON)
+    values = Column(JSON().with_variant(JSONB(), "postgresql"))   # JSONB does not keep key order
     score = Column(Float)
     is_anomaly = Column(Integer)  # 0 or 1
-    severity = Column(String)
-    type = Column(String)
-    message = Column(String)
+    contributions = Column(JSON, nullable=True)   # top features by z-score (anomalies only)
+
+    # Dictionary-encoded attributes (see app/models/dictionary.py); the string
+    # properties below resolve them so API payloads are unchanged
+    source_id = Column(Integer, ForeignKey("incident_sources.id"), index=True)
+    severity_code = Column(SmallInteger, index=True)   # position in SEVERITY_LEVELS
+    type_code = Column(SmallInteger, ForeignKey("incident_types.id"))
+    message_id = Column(Integer, ForeignKey("message_templates.id"))
+    # Hot features copied out of values at insert (see services/features.py)
+    latency_ms = Column(Float, nullable=True)
+    error_pct = Column(Float, nullable=True)
+    amount = Column(Float, nullable=True)
+
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
+
+    # Correlation: children point at the first incident of their group, which
+    # carries the occurrence counter and the time of the latest occurrence
+    parent_id = Column(Integer, index=True, nullable=True)
+    occurrences = Column(Integer, default=1)
+    last_seen = Column(DateTime, nullable=True)
+
+    @property
+    def source(self):
+        return dictionary.source_name(self.source_id)
+
+    @property
+    def severity(self):
+        return SEVERITY_LEVELS[self.severity_code] if self.severity_code is not None else None
+
+    @property
+    def type(self):
+        return dictionary.type_name(self.type_code)
+
+    @property
+    def message(self):
+        return dictionary.message_text(self.message_id)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, JSON, DateTime
+from app.db.base import Base
+from datetime import datetime
+
+class JobState(Base):
+    """Small key/value store for background job checkpoints and snapshots."""
+    __tablename__ = "job_states"
+
+    name = Column(String, primary_key=True)
+    state = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
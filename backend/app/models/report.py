@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from app.db.base import Base
+from datetime import datetime
+
+class ReportArtifact(Base):
+    """Metadata of a pre-rendered PDF report kept in the reports store."""
+    __tablename__ = "report_artifacts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String, index=True)
+    start_date = Column(DateTime)
+    end_date = Column(DateTime)
+    path = Column(String)
+    size_bytes = Column(Integer)
+    generation_ms = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
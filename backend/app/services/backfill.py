@@ -0,0 +1,232 @@
+"""
+Historical re-scoring (backfill) after a detector or threshold change
+backend/app/services/backfill.py
+
+Incidents are streamed in id order (keyset pagination, never OFFSET), scored
+in one vectorized call per chunk, and only rows whose score/flag/severity
+actually changed are written back with a bulk UPDATE. The last processed id
+is committed in the same transaction as the chunk, so a stopped or crashed
+job resumes exactly where it left off.
+
+Only sources scored by the IsolationForest backend are re-scored. The
+statistical backends score against a baseline that moves with live ingest
+(and learn from what they score), so replaying history through them would
+neither reproduce past scores nor leave the live baselines intact; those
+rows are skipped and counted per source in ``skipped_sources``.
+"""
+
+import time
+from datetime import datetime
+from threading import Lock, Thread
+from typing import Optional
+
+from app.db.session import SessionLocal
+from app.models.dictionary import dictionary
+from app.models.incident import Incident
+from app.models.job_state import JobState
+from app.services.detectors import IsolationForestDetector, detector_registry, feature_matrix
+from app.services.incident_manager import IncidentManager
+from app.services.kpi_counters import kpi_counters
+from app.services.scoring_engine import ScoringEngine
+from app.services.storage import notify_change
+from app.services.watermark import data_watermark
+
+CHECKPOINT_NAME = "backfill"
+
+
+class BackfillJob:
+    def __init__(self, engine: ScoringEngine, incident_manager: Optional[IncidentManager] = None):
+        self.engine = engine
+        self.incident_manager = incident_manager or IncidentManager()
+        self.thread: Optional[Thread] = None
+        self._control_lock = Lock()
+        self.state = {
+            "running": False,
+            "processed": 0,
+            "updated": 0,
+            "skipped": 0,
+            "skipped_sources": {},
+            "last_id": 0,
+            "target_id": 0,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "settings": {},
+        }
+
+    # ------------------------------------------------------------
+    # CONTROL
+    # ------------------------------------------------------------
+    def start(self, chunk_size: int = 1000, max_rows_per_sec: int = 2000, restart: bool = False) -> bool:
+        with self._control_lock:
+            # A stopped job keeps its thread until the current chunk and checkpoint are written
+            if self.state["running"] or (self.thread is not None and self.thread.is_alive()):
+                return False
+
+            self.state.update({
+                "running": True,
+                "processed": 0,
+                "updated": 0,
+                "skipped": 0,
+                "skipped_sources": {},
+                "started_at": datetime.utcnow().isoformat(),
+                "finished_at": None,
+                "error": None,
+                "settings": {"chunk_size": chunk_size, "max_rows_per_sec": max_rows_per_sec},
+            })
+            self.thread = Thread(
+                target=self._run,
+                args=(chunk_size, max_rows_per_sec, restart),
+                name="incident-backfill",
+                daemon=True,
+            )
+            self.thread.start()
+        return True
+
+    def stop(self) -> bool:
+        if not self.state["running"]:
+            return False
+        self.state["running"] = False
+        return True
+
+    def status(self) -> dict:
+        target = self.state["target_id"]
+        progress = min(self.state["last_id"] / target, 1.0) if target else 0.0
+        return {**self.state, "progress_pct": round(progress * 100, 1)}
+
+    # ------------------------------------------------------------
+    # WORKER
+    # ------------------------------------------------------------
+    def _run(self, chunk_size: int, max_rows_per_sec: int, restart: bool):
+        db = SessionLocal()
+        try:
+            checkpoint = db.get(JobState, CHECKPOINT_NAME)
+            # A finished run starts over; an interrupted one resumes
+            resume = checkpoint is not None and not checkpoint.state.get("completed") and not restart
+            last_id = checkpoint.state.get("last_id", 0) if resume else 0
+
+            # Rows inserted after this point are scored live with the current model
+            target_id = db.query(Incident.id).order_by(Incident.id.desc()).limit(1).scalar() or 0
+            self.state["last_id"] = last_id
+            self.state["target_id"] = target_id
+
+            while self.state["running"] and last_id < target_id:
+                chunk_started = time.perf_counter()
+
+                rows = db.query(
+                    Incident.id, Incident.source_id, Incident.timestamp, Incident.values,
+                    Incident.score, Incident.is_anomaly, Incident.severity_code,
+                ).filter(
+                    Incident.id > last_id,
+                    Incident.id <= target_id,
+                ).order_by(Incident.id).limit(chunk_size).all()
+
+                if not rows:
+                    last_id = target_id
+                    break
+
+                mappings = self._rescore_chunk(rows)
+                if mappings:
+                    db.bulk_update_mappings(Incident, mappings)
+
+                last_id = rows[-1].id
+                self._save_checkpoint(db, last_id)
+
+                self.state["processed"] += len(rows)
+                self.state["updated"] += len(mappings)
+                self.state["last_id"] = last_id
+
+                # Throttle: never exceed max_rows_per_sec so live ingest keeps the DB
+                if max_rows_per_sec > 0:
+                    budget = len(rows) / max_rows_per_sec
+                    remaining = budget - (time.perf_counter() - chunk_started)
+                    if remaining > 0:
+                        time.sleep(remaining)
+
+            if last_id >= target_id:
+                self._save_checkpoint(db, last_id, completed=True)
+                self.state["last_id"] = last_id
+
+            # Severities changed under the incremental counters
+            if self.state["updated"]:
+                kpi_counters.reconcile()
+                data_watermark.bump()
+                notify_change("update")
+
+        except Exception as e:
+            db.rollback()
+            self.state["error"] = str(e)
+            print(f"Backfill error: {e}")
+        finally:
+            db.close()
+            self.state["running"] = False
+            self.state["finished_at"] = datetime.utcnow().isoformat()
+
+    def _rescore_chunk(self, rows) -> list:
+        rows = self._isolation_forest_rows(rows)
+
+        # The detector is fitted for a fixed feature count; rows with another
+        # shape cannot be scored by it and are left untouched.
+        sample = next((r.values for r in rows if r.values), None)
+        if sample is None:
+            self.state["skipped"] += len(rows)
+            return []
+        self.engine.detector.fit_for_features(len(sample))
+        feature_count = self.engine.detector.model.n_features_in_
+        scorable = [r for r in rows if r.values and len(r.values) == feature_count]
+        self.state["skipped"] += len(rows) - len(scorable)
+        if not scorable:
+            return []
+
+        matrix = feature_matrix([r.values for r in scorable])
+        scores, flags = self.engine.predict(matrix)
+
+        incidents = self.incident_manager.create_incidents(
+            [{"timestamp": r.timestamp, "source": dictionary.source_name(r.source_id), "values": r.values}
+             for r in scorable],
+            scores, flags,
+        )
+
+        mappings = []
+        for row, incident in zip(scorable, incidents):
+            if (
+                row.score is None
+                or abs(row.score - incident["score"]) > 1e-9
+                or bool(row.is_anomaly) != incident["is_anomaly"]
+                or row.severity_code != incident["severity_code"]
+            ):
+                mappings.append({
+                    "id": row.id,
+                    "score": incident["score"],
+                    "is_anomaly": 1 if incident["is_anomaly"] else 0,
+                    "severity_code": incident["severity_code"],
+                    "message_id": dictionary.message_id(incident["message"]),
+                    "type_code": incident["type_code"],
+                })
+        return mappings
+
+    def _isolation_forest_rows(self, rows) -> list:
+        kept = []
+        skipped = self.state["skipped_sources"]
+        for row in rows:
+            source = dictionary.source_name(row.source_id)
+            backend = detector_registry.backend_for(source)
+            if backend == IsolationForestDetector.name:
+                kept.append(row)
+            else:
+                entry = skipped.setdefault(source, {"backend": backend, "rows": 0})
+                entry["rows"] += 1
+        self.state["skipped"] += len(rows) - len(kept)
+        return kept
+
+    def _save_checkpoint(self, db, last_id: int, completed: bool = False):
+        checkpoint = db.get(JobState, CHECKPOINT_NAME)
+        if checkpoint is None:
+            checkpoint = JobState(name=CHECKPOINT_NAME)
+            db.add(checkpoint)
+        checkpoint.state = {
+            "last_id": last_id,
+            "completed": completed,
+            "saved_at": datetime.utcnow().isoformat(),
+        }
+        db.commit()
@@ -0,0 +1,168 @@
+"""
+Incident correlation — groups related anomalies into parent incidents
+backend/app/services/correlation.py
+
+Anomalous incidents with the same correlation key arriving within a sliding
+window belong to one group. The key is (source, type), or a shared group key
+for sources configured to co-occur (e.g. sensor-api + sensor-database). Open
+groups sit in a dict keyed by correlation key, so matching is O(1) per
+incident whatever the table size.
+
+The first incident of a group is the parent. Later ones are stored with
+``parent_id`` set and only bump the parent's occurrence counter; they are
+alerted on only when they escalate the group's severity.
+
+Usage on the write path:
+    correlation_engine.attach(incident)          # before insert: link to an open group
+    ids = storage.save...(incidents)             # registers the rows and writes the
+                                                 # parent counters in the insert transaction
+
+``escalated`` is set on the incident dict for the notifier only; callers
+returning the dict drop it first.
+"""
+
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+from app.core import runtime_config
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+class _OpenGroup:
+    __slots__ = ("parent_id", "count", "max_rank", "last_seen", "last_seen_ts")
+
+    def __init__(self, parent_id: int, rank: int, now: float, ts):
+        self.parent_id = parent_id
+        self.count = 1
+        self.max_rank = rank
+        self.last_seen = now
+        self.last_seen_ts = ts
+
+
+class CorrelationEngine:
+    def __init__(self, config: dict):
+        self.config = config
+        self._groups: dict = {}
+        self._lock = Lock()
+        self.stats = {"groups_opened": 0, "correlated": 0, "escalations": 0}
+
+    def _key(self, incident: dict) -> Optional[tuple]:
+        if not self.config.get("enabled", True) or not incident.get("is_anomaly"):
+            return None
+        source = incident["source"]
+        for index, group in enumerate(self.config.get("source_groups", [])):
+            if source in group:
+                return ("group", index)
+        return (source, incident["type"])
+
+    def _open_group(self, key: tuple, now: float) -> Optional[_OpenGroup]:
+        group = self._groups.get(key)
+        if group is not None and now - group.last_seen > self.config.get("window_s", 300):
+            del self._groups[key]
+            return None
+        return group
+
+    # ------------------------------------------------------------
+    # WRITE PATH
+    # ------------------------------------------------------------
+    def attach(self, incident: dict) -> None:
+        """Sets ``parent_id`` and ``escalated`` on an incident about to be stored."""
+        incident["parent_id"] = None
+        incident["escalated"] = False
+        key = self._key(incident)
+        if key is None:
+            return
+
+        with self._lock:
+            group = self._open_group(key, time.monotonic())
+            if group is not None:
+                incident["parent_id"] = group.parent_id
+                incident["escalated"] = SEVERITY_RANK.get(incident["severity"], 0) > group.max_rank
+
+    def register(self, incidents: list, ids: list) -> tuple:
+        """
+        Records stored incidents in the window index.
+
+        Returns (links, occurrences): ``links`` maps incident id -> parent id for
+        rows that joined a group opened earlier in the same batch (stored
+        without a parent), ``occurrences`` maps parent id -> (new events, last
+        timestamp) for the parent rows' counters.
+        """
+        links = {}
+        occurrences = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for incident, incident_id in zip(incidents, ids):
+                key = self._key(incident)
+                if key is None:
+                    continue
+                rank = SEVERITY_RANK.get(incident["severity"], 0)
+                group = self._open_group(key, now)
+
+                if group is None and incident.get("parent_id") is None:
+                    self._groups[key] = _OpenGroup(incident_id, rank, now, incident["timestamp"])
+                    self.stats["groups_opened"] += 1
+                    continue
+
+                if incident.get("parent_id") is None:
+                    links[incident_id] = group.parent_id
+                    incident["parent_id"] = group.parent_id
+                    incident["escalated"] = rank > group.max_rank
+
+                # The group may have closed since attach(); the row still counts
+                # towards the parent it was stored with
+                if group is not None and group.parent_id == incident["parent_id"]:
+                    group.count += 1
+                    group.max_rank = max(group.max_rank, rank)
+                    group.last_seen = now
+                    group.last_seen_ts = incident["timestamp"]
+
+                if incident["escalated"]:
+                    self.stats["escalations"] += 1
+                self.stats["correlated"] += 1
+
+                parent_id = incident["parent_id"]
+                delta, _ = occurrences.get(parent_id, (0, None))
+                occurrences[parent_id] = (delta + 1, incident["timestamp"])
+
+        return links, occurrences
+
+    # ------------------------------------------------------------
+    # MAINTENANCE
+    # ------------------------------------------------------------
+    def prune(self) -> int:
+        """Drops groups whose window has elapsed; returns how many were closed."""
+        now = time.monotonic()
+        window = self.config.get("window_s", 300)
+        with self._lock:
+            expired = [k for k, g in self._groups.items() if now - g.last_seen > window]
+            for key in expired:
+                del self._groups[key]
+        return len(expired)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._groups.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                "open_groups": [
+                    {
+                        "key": list(key),
+                        "parent_id": g.parent_id,
+                        "occurrences": g.count,
+                        "last_seen": g.last_seen_ts.isoformat()
+                        if isinstance(g.last_seen_ts, datetime) else g.last_seen_ts,
+                    }
+                    for key, g in self._groups.items()
+                ],
+            }
+
+
+correlation_engine = CorrelationEngine(runtime_config.correlation_config)
@@ -0,0 +1,82 @@
+"""
+Pluggable anomaly detector backends
+backend/app/services/detectors/__init__.py
+
+The backend used for each source comes from runtime_config.detector_config:
+cheap, well-behaved sources can use the O(1) statistical detectors and only
+the complex ones pay for the tree ensemble. The IsolationForest instance is
+shared by every source; statistical detectors keep one baseline per source.
+"""
+
+from functools import partial
+from threading import Lock
+from typing import Dict, Tuple
+
+from app.core import runtime_config
+from app.services.detectors.base import BaseDetector, feature_matrix, feature_names, feature_vector, utc_epoch
+from app.services.detectors.ewma import EwmaDetector
+from app.services.detectors.isolation_forest import IsolationForestDetector
+from app.services.detectors.robust_z import RobustZDetector
+
+DETECTOR_BACKENDS = {
+    IsolationForestDetector.name: IsolationForestDetector,
+    RobustZDetector.name: RobustZDetector,
+    EwmaDetector.name: EwmaDetector,
+    "ewma_seasonal": partial(EwmaDetector, seasonal=True),   # one baseline per hour of day
+}
+
+
+class DetectorRegistry:
+    def __init__(self, config: dict):
+        self.config = config
+        self.isolation_forest = IsolationForestDetector()
+        self._instances: Dict[Tuple[str, str], BaseDetector] = {}
+        self._lock = Lock()
+
+    def backend_for(self, source: str) -> str:
+        return self.config.get("sources", {}).get(source, self.config.get("default", IsolationForestDetector.name))
+
+    def for_source(self, source: str) -> BaseDetector:
+        backend = self.backend_for(source)
+        if backend == IsolationForestDetector.name:
+            return self.isolation_forest
+
+        key = (source, backend)
+        detector = self._instances.get(key)
+        if detector is None:
+            with self._lock:
+                detector = self._instances.get(key)
+                if detector is None:
+                    detector = self._instances[key] = DETECTOR_BACKENDS[backend]()
+        return detector
+
+    def reset(self):
+        """Forgets every statistical baseline (e.g. after a purge or a config change)."""
+        with self._lock:
+            self._instances.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "config": self.config,
+            "baselines": [
+                {"source": source, "backend": backend, "samples": getattr(d, "count", None)}
+                for (source, backend), d in list(self._instances.items())
+            ],
+        }
+
+
+detector_registry = DetectorRegistry(runtime_config.detector_config)
+
+__all__ = [
+    "BaseDetector",
+    "DETECTOR_BACKENDS",
+    "DetectorRegistry",
+    "EwmaDetector",
+    "IsolationForestDetector",
+    "RobustZDetector",
+    "detector_registry",
+    "feature_matrix",
+    "feature_names",
+    "feature_vector",
+    "utc_epoch",
+]
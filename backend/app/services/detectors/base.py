@@ -0,0 +1,106 @@
+"""
+Detector interface
+backend/app/services/detectors/base.py
+
+Every backend scores a (n_points, n_features) matrix in one call and follows
+the IsolationForest ``decision_function`` convention, so severity thresholds
+and the ``score < 0`` anomaly rule work unchanged whatever the backend:
+positive = normal, negative = anomalous, and roughly -0.05 / -0.10 / -0.20
+for medium / high / critical deviations.
+
+Features are always laid out in sorted name order (``feature_vector``):
+JSONB does not keep key order and frames carry their own column order, so
+a row scored at ingest and re-scored by the backfill sees the same columns.
+"""
+
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+
+
+def feature_names(values: dict) -> list:
+    return sorted(values)
+
+
+def feature_vector(values: dict) -> list:
+    return [values[name] for name in sorted(values)]
+
+
+def feature_matrix(rows: list) -> np.ndarray:
+    """(n_rows, n_features) matrix of values dicts that share the same keys."""
+    return np.array([feature_vector(values) for values in rows], dtype=np.float64)
+
+
+def utc_epoch(ts: datetime) -> float:
+    """Epoch seconds of a timestamp; naive datetimes are UTC, as everywhere in the app."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class BaseDetector:
+    name = "base"
+
+    def score_batch(self, matrix: np.ndarray, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scores every row; ``timestamps`` (epoch seconds) is only used by seasonal backends."""
+        raise NotImplementedError
+
+    def predict_batch(self, matrix: np.ndarray, timestamps: Optional[np.ndarray] = None) -> tuple:
+        scores = self.score_batch(matrix, timestamps)
+        return scores, scores < 0
+
+    def predict(self, values: dict, timestamp: Optional[float] = None) -> dict:
+        matrix = feature_matrix([values])
+        timestamps = np.array([timestamp]) if timestamp is not None else None
+        score = float(self.score_batch(matrix, timestamps)[0])
+        return {"score": score, "is_anomaly": score < 0}
+
+
+def deviation_to_score(deviation: np.ndarray, threshold: float, scale: float = 0.1) -> np.ndarray:
+    """Maps a per-row deviation (in robust std units) onto the decision_function scale.
+
+    deviation == threshold scores 0; 1.5x / 2x / 3x the threshold score
+    -0.05 / -0.10 / -0.20 with the default scale.
+    """
+    return np.clip(scale * (1.0 - deviation / threshold), -1.0, scale)
+
+
+class StreamingDetector(BaseDetector):
+    """Stateful statistical detector: scores against its baseline, then learns from the normal rows."""
+
+    def __init__(self, threshold: float, min_samples: int):
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.count = 0
+        self._lock = Lock()   # ingest requests for one source run concurrently
+
+    def _deviation(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _learn(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> None:
+        raise NotImplementedError
+
+    def score_batch(self, matrix: np.ndarray, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        with self._lock:
+            return self._score_and_learn(matrix, timestamps)
+
+    def _score_and_learn(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> np.ndarray:
+        if self.count < self.min_samples:
+            # Warm-up: learn from the batch as-is; a batch big enough to form a
+            # baseline on its own is then scored against it, smaller ones are normal
+            self._learn(matrix, timestamps)
+            self.count += len(matrix)
+            if self.count < self.min_samples:
+                return np.full(len(matrix), 0.1)
+            return deviation_to_score(self._deviation(matrix, timestamps), self.threshold)
+
+        scores = deviation_to_score(self._deviation(matrix, timestamps), self.threshold)
+
+        normal = scores >= 0
+        if normal.any():
+            self._learn(matrix[normal], timestamps[normal] if timestamps is not None else None)
+            self.count += int(normal.sum())
+        return scores
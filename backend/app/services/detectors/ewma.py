@@ -0,0 +1,66 @@
+"""
+EWMA / seasonal baseline backend
+backend/app/services/detectors/ewma.py
+
+Exponentially weighted mean and variance per feature, optionally one
+baseline per hour of day (``seasonal``) when timestamps are available.
+Each batch is scored against the current baseline and then folded in as a
+single EWMA step weighted by its size, so scoring stays O(1) per point.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from app.services.detectors.base import StreamingDetector
+
+SLOTS = 24
+
+
+class EwmaDetector(StreamingDetector):
+    name = "ewma"
+
+    def __init__(self, alpha: float = 0.02, threshold: float = 4.0, min_samples: int = 30,
+                 seasonal: bool = False):
+        super().__init__(threshold, min_samples)
+        self.alpha = alpha
+        self.seasonal = seasonal
+        self.mean: Optional[np.ndarray] = None   # (slots, n_features)
+        self.var: Optional[np.ndarray] = None
+        self.seen: Optional[np.ndarray] = None   # points per slot
+
+    def _slots(self, n_rows: int, timestamps: Optional[np.ndarray]) -> np.ndarray:
+        if not self.seasonal or timestamps is None:
+            return np.zeros(n_rows, dtype=int)
+        return np.array([datetime.utcfromtimestamp(float(ts)).hour for ts in timestamps], dtype=int)
+
+    def _deviation(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> np.ndarray:
+        slots = self._slots(len(matrix), timestamps)
+        # An hour without enough history is scored against the best-known hour
+        slots = np.where(self.seen[slots] >= self.min_samples, slots, int(np.argmax(self.seen)))
+        std = np.sqrt(self.var[slots])
+        std = np.where(std > 0, std, np.maximum(np.abs(self.mean[slots]) * 0.01, 1e-9))
+        return np.abs((matrix - self.mean[slots]) / std).max(axis=1)
+
+    def _learn(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> None:
+        n_slots = SLOTS if self.seasonal else 1
+        if self.mean is None or self.mean.shape[1] != matrix.shape[1]:
+            self.mean = np.zeros((n_slots, matrix.shape[1]))
+            self.var = np.zeros((n_slots, matrix.shape[1]))
+            self.seen = np.zeros(n_slots, dtype=int)
+
+        slots = self._slots(len(matrix), timestamps)
+        for slot in np.unique(slots):
+            rows = matrix[slots == slot]
+            k = len(rows)
+            if self.seen[slot] == 0:
+                self.mean[slot] = rows.mean(axis=0)
+                self.var[slot] = rows.var(axis=0)
+            else:
+                # k single-point EWMA steps collapse into one step of weight 1-(1-alpha)^k
+                weight = 1.0 - (1.0 - self.alpha) ** k
+                delta = rows.mean(axis=0) - self.mean[slot]
+                self.mean[slot] += weight * delta
+                self.var[slot] = (1.0 - weight) * (self.var[slot] + weight * delta ** 2) + weight * rows.var(axis=0)
+            self.seen[slot] += k
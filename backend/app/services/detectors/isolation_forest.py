@@ -0,0 +1,58 @@
+"""
+IsolationForest backend
+backend/app/services/detectors/isolation_forest.py
+
+scikit-learn is imported on the first fit, not at application start-up.
+"""
+
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+from app.services.detectors.base import BaseDetector, feature_matrix
+
+
+class IsolationForestDetector(BaseDetector):
+    name = "isolation_forest"
+
+    def __init__(self):
+        self.model = None
+        self.fitted = False
+        self._fit_lock = Lock()
+
+    def fit_if_needed(self, values: dict):
+        self.fit_for_features(len(values))
+
+    def fit_for_features(self, feature_count: int):
+        # Train model dynamically based on number of features
+        if self.fitted:
+            return
+        with self._fit_lock:
+            if self.fitted:
+                return   # fitted by a concurrent request meanwhile
+            from sklearn.ensemble import IsolationForest
+
+            X = np.random.normal(0, 1, (300, feature_count))
+            model = IsolationForest(n_estimators=100, contamination=0.1)
+            model.fit(X)
+            # Published only once fitted: concurrent requests never score a half-built model
+            self.model = model
+            self.fitted = True
+
+    def predict(self, values: dict, timestamp: Optional[float] = None) -> dict:
+        self.fit_if_needed(values)
+
+        features = feature_matrix([values])
+
+        score = float(self.model.decision_function(features)[0])
+        prediction = int(self.model.predict(features)[0])  # -1 or 1
+
+        return {
+            "score": score,
+            "is_anomaly": bool(prediction == -1)
+        }
+
+    def score_batch(self, matrix: np.ndarray, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scores a (n_points, n_features) matrix in one decision_function call."""
+        self.fit_for_features(matrix.shape[1])
+        return self.model.decision_function(matrix)
@@ -0,0 +1,51 @@
+"""
+Streaming robust z-score (median / MAD) backend
+backend/app/services/detectors/robust_z.py
+
+Keeps the last ``window`` normal points per feature in a ring buffer; the
+median and MAD are recomputed once per batch, so the cost per point is
+constant and tiny compared to the tree ensemble. A row's deviation is its
+largest robust z-score across features.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from app.services.detectors.base import StreamingDetector
+
+MAD_TO_STD = 1.4826      # MAD of a normal distribution → standard deviation
+MEANAD_TO_STD = 1.2533   # same for the mean absolute deviation
+
+
+class RobustZDetector(StreamingDetector):
+    name = "robust_z"
+
+    def __init__(self, window: int = 512, threshold: float = 3.5, min_samples: int = 30):
+        super().__init__(threshold, min_samples)
+        self.window = window
+        self._buffer: Optional[np.ndarray] = None
+        self._pos = 0
+        self._filled = 0
+
+    def _deviation(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> np.ndarray:
+        history = self._buffer[: self._filled]
+        median = np.median(history, axis=0)
+        abs_dev = np.abs(history - median)
+        scale = np.median(abs_dev, axis=0) * MAD_TO_STD
+        # MAD is 0 for mostly-constant features (e.g. 0/1 flags): use the mean
+        # absolute deviation there, and a tiny floor for truly constant ones
+        mean_ad = abs_dev.mean(axis=0) * MEANAD_TO_STD
+        scale = np.where(scale > 0, scale, mean_ad)
+        scale = np.where(scale > 0, scale, np.maximum(np.abs(median) * 0.01, 1e-9))
+        return np.abs((matrix - median) / scale).max(axis=1)
+
+    def _learn(self, matrix: np.ndarray, timestamps: Optional[np.ndarray]) -> None:
+        if self._buffer is None or self._buffer.shape[1] != matrix.shape[1]:
+            self._buffer = np.zeros((self.window, matrix.shape[1]))
+            self._pos = self._filled = 0
+        rows = matrix[-self.window:]
+        idx = (self._pos + np.arange(len(rows))) % self.window
+        self._buffer[idx] = rows
+        self._pos = (self._pos + len(rows)) % self.window
+        self._filled = min(self.window, self._filled + len(rows))
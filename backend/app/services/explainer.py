@@ -0,0 +1,152 @@
+"""
+Per-feature explanations for anomaly scores
+backend/app/services/explainer.py
+
+The IsolationForest score says *how* anomalous a point is, not *why*. Each
+scored matrix is compared column-wise with a running per-source baseline
+(Welford mean/variance, updated from the points judged normal), and the
+features with the largest |z-score| are stored with anomalous incidents and
+shown in notifications.
+
+Explaining is one extra vectorized pass over the matrix that was just
+scored. Its cost is tracked against the scoring time: when the smoothed
+ratio exceeds ``budget_ratio`` explanations are suspended for a while and
+incidents simply carry no contributions.
+"""
+
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.detectors.base import feature_matrix, feature_names
+
+
+class FeatureBaseline:
+    """Running mean/variance of a feature vector, merged batch by batch (Chan et al.)."""
+
+    def __init__(self, n_features: int):
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    def update(self, matrix: np.ndarray):
+        k = len(matrix)
+        if k == 0:
+            return
+        batch_mean = matrix.mean(axis=0)
+        batch_m2 = ((matrix - batch_mean) ** 2).sum(axis=0)
+        delta = batch_mean - self.mean
+        total = self.count + k
+        self.mean += delta * (k / total)
+        self.m2 += batch_m2 + delta ** 2 * (self.count * k / total)
+        self.count = total
+
+    def std(self) -> np.ndarray:
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return np.sqrt(self.m2 / (self.count - 1))
+
+
+class Explainer:
+    def __init__(self, enabled: bool = True, top_k: int = 3, min_samples: int = 30,
+                 budget_ratio: float = 0.10, suspend_s: float = 60.0, max_baselines: int = 1000,
+                 min_cost_s: float = 0.0005):
+        self.enabled = enabled
+        self.top_k = top_k
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        self.suspend_s = suspend_s
+        self.max_baselines = max_baselines
+        # Below this a call is noise next to the DB insert, whatever the ratio
+        # (statistical detectors score in microseconds)
+        self.min_cost_s = min_cost_s
+
+        self._baselines: Dict[Tuple[str, Tuple[str, ...]], FeatureBaseline] = {}
+        self._lock = Lock()
+        self._cost_ratio = 0.0          # EWMA of explain time / scoring time
+        self._suspended_until = 0.0
+        self.stats = {"explained": 0, "skipped_over_budget": 0, "suspensions": 0}
+
+    # ------------------------------------------------------------
+    # EXPLAIN
+    # ------------------------------------------------------------
+    def explain_batch(self, source: str, feature_names: Sequence[str], matrix: np.ndarray,
+                      is_anomaly: np.ndarray, scoring_s: float) -> List[Optional[dict]]:
+        """Top contributing features for each anomalous row (None for normal rows)."""
+        n_rows = len(matrix)
+        if not self.enabled or n_rows == 0:
+            return [None] * n_rows
+        if time.monotonic() < self._suspended_until:
+            self.stats["skipped_over_budget"] += n_rows
+            return [None] * n_rows
+
+        started = time.perf_counter()
+        is_anomaly = np.asarray(is_anomaly, dtype=bool)
+        key = (source, tuple(feature_names))
+
+        with self._lock:
+            baseline = self._baselines.get(key)
+            if baseline is None:
+                if len(self._baselines) >= self.max_baselines:
+                    return [None] * n_rows
+                baseline = self._baselines[key] = FeatureBaseline(matrix.shape[1])
+
+            ready = baseline.count >= self.min_samples
+            if ready:
+                std = baseline.std()
+                z = (matrix - baseline.mean) / np.where(std > 0, std, 1.0)
+            # Anomalies would drag the baseline towards themselves
+            baseline.update(matrix[~is_anomaly])
+
+        contributions: List[Optional[dict]] = [None] * n_rows
+        if ready and is_anomaly.any():
+            rows = np.flatnonzero(is_anomaly)
+            k = min(self.top_k, matrix.shape[1])
+            top = np.argsort(-np.abs(z[rows]), axis=1)[:, :k]
+            for row, cols in zip(rows.tolist(), top.tolist()):
+                contributions[row] = {feature_names[c]: round(float(z[row, c]), 2) for c in cols}
+            self.stats["explained"] += len(rows)
+
+        self._charge(time.perf_counter() - started, scoring_s)
+        return contributions
+
+    def explain_one(self, source: str, values: dict, is_anomaly: bool, scoring_s: float) -> Optional[dict]:
+        matrix = feature_matrix([values])
+        return self.explain_batch(source, feature_names(values), matrix, np.array([is_anomaly]), scoring_s)[0]
+
+    # ------------------------------------------------------------
+    # BUDGET
+    # ------------------------------------------------------------
+    def _charge(self, explain_s: float, scoring_s: float):
+        ratio = explain_s / scoring_s if scoring_s > 0 and explain_s > self.min_cost_s else 0.0
+        self._cost_ratio = 0.9 * self._cost_ratio + 0.1 * ratio
+        if self._cost_ratio > self.budget_ratio:
+            self._suspended_until = time.monotonic() + self.suspend_s
+            self._cost_ratio = 0.0
+            self.stats["suspensions"] += 1
+            print(f"Explanations suspended for {self.suspend_s:.0f}s: over {self.budget_ratio:.0%} of scoring time")
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "suspended": time.monotonic() < self._suspended_until,
+            "cost_ratio": round(self._cost_ratio, 4),
+            "budget_ratio": self.budget_ratio,
+            "baselines": len(self._baselines),
+            **self.stats,
+        }
+
+
+def format_contributions(contributions: Optional[dict]) -> str:
+    return ", ".join(f"{name} (z={z:+.1f})" for name, z in (contributions or {}).items())
+
+
+_settings = get_settings()
+explainer = Explainer(
+    enabled=_settings.explain_enabled,
+    top_k=_settings.explain_top_k,
+    budget_ratio=_settings.explain_budget_ratio,
+)
@@ -0,0 +1,100 @@
+"""
+Per-feature analytics on incident values
+backend/app/services/features.py
+
+``Incident.values`` is JSONB on PostgreSQL (GIN-indexed for containment
+queries). A few hot features are also copied at insert time into typed,
+indexed columns shared across sources — e.g. ``latency_ms`` holds
+``response_time_ms`` for sensor-api and ``query_time_ms`` for
+sensor-database — so the common aggregations never touch the JSON at all.
+Any other feature is aggregated server-side straight from the JSON.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.dictionary import dictionary
+from app.models.incident import Incident
+
+# source → {feature name in values: extracted column on Incident}
+HOT_FEATURES = {
+    "sensor-payment":  {"response_time_ms": "latency_ms", "amount": "amount"},
+    "sensor-api":      {"response_time_ms": "latency_ms", "error_rate_pct": "error_pct"},
+    "sensor-database": {"query_time_ms": "latency_ms"},
+    "sensor-mail":     {"send_time_ms": "latency_ms"},
+    "sensor-checkout": {"cart_value": "amount"},
+    "sensor-search":   {"query_time_ms": "latency_ms"},
+}
+EXTRACTED_COLUMNS = ("latency_ms", "error_pct", "amount")
+
+
+def extract_hot_features(source: str, values: Optional[dict]) -> dict:
+    """Typed column values for an incident row (None when the feature is absent)."""
+    row = dict.fromkeys(EXTRACTED_COLUMNS)
+    if not values:
+        return row
+    for feature, column in HOT_FEATURES.get(source, {}).items():
+        value = values.get(feature)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            row[column] = float(value)
+    return row
+
+
+def feature_expr(feature: str, source: Optional[str] = None):
+    """Column expression for a feature: the extracted column if there is one, else the JSON value."""
+    column = HOT_FEATURES.get(source, {}).get(feature)
+    if column is not None:
+        return getattr(Incident, column)
+    return Incident.values[feature].as_float()
+
+
+def aggregate_feature(db: Session, feature: str, source: Optional[str] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+    """count/avg/min/max of one feature, computed by the database."""
+    expr = feature_expr(feature, source)
+    query = db.query(
+        func.count(expr), func.avg(expr), func.min(expr), func.max(expr)
+    ).filter(expr.isnot(None))
+
+    if source is not None:
+        source_id = dictionary.source_id(source, create=False)
+        if source_id is None:
+            return {"feature": feature, "source": source, "count": 0, "avg": None, "min": None, "max": None}
+        query = query.filter(Incident.source_id == source_id)
+    if start is not None:
+        query = query.filter(Incident.timestamp >= start)
+    if end is not None:
+        query = query.filter(Incident.timestamp <= end)
+
+    count, avg, low, high = query.one()
+    return {
+        "feature": feature,
+        "source": source,
+        "count": count,
+        "avg": float(avg) if avg is not None else None,
+        "min": float(low) if low is not None else None,
+        "max": float(high) if high is not None else None,
+    }
+
+
+def hot_feature_averages(db: Session, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> dict:
+    """Averages of every extracted column per source, in one grouped query."""
+    query = db.query(
+        Incident.source_id, *(func.avg(getattr(Incident, c)) for c in EXTRACTED_COLUMNS)
+    )
+    if start is not None:
+        query = query.filter(Incident.timestamp >= start)
+    if end is not None:
+        query = query.filter(Incident.timestamp <= end)
+
+    result = {}
+    for source_id, *averages in query.group_by(Incident.source_id).all():
+        result[dictionary.source_name(source_id)] = {
+            column: round(float(avg), 3)
+            for column, avg in zip(EXTRACTED_COLUMNS, averages) if avg is not None
+        }
+    return result
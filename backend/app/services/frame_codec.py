@@ -0,0 +1,113 @@
+"""
+Compact columnar ingest frame — decodes straight into NumPy arrays
+backend/app/services/frame_codec.py
+
+Layout (little-endian), content type ``application/x-sentinel-frame``:
+
+    magic       4s    b"SNTF"
+    version     u8    1
+    dtype       u8    1 = float32, 2 = float64 (feature matrix)
+    n_points    u32
+    n_features  u16
+    source_len  u16
+    source      utf-8 bytes
+    names       n_features x (u16 length + utf-8 bytes), fixed feature order, unique
+    timestamps  n_points x float64, Unix epoch seconds (UTC), 1970 to 2100
+    values      n_points x n_features matrix, row-major
+
+One frame carries one source. Decoding is a header parse plus two
+``np.frombuffer`` views — no per-point dicts and no datetime parsing.
+"""
+
+import struct
+from typing import List, NamedTuple
+
+import numpy as np
+
+FRAME_CONTENT_TYPE = "application/x-sentinel-frame"
+MAGIC = b"SNTF"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBIHH")
+_NAME_LEN = struct.Struct("<H")
+_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f8")}
+_DTYPE_CODES = {dtype: code for code, dtype in _DTYPES.items()}
+# Anything outside is a client bug (ms instead of s, garbage) and would not fit a datetime
+MIN_TIMESTAMP = 0.0
+MAX_TIMESTAMP = 4102444800.0   # 2100-01-01T00:00:00Z
+
+
+class Frame(NamedTuple):
+    source: str
+    feature_names: List[str]
+    timestamps: np.ndarray   # (n_points,) float64 epoch seconds
+    matrix: np.ndarray       # (n_points, n_features) float32 or float64
+
+
+def encode_frame(source: str, feature_names: List[str], timestamps, matrix,
+                 dtype=np.float32) -> bytes:
+    dtype = np.dtype(dtype).newbyteorder("<")
+    matrix = np.asarray(matrix, dtype=dtype)
+    timestamps = np.asarray(timestamps, dtype="<f8")
+    if matrix.ndim != 2 or matrix.shape != (len(timestamps), len(feature_names)):
+        raise ValueError("matrix must be (len(timestamps), len(feature_names))")
+
+    source_bytes = source.encode()
+    parts = [_HEADER.pack(MAGIC, VERSION, _DTYPE_CODES[dtype], len(timestamps),
+                          len(feature_names), len(source_bytes)), source_bytes]
+    for name in feature_names:
+        name_bytes = name.encode()
+        parts.append(_NAME_LEN.pack(len(name_bytes)))
+        parts.append(name_bytes)
+    parts.append(timestamps.tobytes())
+    parts.append(np.ascontiguousarray(matrix).tobytes())
+    return b"".join(parts)
+
+
+def decode_frame(payload: bytes, max_points: int = 0) -> Frame:
+    """Parses a frame; raises ValueError on any malformed or oversized input."""
+    if len(payload) < _HEADER.size:
+        raise ValueError("frame too short")
+
+    magic, version, dtype_code, n_points, n_features, source_len = _HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a sentinel frame (bad magic or version)")
+    if dtype_code not in _DTYPES:
+        raise ValueError(f"unknown value dtype code {dtype_code}")
+    if max_points and n_points > max_points:
+        raise ValueError(f"frame holds {n_points} points, limit is {max_points}")
+    if n_features == 0:
+        raise ValueError("frame has no features")
+
+    offset = _HEADER.size
+    source = payload[offset:offset + source_len].decode()
+    offset += source_len
+
+    feature_names = []
+    for _ in range(n_features):
+        if offset + _NAME_LEN.size > len(payload):
+            raise ValueError("truncated feature names")
+        (name_len,) = _NAME_LEN.unpack_from(payload, offset)
+        offset += _NAME_LEN.size
+        feature_names.append(payload[offset:offset + name_len].decode())
+        offset += name_len
+    if len(set(feature_names)) != len(feature_names):
+        raise ValueError("duplicate feature names")
+
+    dtype = _DTYPES[dtype_code]
+    expected = offset + n_points * 8 + n_points * n_features * dtype.itemsize
+    if len(payload) != expected:
+        raise ValueError(f"frame size mismatch: expected {expected} bytes, got {len(payload)}")
+
+    timestamps = np.frombuffer(payload, dtype="<f8", count=n_points, offset=offset)
+    offset += n_points * 8
+    matrix = np.frombuffer(payload, dtype=dtype, count=n_points * n_features, offset=offset)
+
+    if not source:
+        raise ValueError("frame has no source")
+    if not np.isfinite(timestamps).all() or not np.isfinite(matrix).all():
+        raise ValueError("frame contains non-finite numbers")
+    if n_points and (timestamps.min() < MIN_TIMESTAMP or timestamps.max() > MAX_TIMESTAMP):
+        raise ValueError(f"timestamps must be epoch seconds between {MIN_TIMESTAMP:.0f} and {MAX_TIMESTAMP:.0f}")
+
+    return Frame(source, feature_names, timestamps, matrix.reshape(n_points, n_features))
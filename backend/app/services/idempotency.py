@@ -0,0 +1,71 @@
+"""
+Duplicate suppression for ingest retries
+backend/app/services/idempotency.py
+
+Recent responses are kept in a bounded LRU keyed by idempotency key, so a
+retried submission is answered from memory without re-scoring, re-inserting
+or re-notifying. The unique constraint on incidents.idempotency_key catches
+duplicates that fall out of the LRU or hit another worker process. A purge
+empties the LRU (storage change hook): a cached response would point at a
+deleted incident and keep a retry from being stored again.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+from app.core.config import get_settings
+from app.services.storage import change_hooks
+
+
+def derive_idempotency_key(source: str, timestamp: datetime, values: dict) -> str:
+    payload = json.dumps(
+        [source, timestamp.isoformat(), sorted(values.items())],
+        separators=(",", ":"),
+    )
+    return "h:" + hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyCache:
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return response
+
+    def put(self, key: str, response: dict):
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def on_data_change(self, kind: str):
+        if kind == "delete":
+            self.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "size": len(self._entries), "max_entries": self.max_entries}
+
+
+idempotency_cache = IdempotencyCache(get_settings().idempotency_cache_size)
+change_hooks.append(idempotency_cache.on_data_change)
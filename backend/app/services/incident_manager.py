@@ -1,5 +1,11 @@
+from bisect import bisect_right
 from datetime import datetime
 
+import numpy as np
+
+from app.core import runtime_config
+from app.models.dictionary import SEVERITY_CODES, SEVERITY_LEVELS
+
 # Maps source sensor → (incident type, messages per severity)
 _SOURCE_MAP = {
     "sensor-payment": ("payment", {
@@ -61,13 +67,56 @@ _DEFAULT_MESSAGES = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Compact integer encodings — the codes index the lookup tables below, so
+# batch paths classify whole arrays without per-row branching
+# ---------------------------------------------------------------------------
+
+TYPE_NAMES = (_DEFAULT_TYPE,) + tuple(inc_type for inc_type, _ in _SOURCE_MAP.values())
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# Source id 0 stands for every source without its own entry in _SOURCE_MAP
+SOURCE_NAMES = ("",) + tuple(_SOURCE_MAP)
+_SOURCE_IDS = {name: source_id for source_id, name in enumerate(SOURCE_NAMES) if source_id}
+
+_TYPE_CODE_BY_SOURCE = np.array(
+    [TYPE_CODES[_DEFAULT_TYPE]] + [TYPE_CODES[inc_type] for inc_type, _ in _SOURCE_MAP.values()],
+    dtype=np.int8,
+)
+_MESSAGE_TABLE = np.array(
+    [[_DEFAULT_MESSAGES[s] for s in SEVERITY_LEVELS]]
+    + [[messages[s] for s in SEVERITY_LEVELS] for _, messages in _SOURCE_MAP.values()],
+    dtype=object,
+)
+MESSAGE_TEMPLATES = tuple(dict.fromkeys(_MESSAGE_TABLE.ravel().tolist()))
+
+# Ascending [critical, high, medium] cut-offs per source id
+_threshold_rows: list = []
+_threshold_table = np.empty((0, 3))
+
+
+def reload_severity_thresholds() -> None:
+    """Rebuilds the per-source threshold table from runtime_config.severity_thresholds."""
+    global _threshold_rows, _threshold_table
+    cfg = runtime_config.severity_thresholds
+    default = list(cfg.get("default", [-0.20, -0.10, -0.05]))
+    _threshold_rows = [
+        list(cfg.get(name, default)) if source_id else default
+        for source_id, name in enumerate(SOURCE_NAMES)
+    ]
+    _threshold_table = np.array(_threshold_rows, dtype=np.float64)
+
+
+reload_severity_thresholds()
+
+
 class IncidentManager:
     def __init__(self):
         pass
 
     def create_incident(self, datapoint: dict, anomaly: dict) -> dict:
-        severity = self._assign_severity(anomaly["score"])
         source = datapoint.get("source", "unknown")
+        severity = self._assign_severity(anomaly["score"], source)
 
         inc_type, messages = _SOURCE_MAP.get(source, (_DEFAULT_TYPE, _DEFAULT_MESSAGES))
         message = messages.get(severity, f"Anomalous behavior detected in {source}")
@@ -78,17 +127,70 @@ class IncidentManager:
             "values": datapoint["values"],
             "score": anomaly["score"],
             "is_anomaly": anomaly["is_anomaly"],
+            "contributions": anomaly.get("contributions"),
             "severity": severity,
             "type": inc_type,
             "message": message,
+            "severity_code": SEVERITY_CODES[severity],
+            "type_code": TYPE_CODES[inc_type],
         }
 
-    def _assign_severity(self, score: float) -> str:
-        if score < -0.20:
-            return "critical"
-        elif score < -0.10:
-            return "high"
-        elif score < -0.05:
-            return "medium"
-        else:
-            return "low"
+    def _assign_severity(self, score: float, source: str = "") -> str:
+        thresholds = _threshold_rows[_SOURCE_IDS.get(source, 0)]
+        return SEVERITY_LEVELS[3 - bisect_right(thresholds, score)]
+
+    # ------------------------------------------------------------
+    # BATCH PATHS (frames, backfill)
+    # ------------------------------------------------------------
+    @staticmethod
+    def source_ids(sources: list) -> np.ndarray:
+        return np.fromiter((_SOURCE_IDS.get(s, 0) for s in sources), dtype=np.int16, count=len(sources))
+
+    @staticmethod
+    def assign_severity_batch(scores: np.ndarray, source_ids: np.ndarray) -> np.ndarray:
+        """Severity codes for arrays of scores and source ids — one searchsorted per distinct source."""
+        scores = np.asarray(scores, dtype=np.float64)
+        source_ids = np.broadcast_to(np.asarray(source_ids), scores.shape)
+        codes = np.empty(scores.shape, dtype=np.int8)
+        for source_id in np.unique(source_ids):
+            mask = source_ids == source_id
+            codes[mask] = 3 - np.searchsorted(_threshold_table[source_id], scores[mask], side="right")
+        return codes
+
+    def create_incidents(self, datapoints: list, scores: np.ndarray, is_anomaly: np.ndarray,
+                         source_ids: np.ndarray = None, contributions: list = None) -> list:
+        """Vectorized counterpart of create_incident for many datapoints at once."""
+        if source_ids is None:
+            source_ids = self.source_ids([dp.get("source", "unknown") for dp in datapoints])
+        source_ids = np.broadcast_to(np.asarray(source_ids), (len(datapoints),))
+
+        severity_codes = self.assign_severity_batch(scores, source_ids)
+        type_codes = _TYPE_CODE_BY_SOURCE[source_ids]
+        messages = _MESSAGE_TABLE[source_ids, severity_codes]
+        if contributions is None:
+            contributions = [None] * len(datapoints)
+
+        return [
+            {
+                "timestamp": dp["timestamp"],
+                "source": dp.get("source", "unknown"),
+                "values": dp["values"],
+                "score": score,
+                "is_anomaly": flag,
+                "contributions": explained,
+                "severity": SEVERITY_LEVELS[sev],
+                "type": TYPE_NAMES[inc_type],
+                "message": message,
+                "severity_code": sev,
+                "type_code": inc_type,
+            }
+            for dp, score, flag, explained, sev, inc_type, message in zip(
+                datapoints,
+                np.asarray(scores, dtype=np.float64).tolist(),
+                np.asarray(is_anomaly, dtype=bool).tolist(),
+                contributions,
+                severity_codes.tolist(),
+                type_codes.tolist(),
+                messages.tolist(),
+            )
+        ]
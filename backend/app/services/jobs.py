@@ -0,0 +1,64 @@
+"""
+Periodic maintenance jobs hosted by the in-process scheduler
+backend/app/services/jobs.py
+"""
+
+from app.core.config import get_settings
+from app.core.scheduler import Scheduler
+from app.services.correlation import correlation_engine
+from app.services.journal import ingest_journal
+from app.services.kpi_counters import kpi_counters
+from app.services.purge import purge_job
+from app.services.report_store import report_store
+from app.services.storage import IncidentStorage
+
+
+def _replay_journal() -> int:
+    storage = IncidentStorage()
+
+    def store(records: list):
+        _, _, duplicates = storage.save_journaled(records)
+        ingest_journal.stats["duplicates_skipped"] += duplicates
+
+    return ingest_journal.replay(store)
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    settings = get_settings()
+
+    # Per-process window index: every worker prunes its own
+    scheduler.add_job("correlation-prune", correlation_engine.prune, interval_s=60)
+
+    # Counters are per process, so every worker reconciles its own
+    scheduler.add_job(
+        "kpi-reconcile",
+        kpi_counters.reconcile,
+        interval_s=settings.kpi_reconcile_interval_s,
+        initial_delay_s=0,
+    )
+
+    # One worker renders the standard reports for everyone
+    scheduler.add_job(
+        "reports-prerender",
+        report_store.prerender_all,
+        interval_s=settings.report_prerender_interval_s,
+        leader_only=True,
+        initial_delay_s=30,
+    )
+
+    # The journal is local to this process: every worker drains its own
+    if settings.journal_mode != "off":
+        scheduler.add_job(
+            "journal-replay",
+            _replay_journal,
+            interval_s=settings.journal_replay_interval_s,
+            initial_delay_s=0,
+        )
+
+    if settings.retention_days > 0:
+        scheduler.add_job(
+            "retention",
+            lambda: purge_job.purge_expired(settings.retention_days),
+            interval_s=3600,
+            leader_only=True,
+        )
@@ -0,0 +1,335 @@
+"""
+Durable local ingest journal
+backend/app/services/journal.py
+
+When the database is slow or down, ingest appends the scored incidents to a
+local append-only journal instead of failing, and a scheduler job drains the
+journal into the database in bulk once it is reachable again.
+
+Layout: one directory per worker process (claimed with an flock, so a
+restarted worker adopts the journal of a dead one), made of numbered segment
+files. Each record is ``<u32 length><u32 crc32><json payload>``. Appends are
+group-committed: a writer returns only after the fsync that covers its
+record, and concurrent writers within ``fsync_interval_s`` share one fsync.
+
+A segment is never appended to after a restart, so a crash can only leave a
+torn record at the tail of the last segment; replay detects it (short read
+or CRC mismatch) and drops it — that record was never acknowledged.
+Replay progress is checkpointed per segment in a ``.offset`` sidecar after
+every handled batch. Every journaled record carries a key — the client's
+idempotency key, or else a journal sequence key ``j:<process>:<n>`` — and
+the replayer skips keys already stored, so a crash between a DB commit and
+the checkpoint does not insert duplicates.
+"""
+
+import fcntl
+import itertools
+import json
+import os
+import struct
+import tempfile
+import time
+import uuid
+import zlib
+from datetime import datetime
+from threading import Condition, Lock, Thread
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+
+from app.core.config import get_settings
+
+RECORD_HEADER = struct.Struct("<II")   # payload length, crc32(payload)
+SEGMENT_SUFFIX = ".seg"
+MAX_WORKER_DIRS = 64
+
+# Errors meaning "the database is unavailable", as opposed to a bad row
+DB_UNAVAILABLE = (OperationalError, InterfaceError, PoolTimeoutError)
+
+
+class JournalFull(Exception):
+    pass
+
+
+def encode_record(incident: dict, idempotency_key: Optional[str] = None) -> bytes:
+    payload = json.dumps(
+        {"incident": incident, "key": idempotency_key},
+        default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o),
+        separators=(",", ":"),
+    ).encode()
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> dict:
+    record = json.loads(payload)
+    incident = record["incident"]
+    for field in ("timestamp", "last_seen"):
+        if isinstance(incident.get(field), str):
+            incident[field] = datetime.fromisoformat(incident[field])
+    return record
+
+
+def read_records(path: str, offset: int = 0) -> Iterator[Tuple[bytes, int]]:
+    """Yields (payload, end_offset) for every intact record; stops at a torn tail."""
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = offset
+    while pos + RECORD_HEADER.size <= len(data):
+        length, crc = RECORD_HEADER.unpack_from(data, pos)
+        start, end = pos + RECORD_HEADER.size, pos + RECORD_HEADER.size + length
+        if end > len(data) or zlib.crc32(data[start:end]) != crc:
+            return
+        yield data[start:end], end
+        pos = end
+
+
+class IngestJournal:
+    def __init__(self, directory: str, segment_bytes: int = 16 * 1024 * 1024,
+                 max_bytes: int = 1024 * 1024 * 1024, fsync_interval_s: float = 0.005):
+        self.root = directory or os.path.join(tempfile.gettempdir(), "sentinel_journal")
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync_interval_s = fsync_interval_s
+
+        self.directory: Optional[str] = None
+        self._lock_file = None
+        self._segment = None          # active segment file object
+        self._segment_path: Optional[str] = None
+        self._segment_size = 0
+        self._next_seq = 0
+        self._bytes = 0               # all segments in our directory
+        self._key_prefix = f"j:{uuid.uuid4().hex[:12]}:"   # unique per process, across restarts
+        self._key_seq = itertools.count()
+
+        self._cond = Condition(Lock())
+        self._replay_lock = Lock()
+        self._written = 0             # append batches written
+        self._synced = 0              # append batches covered by an fsync
+        self._flusher: Optional[Thread] = None
+        self._closed = False
+
+        self.stats = {
+            "appended": 0,
+            "fsyncs": 0,
+            "replayed": 0,
+            "duplicates_skipped": 0,
+            "torn_records": 0,
+            "rejected_full": 0,
+            "last_replay_error": None,
+        }
+
+    # ------------------------------------------------------------
+    # SETUP
+    # ------------------------------------------------------------
+    def _ensure_open(self):
+        if self.directory is not None:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        for n in range(MAX_WORKER_DIRS):
+            directory = os.path.join(self.root, f"worker-{n}")
+            os.makedirs(directory, exist_ok=True)
+            lock_file = open(os.path.join(directory, ".lock"), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()   # held by another live worker
+                continue
+            self._lock_file = lock_file
+            self.directory = directory
+            break
+        else:
+            raise RuntimeError(f"no free journal directory under {self.root}")
+
+        segments = self._segments()
+        self._bytes = sum(os.path.getsize(p) for p in segments)
+        self._next_seq = int(os.path.basename(segments[-1])[:-len(SEGMENT_SUFFIX)]) + 1 if segments else 0
+        self._open_segment()
+
+        self._flusher = Thread(target=self._flush_loop, name="journal-fsync", daemon=True)
+        self._flusher.start()
+
+    def _segments(self) -> List[str]:
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(SEGMENT_SUFFIX))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _open_segment(self):
+        self._segment_path = os.path.join(self.directory, f"{self._next_seq:012d}{SEGMENT_SUFFIX}")
+        self._next_seq += 1
+        self._segment = open(self._segment_path, "ab")
+        self._segment_size = 0
+        # Make the new file's directory entry durable too
+        dir_fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _rotate_locked(self):
+        self._sync_locked()
+        self._segment.close()
+        self._open_segment()
+
+    # ------------------------------------------------------------
+    # WRITE
+    # ------------------------------------------------------------
+    def append_many(self, incidents: list, idempotency_keys: Optional[list] = None) -> None:
+        """Durably appends incidents; returns once they are fsynced. Raises JournalFull.
+
+        Incidents without an idempotency key get a journal sequence key, so
+        replay can always de-duplicate.
+        """
+        keys = [
+            key or f"{self._key_prefix}{next(self._key_seq)}"
+            for key in (idempotency_keys or [None] * len(incidents))
+        ]
+        data = b"".join(encode_record(i, k) for i, k in zip(incidents, keys))
+
+        with self._cond:
+            self._ensure_open()
+            if self._bytes + len(data) > self.max_bytes:
+                self.stats["rejected_full"] += len(incidents)
+                raise JournalFull(f"journal full ({self._bytes} bytes)")
+            if self._segment_size and self._segment_size + len(data) > self.segment_bytes:
+                self._rotate_locked()
+
+            self._segment.write(data)
+            self._segment_size += len(data)
+            self._bytes += len(data)
+            self._written += 1
+            ticket = self._written
+            self.stats["appended"] += len(incidents)
+            self._cond.notify_all()
+
+            while self._synced < ticket:
+                self._cond.wait()
+
+    def append(self, incident: dict, idempotency_key: Optional[str] = None) -> None:
+        self.append_many([incident], [idempotency_key])
+
+    def _sync_locked(self):
+        if self._written == self._synced:
+            return
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self._synced = self._written
+        self.stats["fsyncs"] += 1
+        self._cond.notify_all()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._written == self._synced and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    self._sync_locked()
+                    return
+            time.sleep(self.fsync_interval_s)   # let concurrent appends share the fsync
+            with self._cond:
+                self._sync_locked()
+
+    # ------------------------------------------------------------
+    # REPLAY
+    # ------------------------------------------------------------
+    def replay(self, handler: Callable[[List[dict]], object], batch_size: int = 1000) -> int:
+        """Feeds journaled records to ``handler`` in order and drops them once handled.
+
+        ``handler`` receives decoded records ({"incident", "key"}) and must
+        raise if they were not stored; they are then retried on the next call.
+        """
+        with self._replay_lock:
+            with self._cond:
+                self._ensure_open()
+                if self._segment_size:
+                    self._rotate_locked()   # seal what was written so far
+                sealed = [p for p in self._segments() if p != self._segment_path]
+
+            replayed = 0
+            try:
+                replayed = self._replay_segments(sealed, handler, batch_size)
+                self.stats["last_replay_error"] = None
+            except Exception as e:
+                self.stats["last_replay_error"] = str(e)
+                raise
+            finally:
+                self.stats["replayed"] += replayed
+            return replayed
+
+    def _replay_segments(self, sealed: List[str], handler, batch_size: int) -> int:
+        replayed = 0
+        for path in sealed:
+            offset = self._read_offset(path)
+            batch: List[dict] = []
+            end = offset
+            for payload, end in read_records(path, offset):
+                batch.append(decode_payload(payload))
+                if len(batch) >= batch_size:
+                    handler(batch)
+                    self._write_offset(path, end)
+                    replayed += len(batch)
+                    batch = []
+            if batch:
+                handler(batch)
+                self._write_offset(path, end)
+                replayed += len(batch)
+
+            size = os.path.getsize(path)
+            if end < size:
+                # Torn tail from a crash mid-append: never acknowledged
+                self.stats["torn_records"] += 1
+                print(f"Journal: dropped torn record at {path}:{end}")
+
+            os.remove(path)
+            if os.path.exists(path + ".offset"):
+                os.remove(path + ".offset")
+            with self._cond:
+                self._bytes -= size
+        return replayed
+
+    @staticmethod
+    def _read_offset(path: str) -> int:
+        try:
+            with open(path + ".offset") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _write_offset(path: str, offset: int):
+        partial = path + ".offset.part"
+        with open(partial, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, path + ".offset")
+
+    # ------------------------------------------------------------
+    # STATUS / SHUTDOWN
+    # ------------------------------------------------------------
+    def pending_bytes(self) -> int:
+        return self._bytes
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        if self._segment is not None:
+            self._segment.close()
+
+    def snapshot(self) -> dict:
+        return {
+            "directory": self.directory,
+            "pending_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            **self.stats,
+        }
+
+
+_settings = get_settings()
+ingest_journal = IngestJournal(
+    _settings.journal_dir,
+    segment_bytes=_settings.journal_segment_bytes,
+    max_bytes=_settings.journal_max_bytes,
+    fsync_interval_s=_settings.journal_fsync_interval_ms / 1000,
+)
@@ -0,0 +1,180 @@
+"""
+Incremental KPI counters for the admin dashboard
+backend/app/services/kpi_counters.py
+
+Counters are updated in memory on every insert/delete so /v1/admin/stats is
+O(1). They are per process: a scheduled reconcile recomputes them from the
+database (which also picks up rows written by other workers or changed by
+a backfill) and persists the snapshot to job_states so a restarted process
+serves sensible numbers before its first reconcile. At startup the counters
+are reconciled right away when there is no snapshot, after a schema upgrade
+or when the scheduler is disabled (see main.py).
+"""
+
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.db.session import SessionLocal
+from app.models.dictionary import SEVERITY_LEVELS
+from app.models.incident import Incident
+from app.models.job_state import JobState
+
+SNAPSHOT_NAME = "kpi_counters"
+SEVERITIES = SEVERITY_LEVELS
+
+
+def _naive(ts) -> Optional[datetime]:
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    if isinstance(ts, datetime) and ts.tzinfo is not None:
+        ts = ts.replace(tzinfo=None)
+    return ts
+
+
+def _midnight() -> datetime:
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class KpiCounters:
+    def __init__(self):
+        self._lock = Lock()
+        self._clear()
+        self.stats = {"reconciles": 0, "last_reconcile": None, "last_drift": None}
+
+    def _clear(self):
+        self.total = 0
+        self.today = 0
+        self.today_start = _midnight()
+        self.by_severity = {s: 0 for s in SEVERITIES}
+        self.last_incident = None
+        self.max_id = 0
+
+    def _roll_day(self):
+        midnight = _midnight()
+        if midnight != self.today_start:
+            self.today_start = midnight
+            self.today = 0
+
+    # ------------------------------------------------------------
+    # WRITE HOOKS
+    # ------------------------------------------------------------
+    def record_insert(self, incidents: list, ids: list):
+        with self._lock:
+            self._roll_day()
+            for incident, incident_id in zip(incidents, ids):
+                self.total += 1
+                severity = incident.get("severity")
+                self.by_severity[severity] = self.by_severity.get(severity, 0) + 1
+
+                ts = _naive(incident.get("timestamp"))
+                if ts is not None and ts >= self.today_start:
+                    self.today += 1
+
+                if incident_id > self.max_id:
+                    self.max_id = incident_id
+                    self.last_incident = {
+                        "id": incident_id,
+                        "timestamp": ts.isoformat() if ts else None,
+                        "severity": severity,
+                        "source": incident.get("source"),
+                    }
+
+    def record_clear(self):
+        with self._lock:
+            self._clear()
+
+    # ------------------------------------------------------------
+    # READ
+    # ------------------------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._roll_day()
+            return {
+                "total_incidents": self.total,
+                "today_count": self.today,
+                "by_severity": dict(self.by_severity),
+                "last_incident": dict(self.last_incident) if self.last_incident else None,
+                "max_id": self.max_id,
+            }
+
+    # ------------------------------------------------------------
+    # RECONCILE / PERSIST
+    # ------------------------------------------------------------
+    def reconcile(self) -> dict:
+        """Recomputes every counter from the database; returns the drift that was corrected."""
+        db = SessionLocal()
+        try:
+            midnight = _midnight()
+            by_severity = {
+                SEVERITY_LEVELS[code]: count
+                for code, count in db.query(Incident.severity_code, func.count(Incident.id))
+                .group_by(Incident.severity_code).all()
+                if code is not None
+            }
+            today = db.query(func.count(Incident.id)).filter(Incident.timestamp >= midnight).scalar() or 0
+            last = db.query(Incident).order_by(Incident.id.desc()).first()
+
+            with self._lock:
+                before_total, before_today = self.total, self.today
+                self.by_severity = {s: 0 for s in SEVERITIES}
+                self.by_severity.update(by_severity)
+                self.total = sum(by_severity.values())
+                self.today = today
+                self.today_start = midnight
+                self.max_id = last.id if last else 0
+                self.last_incident = {
+                    "id": last.id,
+                    "timestamp": last.timestamp.isoformat() if last.timestamp else None,
+                    "severity": last.severity,
+                    "source": last.source,
+                } if last else None
+                drift = {"total": self.total - before_total, "today": self.today - before_today}
+                self.stats["reconciles"] += 1
+                self.stats["last_reconcile"] = datetime.utcnow().isoformat()
+                self.stats["last_drift"] = drift
+                persisted = {
+                    "total": self.total,
+                    "today": self.today,
+                    "today_start": self.today_start.isoformat(),
+                    "by_severity": self.by_severity,
+                    "last_incident": self.last_incident,
+                    "max_id": self.max_id,
+                }
+
+            state = db.get(JobState, SNAPSHOT_NAME)
+            if state is None:
+                state = JobState(name=SNAPSHOT_NAME)
+                db.add(state)
+            state.state = persisted
+            db.commit()
+            return drift
+        finally:
+            db.close()
+
+    def load(self) -> bool:
+        """Restores the last persisted snapshot (served until the first reconcile)."""
+        db = SessionLocal()
+        try:
+            state = db.get(JobState, SNAPSHOT_NAME)
+        finally:
+            db.close()
+        if state is None or not state.state:
+            return False
+
+        saved = state.state
+        with self._lock:
+            self.total = saved.get("total", 0)
+            self.today_start = datetime.fromisoformat(saved["today_start"]) if saved.get("today_start") else _midnight()
+            self.today = saved.get("today", 0)
+            self.by_severity = {s: 0 for s in SEVERITIES}
+            self.by_severity.update(saved.get("by_severity", {}))
+            self.last_incident = saved.get("last_incident")
+            self.max_id = saved.get("max_id", 0)
+            self._roll_day()
+        return True
+
+
+kpi_counters = KpiCounters()
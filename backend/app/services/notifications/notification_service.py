@@ -1,4 +1,7 @@
 from app.core import runtime_config
+from app.services.explainer import format_contributions
+from app.services.notifications.rules import alert_rules
+from app.services.notifications.slack_notifier import SlackNotifier
 
 
 class NotificationService:
@@ -7,6 +10,16 @@ class NotificationService:
         self.email_notifier = email_notifier
 
     def notify_if_needed(self, incident: dict):
+        # Correlated repeats of an already-alerted problem stay silent unless
+        # they raise the group's severity
+        if incident.get("parent_id") and not incident.get("escalated"):
+            return
+
+        # Admin-defined routing rules replace the global threshold once any exist
+        if alert_rules.active:
+            self._notify_by_rules(incident)
+            return
+
         severity = incident["severity"]
         cfg = runtime_config.email_config
 
@@ -20,13 +33,7 @@ class NotificationService:
         if not should_notify:
             return
 
-        message = (
-            f"INCIDENT DETECTED\n"
-            f"Source:   {incident['source']}\n"
-            f"Severity: {incident['severity'].upper()}\n"
-            f"Score:    {incident['score']}\n"
-            f"Message:  {incident['message']}\n"
-        )
+        message = self._format_message(incident)
 
         if self.slack_notifier:
             self.slack_notifier.send(message)
@@ -34,16 +41,56 @@ class NotificationService:
         # Send email only if runtime config has email enabled with a receiver
         if cfg.get("enabled") and cfg.get("receiver"):
             if self.email_notifier:
-                original_receiver = self.email_notifier.receiver
-                self.email_notifier.receiver = cfg["receiver"]
-                self.email_notifier.send(
-                    subject=f"[AI Sentinel] {incident['severity'].upper()} incident detected",
-                    body=message,
-                )
-                self.email_notifier.receiver = original_receiver
+                self._send_email(cfg["receiver"], incident, message)
         elif self.email_notifier:
             # Fall back to the static receiver configured via env vars
+            self._send_email(None, incident, message)
+
+    def _notify_by_rules(self, incident: dict):
+        matched = alert_rules.match(incident)
+        if not matched:
+            return
+
+        message = self._format_message(incident)
+        sent = set()   # one message per (channel, target), however many rules matched
+        for rule in matched:
+            for channel, target in rule.channels:
+                if (channel, target) in sent:
+                    continue
+                sent.add((channel, target))
+                if channel == "slack":
+                    notifier = SlackNotifier(target) if target else self.slack_notifier
+                    if notifier:
+                        notifier.send(message)
+                elif channel == "email":
+                    if self.email_notifier:
+                        self._send_email(target or runtime_config.email_config.get("receiver") or None,
+                                         incident, message)
+                    else:
+                        print(f"Alert rule {rule.id}: email channel but SMTP is not configured")
+
+    @staticmethod
+    def _format_message(incident: dict) -> str:
+        message = (
+            f"INCIDENT DETECTED\n"
+            f"Source:   {incident['source']}\n"
+            f"Severity: {incident['severity'].upper()}\n"
+            f"Score:    {incident['score']}\n"
+            f"Message:  {incident['message']}\n"
+        )
+        if incident.get("contributions"):
+            message += f"Drivers:  {format_contributions(incident['contributions'])}\n"
+        return message
+
+    def _send_email(self, receiver, incident: dict, message: str):
+        """Sends through the configured SMTP notifier; ``receiver`` None keeps its default."""
+        original_receiver = self.email_notifier.receiver
+        if receiver:
+            self.email_notifier.receiver = receiver
+        try:
             self.email_notifier.send(
                 subject=f"[AI Sentinel] {incident['severity'].upper()} incident detected",
                 body=message,
             )
+        finally:
+            self.email_notifier.receiver = original_receiver
@@ -0,0 +1,238 @@
+"""
+Alert routing rules
+backend/app/services/notifications/rules.py
+
+Admins define rules (admin API → runtime_config.alert_rules); each rule is
+compiled once into a list of small predicate closures, cheapest first, so
+evaluating it is a few comparisons. Rules are indexed by source: exact
+source names go in a dict, glob patterns ("sensor-*") and source-less
+rules are resolved once per source and cached (LRU, source names come
+from clients), so an incident is only tested against the rules that can
+apply to its source.
+
+Rule format:
+    {
+      "id": "db-night",                      # generated when omitted
+      "name": "DB on-call at night",
+      "enabled": true,
+      "sources": ["sensor-database", "sensor-*"],   # empty = every source
+      "min_severity": "high",                # low | medium | high | critical
+      "score_min": null, "score_max": -0.15, # bounds on the detector score
+      "features": [{"feature": "query_time_ms", "op": ">", "value": 2000}],
+      "hours": [22, 6],                      # [start, end) local hour, may wrap midnight
+      "days": [0, 1, 2, 3, 4],               # Monday = 0; empty = every day
+      "channels": [{"type": "email", "target": "dba@example.com"}, {"type": "slack"}],
+      "stop": false                          # true: later rules are not evaluated
+    }
+"""
+
+import operator
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from fnmatch import fnmatchcase
+from threading import Lock
+from typing import Callable, List, Optional
+
+from app.models.dictionary import SEVERITY_CODES
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+CHANNEL_TYPES = ("email", "slack")
+# The server POSTs to rule targets: only Slack's own webhook host is allowed
+SLACK_WEBHOOK_PREFIX = "https://hooks.slack.com/"
+_GLOB_CHARS = set("*?[")
+_MAX_RESOLVED_SOURCES = 4096
+
+
+class CompiledRule:
+    def __init__(self, spec: dict, order: int):
+        self.spec = spec
+        self.id = spec["id"]
+        self.order = order
+        self.stop = bool(spec.get("stop"))
+        self.channels = [(c["type"], c.get("target") or "") for c in spec["channels"]]
+        self.predicates: List[Callable[[dict, Optional[datetime]], bool]] = compile_predicates(spec)
+        self.needs_clock = bool(spec.get("hours") or spec.get("days"))
+
+    def matches(self, incident: dict, now: Optional[datetime]) -> bool:
+        for predicate in self.predicates:
+            if not predicate(incident, now):
+                return False
+        return True
+
+
+def compile_predicates(spec: dict) -> list:
+    """Predicate closures for one rule, cheapest first; raises ValueError on a bad spec."""
+    predicates = []
+
+    min_severity = spec.get("min_severity")
+    if min_severity is not None:
+        if min_severity not in SEVERITY_CODES:
+            raise ValueError(f"unknown severity '{min_severity}'")
+        floor = SEVERITY_CODES[min_severity]
+        predicates.append(lambda i, now: SEVERITY_CODES.get(i.get("severity"), -1) >= floor)
+
+    score_min, score_max = spec.get("score_min"), spec.get("score_max")
+    if score_min is not None:
+        predicates.append(lambda i, now: i.get("score") is not None and i["score"] >= score_min)
+    if score_max is not None:
+        predicates.append(lambda i, now: i.get("score") is not None and i["score"] <= score_max)
+
+    days = spec.get("days")
+    if days:
+        if not all(0 <= d <= 6 for d in days):
+            raise ValueError("days are 0 (Monday) to 6 (Sunday)")
+        day_set = frozenset(days)
+        predicates.append(lambda i, now: now.weekday() in day_set)
+
+    hours = spec.get("hours")
+    if hours:
+        if len(hours) != 2 or not all(0 <= h <= 24 for h in hours):
+            raise ValueError("hours must be [start, end] between 0 and 24")
+        start, end = hours
+        if start <= end:
+            predicates.append(lambda i, now: start <= now.hour < end)
+        else:   # wraps midnight, e.g. [22, 6]
+            predicates.append(lambda i, now: now.hour >= start or now.hour < end)
+
+    for feature_spec in spec.get("features") or ():
+        op = OPERATORS.get(feature_spec.get("op"))
+        if op is None:
+            raise ValueError(f"unknown operator '{feature_spec.get('op')}'")
+        predicates.append(_feature_predicate(feature_spec["feature"], op, float(feature_spec["value"])))
+
+    return predicates
+
+
+def _feature_predicate(feature: str, op, threshold: float):
+    def predicate(incident: dict, now) -> bool:
+        value = (incident.get("values") or {}).get(feature)
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and op(value, threshold)
+    return predicate
+
+
+def normalize_rule(spec: dict) -> dict:
+    """Fills defaults and validates; raises ValueError."""
+    rule = {
+        "id": spec.get("id") or uuid.uuid4().hex[:8],
+        "name": spec.get("name") or "",
+        "enabled": spec.get("enabled", True),
+        "sources": list(spec.get("sources") or []),
+        "min_severity": spec.get("min_severity"),
+        "score_min": spec.get("score_min"),
+        "score_max": spec.get("score_max"),
+        "features": [dict(f) for f in spec.get("features") or []],
+        "hours": list(spec.get("hours") or []),
+        "days": list(spec.get("days") or []),
+        "channels": [dict(c) for c in spec.get("channels") or []],
+        "stop": bool(spec.get("stop", False)),
+    }
+    if not rule["channels"]:
+        raise ValueError("a rule needs at least one channel")
+    for channel in rule["channels"]:
+        if channel.get("type") not in CHANNEL_TYPES:
+            raise ValueError(f"channel type must be one of {', '.join(CHANNEL_TYPES)}")
+        target = channel.get("target") or ""
+        if channel["type"] == "slack" and target and not target.startswith(SLACK_WEBHOOK_PREFIX):
+            raise ValueError(f"slack target must be a webhook URL starting with {SLACK_WEBHOOK_PREFIX}")
+        if channel["type"] == "email" and target and ("@" not in target or any(c.isspace() for c in target)):
+            raise ValueError(f"invalid email target '{target}'")
+    compile_predicates(rule)   # validation only
+    return rule
+
+
+class RuleEngine:
+    def __init__(self):
+        self._lock = Lock()
+        self._by_source: dict = {}        # exact source → [CompiledRule]
+        self._patterned: list = []        # (patterns, CompiledRule) with glob or no source filter
+        self._resolved: OrderedDict = OrderedDict()   # source → candidate rules (LRU), in definition order
+        self.rules: List[CompiledRule] = []
+        self.stats = {"evaluated": 0, "matched": 0, "candidates": 0, "eval_s": 0.0, "by_rule": {}}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.rules)
+
+    def load(self, specs: list):
+        """Compiles and swaps in a rule set (disabled rules are skipped)."""
+        rules = [CompiledRule(spec, n) for n, spec in enumerate(specs) if spec.get("enabled", True)]
+        by_source, patterned = {}, []
+        for rule in rules:
+            sources = rule.spec.get("sources") or []
+            exact = [s for s in sources if not _GLOB_CHARS & set(s)]
+            globs = [s for s in sources if _GLOB_CHARS & set(s)]
+            for source in exact:
+                by_source.setdefault(source, []).append(rule)
+            if globs or not sources:
+                patterned.append((globs, rule))
+
+        with self._lock:
+            self.rules = rules
+            self._by_source = by_source
+            self._patterned = patterned
+            self._resolved = OrderedDict()
+            self.stats["by_rule"] = {r.id: self.stats["by_rule"].get(r.id, 0) for r in rules}
+
+    def candidates(self, source: str) -> List[CompiledRule]:
+        with self._lock:
+            rules = self._resolved.get(source)
+            if rules is not None:
+                self._resolved.move_to_end(source)
+                return rules
+            found = {id(r): r for r in self._by_source.get(source, [])}
+            for globs, rule in self._patterned:
+                if not globs or any(fnmatchcase(source, g) for g in globs):
+                    found[id(rule)] = rule
+            rules = self._resolved[source] = sorted(found.values(), key=lambda r: r.order)
+            if len(self._resolved) > _MAX_RESOLVED_SOURCES:
+                self._resolved.popitem(last=False)
+        return rules
+
+    def match(self, incident: dict, record: bool = True) -> List[CompiledRule]:
+        started = time.perf_counter()
+        candidates = self.candidates(incident.get("source") or "")
+        now = datetime.now() if any(r.needs_clock for r in candidates) else None
+
+        matched = []
+        for rule in candidates:
+            if rule.matches(incident, now):
+                matched.append(rule)
+                if rule.stop:
+                    break
+
+        if not record:
+            return matched
+        with self._lock:
+            self.stats["evaluated"] += 1
+            self.stats["candidates"] += len(candidates)
+            self.stats["matched"] += bool(matched)
+            self.stats["eval_s"] += time.perf_counter() - started
+            for rule in matched:
+                self.stats["by_rule"][rule.id] = self.stats["by_rule"].get(rule.id, 0) + 1
+        return matched
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            evaluated = self.stats["evaluated"]
+            return {
+                "rules": len(self.rules),
+                "indexed_sources": len(self._by_source),
+                "pattern_rules": len(self._patterned),
+                "evaluated": evaluated,
+                "matched": self.stats["matched"],
+                "avg_candidates": round(self.stats["candidates"] / evaluated, 2) if evaluated else None,
+                "avg_eval_us": round(self.stats["eval_s"] / evaluated * 1e6, 2) if evaluated else None,
+                "matches_by_rule": dict(self.stats["by_rule"]),
+            }
+
+
+alert_rules = RuleEngine()
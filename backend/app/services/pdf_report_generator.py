@@ -10,19 +10,69 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.legends import Legend
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func, Integer
+from sqlalchemy import func, select, Integer
 import os
 import tempfile
 
+from app.core.config import get_settings
+from app.models.dictionary import SEVERITY_CODES, SEVERITY_LEVELS, dictionary
 from app.models.incident import Incident
+from app.services.features import hot_feature_averages
+from app.services.timeseries import incident_timeseries
+
+APPENDIX_ROWS_PER_TABLE = 40   # ~ one A4 page per table flowable
+
+# Axis label format per time bucket
+BUCKET_LABELS = {
+    "minute": "%H:%M",
+    "hour": "%d/%m %Hh",
+    "day": "%d/%m",
+    "week": "%d/%m/%y",
+    "month": "%m/%Y",
+}
+SERIES_COLORS = ["#2563eb", "#dc2626", "#16a34a", "#f59e0b", "#7c3aed", "#0ea5e9"]
+
+
+class LazyStory(list):
+    """Flowable list that pulls from an iterator as ReportLab consumes it.
+
+    ``doc.build`` pops flowables from the front and checks ``len()`` on every
+    step; topping up to ``window`` items there keeps only a few pages of
+    flowables (and their rows) alive instead of the whole document.
+    """
+
+    def __init__(self, flowables, window: int = 8):
+        super().__init__()
+        self._source = iter(flowables)
+        self._window = window
+        self._exhausted = False
+
+    def _fill(self):
+        while not self._exhausted and list.__len__(self) < self._window:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
 
 
 class PDFReportGenerator:
     def __init__(self, db: Session):
         self.db = db
+        self.page_count = 0
+        self._summaries = {}
 
         # On utilise seulement un stylesheet propre
         self.styles = getSampleStyleSheet()
@@ -53,6 +103,38 @@ class PDFReportGenerator:
             alignment=TA_LEFT
         ))
 
+    # ------------------------------------------------------------
+    # AGRÉGATS
+    # ------------------------------------------------------------
+    def _summary(self, start_date, end_date) -> dict:
+        """Counts per severity, anomalies and average score: one GROUP BY, shared by all sections."""
+        key = (start_date, end_date)
+        if key not in self._summaries:
+            rows = self.db.execute(
+                select(
+                    Incident.severity_code,
+                    func.count(Incident.id),
+                    func.sum(Incident.is_anomaly),
+                    func.sum(Incident.score),
+                ).where(
+                    Incident.timestamp >= start_date,
+                    Incident.timestamp <= end_date,
+                ).group_by(Incident.severity_code)
+            ).all()
+
+            by_code = {code: count for code, count, _, _ in rows}
+            total = sum(by_code.values())
+            score_sum = sum(s or 0 for _, _, _, s in rows)
+            self._summaries[key] = {
+                "total": total,
+                "high": by_code.get(SEVERITY_CODES["high"], 0) + by_code.get(SEVERITY_CODES["critical"], 0),
+                "medium": by_code.get(SEVERITY_CODES["medium"], 0),
+                "low": by_code.get(SEVERITY_CODES["low"], 0),
+                "anomalies": int(sum(a or 0 for _, _, a, _ in rows)),
+                "avg_score": score_sum / total if total > 0 else 0,
+            }
+        return self._summaries[key]
+
     # ------------------------------------------------------------
     # PAGE DE GARDE
     # ------------------------------------------------------------
@@ -112,17 +194,11 @@ class PDFReportGenerator:
         elements.append(Paragraph("📊 Résumé Exécutif", self.styles["SectionTitle"]))
         elements.append(Spacer(1, 10))
 
-        incidents = self.db.query(Incident).filter(
-            Incident.timestamp >= start_date,
-            Incident.timestamp <= end_date
-        ).all()
-
-        total = len(incidents)
-        high = sum(i.severity in ("high", "critical") for i in incidents)
-        medium = sum(i.severity == "medium" for i in incidents)
-        low = sum(i.severity == "low" for i in incidents)
-        anomalies = sum(i.is_anomaly for i in incidents)
-        avg_score = sum(i.score for i in incidents) / total if total > 0 else 0
+        summary = self._summary(start_date, end_date)
+        total = summary["total"]
+        high, medium, low = summary["high"], summary["medium"], summary["low"]
+        anomalies = summary["anomalies"]
+        avg_score = summary["avg_score"]
 
         kpi_data = [
             ["Métrique", "Valeur", "Description"],
@@ -154,19 +230,18 @@ class PDFReportGenerator:
         elements.append(Paragraph("📈 Statistiques Détaillées", self.styles["SectionTitle"]))
         elements.append(Spacer(1, 10))
 
-        incidents = self.db.query(Incident).filter(
-            Incident.timestamp >= start_date,
-            Incident.timestamp <= end_date
+        counts = self.db.execute(
+            select(Incident.source_id, func.count(Incident.id).label("n")).where(
+                Incident.timestamp >= start_date,
+                Incident.timestamp <= end_date
+            ).group_by(Incident.source_id).order_by(func.count(Incident.id).desc()).limit(10)
         ).all()
 
-        sources = {}
-        for i in incidents:
-            sources[i.source] = sources.get(i.source, 0) + 1
-
         table_data = [["Source", "Incidents", "%"]]
-        total = len(incidents)
+        total = self._summary(start_date, end_date)["total"]
 
-        for src, count in sorted(sources.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for source_id, count in counts:
+            src = dictionary.source_name(source_id)
             pct = (count / total * 100) if total > 0 else 0
             table_data.append([src, str(count), f"{pct:.1f}%"])
 
@@ -189,14 +264,8 @@ class PDFReportGenerator:
         elements.append(Paragraph("📊 Visualisations", self.styles["SectionTitle"]))
         elements.append(Spacer(1, 10))
 
-        incidents = self.db.query(Incident).filter(
-            Incident.timestamp >= start_date,
-            Incident.timestamp <= end_date
-        ).all()
-
-        high = sum(i.severity in ("high", "critical") for i in incidents)
-        medium = sum(i.severity == "medium" for i in incidents)
-        low = sum(i.severity == "low" for i in incidents)
+        summary = self._summary(start_date, end_date)
+        high, medium, low = summary["high"], summary["medium"], summary["low"]
 
         if high + medium + low > 0:
             drawing = Drawing(300, 200)
@@ -214,8 +283,57 @@ class PDFReportGenerator:
 
             elements.append(drawing)
 
+        # Courbes : une seule agrégation (bucket × source) pour tous les graphiques
+        series = incident_timeseries(self.db, start_date, end_date)
+        if series["buckets"]:
+            labels = [b.strftime(BUCKET_LABELS[series["unit"]]) for b in series["buckets"]]
+
+            elements.append(Spacer(1, 10))
+            elements.append(Paragraph(f"Incidents dans le temps (par {series['unit']})", self.styles["Heading3"]))
+            elements.append(self._line_chart(labels, {"Total": series["total"], "Haute sévérité": series["high"]}))
+
+            if series["by_source"]:
+                elements.append(Spacer(1, 10))
+                elements.append(Paragraph("Tendance par source", self.styles["Heading3"]))
+                elements.append(self._line_chart(labels, series["by_source"]))
+
         return elements
 
+    def _line_chart(self, labels, series: dict):
+        drawing = Drawing(460, 200)
+        chart = HorizontalLineChart()
+        chart.x = 40
+        chart.y = 40
+        chart.width = 300
+        chart.height = 140
+        chart.data = [tuple(values) for values in series.values()]
+        chart.joinedLines = 1
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontSize = 7
+
+        # Au plus ~8 étiquettes sur l'axe, quelle que soit la granularité
+        step = max(1, len(labels) // 8)
+        chart.categoryAxis.categoryNames = [l if n % step == 0 else "" for n, l in enumerate(labels)]
+        chart.categoryAxis.labels.fontSize = 7
+        chart.categoryAxis.labels.angle = 30
+        chart.categoryAxis.labels.boxAnchor = "ne"
+
+        legend = Legend()
+        legend.x = 355
+        legend.y = 180
+        legend.fontSize = 7
+        legend.alignment = "right"
+        legend.colorNamePairs = []
+        for n, name in enumerate(series):
+            color = colors.HexColor(SERIES_COLORS[n % len(SERIES_COLORS)])
+            chart.lines[n].strokeColor = color
+            chart.lines[n].strokeWidth = 1.5
+            legend.colorNamePairs.append((color, name))
+
+        drawing.add(chart)
+        drawing.add(legend)
+        return drawing
+
     # ------------------------------------------------------------
     # INCIDENTS CRITIQUES
     # ------------------------------------------------------------
@@ -228,7 +346,7 @@ class PDFReportGenerator:
         critical = self.db.query(Incident).filter(
             Incident.timestamp >= start_date,
             Incident.timestamp <= end_date,
-            Incident.severity.in_(["high", "critical"])
+            Incident.severity_code >= SEVERITY_CODES["high"]
         ).order_by(Incident.score).limit(20).all()
 
         if not critical:
@@ -266,32 +384,37 @@ class PDFReportGenerator:
         elements.append(Spacer(1, 10))
 
         stats = self.db.query(
-            Incident.source,
+            Incident.source_id,
             func.count(Incident.id).label("total"),
-            func.sum(func.cast(Incident.severity.in_(["high", "critical"]), Integer)).label("high_count"),
+            func.sum(func.cast(Incident.severity_code >= SEVERITY_CODES["high"], Integer)).label("high_count"),
             func.avg(Incident.score).label("avg_score")
         ).filter(
             Incident.timestamp >= start_date,
             Incident.timestamp <= end_date
-        ).group_by(Incident.source).all()
+        ).group_by(Incident.source_id).all()
 
         if not stats:
             elements.append(Paragraph("Aucune donnée disponible.", self.styles["Normal"]))
             return elements
 
-        table_data = [["Source", "Total", "Critiques", "Score Moyen", "Risque"]]
+        # Typed hot-feature columns: one grouped query, no JSON parsing
+        features = hot_feature_averages(self.db, start_date, end_date)
+
+        table_data = [["Source", "Total", "Critiques", "Score Moyen", "Latence moy.", "Risque"]]
 
         for s in stats:
+            latency = features.get(dictionary.source_name(s.source_id), {}).get("latency_ms")
             risk = "ÉLEVÉ" if s.high_count > 5 else "MOYEN" if s.high_count > 2 else "FAIBLE"
             table_data.append([
-                s.source,
+                dictionary.source_name(s.source_id),
                 str(s.total),
                 str(s.high_count),
                 f"{s.avg_score:.3f}",
+                f"{latency:.0f} ms" if latency is not None else "—",
                 risk,
             ])
 
-        table = Table(table_data, colWidths=[2 * inch, 1 * inch, 1 * inch, 1.2 * inch, 1.2 * inch])
+        table = Table(table_data, colWidths=[1.7 * inch, 0.8 * inch, 0.9 * inch, 1.1 * inch, 1.1 * inch, 0.9 * inch])
         table.setStyle(TableStyle([
             ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0ea5e9")),
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
@@ -310,20 +433,16 @@ class PDFReportGenerator:
         elements.append(Paragraph("💡 Recommandations", self.styles["SectionTitle"]))
         elements.append(Spacer(1, 10))
 
-        incidents = self.db.query(Incident).filter(
-            Incident.timestamp >= start_date,
-            Incident.timestamp <= end_date
-        ).all()
-
-        high = sum(i.severity in ("high", "critical") for i in incidents)
-        anomalies = sum(i.is_anomaly for i in incidents)
+        summary = self._summary(start_date, end_date)
+        high = summary["high"]
+        anomalies = summary["anomalies"]
 
         recs = []
 
         if high > 10:
             recs.append("⚠️ Beaucoup d'incidents critiques détectés — intervention immédiate recommandée.")
 
-        if anomalies > len(incidents) * 0.5:
+        if anomalies > summary["total"] * 0.5:
             recs.append("🔍 Plus de 50% des incidents sont des anomalies — audit conseillé.")
 
         if not recs:
@@ -336,14 +455,71 @@ class PDFReportGenerator:
         return elements
 
     # ------------------------------------------------------------
-    # GÉNÉRATION FINALE
+    # ANNEXE — TOUS LES INCIDENTS HAUTE SÉVÉRITÉ
     # ------------------------------------------------------------
-    def generate_report(self, start_date, end_date, period):
-        temp_dir = tempfile.gettempdir()
-        pdf_filename = f"rapport_incidents_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = os.path.join(temp_dir, pdf_filename)
+    def _iter_appendix(self, start_date, end_date):
+        """Generator of flowables: rows come from a server-side cursor, one table per chunk."""
+        max_rows = get_settings().report_appendix_max_rows
+        total_high = self._summary(start_date, end_date)["high"]
+        shown = min(total_high, max_rows) if max_rows > 0 else total_high
+
+        yield PageBreak()
+        yield Paragraph("📎 Annexe — Incidents Haute Sévérité", self.styles["SectionTitle"])
+        note = f"{shown} incident(s) de sévérité haute ou critique, par ordre chronologique"
+        if shown < total_high:
+            note += f" (limité aux {shown} premiers sur {total_high})"
+        yield Paragraph(note + ".", self.styles["Metric"])
+        yield Spacer(1, 10)
+
+        if not shown:
+            return
+
+        query = select(
+            Incident.timestamp, Incident.source_id, Incident.severity_code,
+            Incident.message_id, Incident.score,
+        ).where(
+            Incident.timestamp >= start_date,
+            Incident.timestamp <= end_date,
+            Incident.severity_code >= SEVERITY_CODES["high"],
+        ).order_by(Incident.timestamp, Incident.id).limit(shown)
+
+        style = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#7f1d1d")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTSIZE", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ])
+        result = self.db.execute(query.execution_options(stream_results=True, yield_per=APPENDIX_ROWS_PER_TABLE))
+        try:
+            for chunk in result.partitions():
+                table_data = [["Date", "Source", "Sévérité", "Message", "Score"]]
+                for ts, source_id, severity_code, message_id, score in chunk:
+                    msg = dictionary.message_text(message_id) or ""
+                    table_data.append([
+                        ts.strftime("%d/%m %H:%M:%S"),
+                        dictionary.source_name(source_id),
+                        SEVERITY_LEVELS[severity_code],
+                        msg if len(msg) < 50 else msg[:50] + "...",
+                        f"{score:.2f}",
+                    ])
+                table = Table(table_data, colWidths=[1.1 * inch, 1.3 * inch, 0.8 * inch, 3 * inch, 0.6 * inch],
+                              repeatRows=1)
+                table.setStyle(style)
+                yield table
+        finally:
+            result.close()
 
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
+    # ------------------------------------------------------------
+    # GÉNÉRATION FINALE
+    # ------------------------------------------------------------
+    def generate_report(self, start_date, end_date, period, pdf_path=None):
+        if pdf_path is None:
+            temp_dir = tempfile.gettempdir()
+            pdf_filename = f"rapport_incidents_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            pdf_path = os.path.join(temp_dir, pdf_filename)
+
+        # pageCompression: finished pages stay in memory until save, keep them small
+        doc = SimpleDocTemplate(pdf_path, pagesize=A4, pageCompression=1)
         story = []
 
         story.extend(self._create_cover_page(start_date, end_date, period))
@@ -366,5 +542,11 @@ class PDFReportGenerator:
 
         story.extend(self._create_recommendations(start_date, end_date))
 
-        doc.build(story)
+        # The appendix can run to thousands of pages: it is streamed, never materialized
+        def flowables():
+            yield from story
+            yield from self._iter_appendix(start_date, end_date)
+
+        doc.build(LazyStory(flowables()))
+        self.page_count = doc.page
         return pdf_path
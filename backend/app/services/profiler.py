@@ -0,0 +1,242 @@
+"""
+On-demand profiling of the running process
+backend/app/services/profiler.py
+
+Nothing here runs until an admin asks for it, so the cost outside a
+profiling session is zero:
+
+  * CPU: a sampler thread reads ``sys._current_frames()`` every few
+    milliseconds for N seconds and aggregates the stacks of every thread
+    (event loop, threadpool, generator, jobs...) into collapsed stacks
+    ("thread;file:func;file:func count"), the input format of flamegraph.pl
+    and speedscope. Sampling does not hook function calls the way cProfile
+    does, so the profiled process keeps its normal speed.
+  * Memory: ``tracemalloc`` is started for the session only (or reused when
+    already tracing), two snapshots N seconds apart are compared and the
+    biggest allocation growths are returned.
+  * Threads: current stack of every thread, by name.
+
+One session of each kind at a time per process.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))   # backend/
+_LIB_PATH = re.compile(r".*[/\\](?:site-packages|dist-packages|python3\.\d+)[/\\]")
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _short_path(filename: str) -> str:
+    """backend-relative for app code, package-relative for libraries and the stdlib."""
+    if filename.startswith(_ROOT + os.sep):
+        return os.path.relpath(filename, _ROOT)
+    match = _LIB_PATH.search(filename)
+    return filename[match.end():] if match else os.path.basename(filename)
+
+
+class _Labels(dict):
+    """code object → "file:function", computed once per code object."""
+
+    def __missing__(self, code):
+        label = self[code] = f"{_short_path(code.co_filename)}:{code.co_name}"
+        return label
+
+
+def _stack(frame, labels: _Labels, max_depth: int) -> list:
+    """Root-first labels of a frame's stack."""
+    stack = []
+    while frame is not None and len(stack) < max_depth:
+        stack.append(labels[frame.f_code])
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _thread_names() -> dict:
+    return {t.ident: t.name for t in threading.enumerate()}
+
+
+class Profiler:
+    def __init__(self):
+        self._cpu_lock = threading.Lock()
+        self._memory_lock = threading.Lock()
+        self._labels = _Labels()
+        self.stats = {"cpu_runs": 0, "memory_runs": 0, "last_cpu_at": None, "last_memory_at": None}
+
+    # ------------------------------------------------------------
+    # CPU (SAMPLING)
+    # ------------------------------------------------------------
+    def sample_cpu(self, seconds: float, interval_ms: float = 5.0, max_depth: int = 64,
+                   thread_prefix: Optional[str] = None, top: int = 25) -> dict:
+        """Blocking: samples every thread for ``seconds``; run it off the event loop."""
+        if not self._cpu_lock.acquire(blocking=False):
+            raise ProfilerBusy("a CPU profile is already running")
+        try:
+            return self._sample(seconds, interval_ms / 1000, max_depth, thread_prefix, top)
+        finally:
+            self._cpu_lock.release()
+
+    def _sample(self, seconds, interval, max_depth, thread_prefix, top) -> dict:
+        me = threading.get_ident()
+        labels = self._labels
+        stacks = Counter()
+        names = _thread_names()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_tick = started
+
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names = _thread_names()   # thread started during the session
+                    name = names.get(ident, f"thread-{ident}")
+                if thread_prefix and not name.startswith(thread_prefix):
+                    continue
+                stacks[(name, *_stack(frame, labels, max_depth))] += 1
+            frame = None   # don't keep the last sampled frame alive
+            samples += 1
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()   # falling behind: don't try to catch up
+
+        elapsed = time.perf_counter() - started
+        self.stats["cpu_runs"] += 1
+        self.stats["last_cpu_at"] = time.time()
+
+        per_thread, self_time, total_time = Counter(), Counter(), Counter()
+        for stack, count in stacks.items():
+            per_thread[stack[0]] += count
+            if len(stack) > 1:
+                self_time[stack[-1]] += count
+                for label in set(stack[1:]):
+                    total_time[label] += count
+
+        return {
+            "duration_s": round(elapsed, 3),
+            "interval_ms": round(interval * 1000, 3),
+            "samples": samples,
+            "threads": dict(per_thread.most_common()),
+            "top_self": [{"frame": f, "samples": c} for f, c in self_time.most_common(top)],
+            "top_total": [{"frame": f, "samples": c} for f, c in total_time.most_common(top)],
+            "collapsed": [f"{';'.join(stack)} {count}" for stack, count in stacks.most_common()],
+        }
+
+    # ------------------------------------------------------------
+    # MEMORY (TRACEMALLOC)
+    # ------------------------------------------------------------
+    def memory_diff(self, seconds: float, top: int = 25, frames: int = 10,
+                    group_by: str = "lineno") -> dict:
+        """Blocking: allocation growth over ``seconds``, grouped by "lineno", "filename" or "traceback"."""
+        if group_by not in ("lineno", "filename", "traceback"):
+            raise ValueError("group_by must be lineno, filename or traceback")
+        if not self._memory_lock.acquire(blocking=False):
+            raise ProfilerBusy("a memory profile is already running")
+
+        started_here = not tracemalloc.is_tracing()
+        try:
+            if started_here:
+                tracemalloc.start(frames)
+            before = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            time.sleep(seconds)
+            after = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            current, peak = tracemalloc.get_traced_memory()
+            overhead = tracemalloc.get_tracemalloc_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()   # frees the traces: no overhead after the session
+            self._memory_lock.release()
+
+        diff = after.compare_to(before, group_by)
+        self.stats["memory_runs"] += 1
+        self.stats["last_memory_at"] = time.time()
+
+        growth = sum(d.size_diff for d in diff)
+        return {
+            "duration_s": seconds,
+            "group_by": group_by,
+            "tracing_started_for_session": started_here,
+            "traced_kb": round(current / 1024, 1),
+            "traced_peak_kb": round(peak / 1024, 1),
+            "tracemalloc_overhead_kb": round(overhead / 1024, 1),
+            "growth_kb": round(growth / 1024, 1),
+            "top": [
+                {
+                    "location": _trace_location(d.traceback, group_by),
+                    "size_diff_kb": round(d.size_diff / 1024, 2),
+                    "size_kb": round(d.size / 1024, 2),
+                    "count_diff": d.count_diff,
+                    "count": d.count,
+                    **({"traceback": [f"{_short_path(f.filename)}:{f.lineno}" for f in reversed(d.traceback)]}
+                       if group_by == "traceback" else {}),
+                }
+                for d in diff[:top]
+            ],
+        }
+
+    # ------------------------------------------------------------
+    # THREADS
+    # ------------------------------------------------------------
+    def thread_stacks(self, max_depth: int = 64) -> list:
+        threads = {t.ident: t for t in threading.enumerate()}
+        result = []
+        for ident, frame in sys._current_frames().items():
+            thread = threads.get(ident)
+            stack = []
+            while frame is not None and len(stack) < max_depth:
+                stack.append(f"{_short_path(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}")
+                frame = frame.f_back
+            stack.reverse()
+            result.append({
+                "name": thread.name if thread else f"thread-{ident}",
+                "ident": ident,
+                "daemon": thread.daemon if thread else None,
+                "current": ident == threading.get_ident(),
+                "stack": stack,
+            })
+        result.sort(key=lambda t: t["name"])
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "cpu_active": self._cpu_lock.locked(),
+            "memory_active": self._memory_lock.locked(),
+            "tracemalloc_tracing": tracemalloc.is_tracing(),
+            "threads": threading.active_count(),
+        }
+
+
+def _trace_location(traceback, group_by: str) -> str:
+    frame = traceback[0]
+    if group_by == "filename":
+        return _short_path(frame.filename)
+    return f"{_short_path(frame.filename)}:{frame.lineno}"
+
+
+profiler = Profiler()
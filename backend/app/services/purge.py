@@ -0,0 +1,218 @@
+"""
+Purge engine — bulk deletes without long-held locks
+backend/app/services/purge.py
+
+An unfiltered purge on PostgreSQL is a single TRUNCATE (when allowed). Every
+other purge walks the matching ids in order and deletes them in bounded id
+ranges, one short transaction per batch, with an optional pause between
+batches so concurrent ingest keeps getting the table. Identity sequences are
+never reset: ids stay monotonic across purges.
+
+After a purge the dependent in-memory state is brought back in line: KPI
+counters are reconciled, correlation groups pointing at deleted parents are
+dropped and orphaned children are detached. An unfiltered purge also empties
+the heavy-hitter sketches (a filtered one keeps them: they only cover the
+last hour, and sketches cannot subtract).
+"""
+
+import time
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal, engine
+from app.models.dictionary import SEVERITY_CODES, dictionary
+from app.models.incident import Incident
+from app.services.correlation import correlation_engine
+from app.services.kpi_counters import kpi_counters
+from app.services.sketches import incident_sketches
+from app.services.storage import notify_change
+from app.services.watermark import data_watermark
+
+
+class PurgeBusy(Exception):
+    pass
+
+
+class PurgeJob:
+    def __init__(self, allow_truncate: bool = True, default_batch_size: int = 5000):
+        self.allow_truncate = allow_truncate
+        self.default_batch_size = default_batch_size
+        self.thread: Optional[Thread] = None
+        self._control_lock = Lock()
+        self._active = False   # a purge is executing; state["running"] is also its stop signal
+        self.state = {
+            "running": False,
+            "method": None,
+            "filters": {},
+            "deleted": 0,
+            "batches": 0,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+
+    # ------------------------------------------------------------
+    # CONTROL
+    # ------------------------------------------------------------
+    def start(self, source: Optional[str] = None, severity: Optional[str] = None,
+              before: Optional[datetime] = None, batch_size: Optional[int] = None,
+              pause_s: float = 0.0) -> bool:
+        if not self._claim(source, severity, before):
+            return False
+        self.thread = Thread(
+            target=self._run_safely,
+            args=(source, severity, before, batch_size or self.default_batch_size, pause_s),
+            name="incident-purge",
+            daemon=True,
+        )
+        self.thread.start()
+        return True
+
+    def run(self, source: Optional[str] = None, severity: Optional[str] = None,
+            before: Optional[datetime] = None, batch_size: Optional[int] = None,
+            pause_s: float = 0.0) -> dict:
+        """Runs a purge in the calling thread; raises PurgeBusy if one is in progress, RuntimeError on failure."""
+        if not self._claim(source, severity, before):
+            raise PurgeBusy("a purge is already running")
+        self._run_safely(source, severity, before, batch_size or self.default_batch_size, pause_s)
+        if self.state["error"]:
+            raise RuntimeError(self.state["error"])
+        return self.status()
+
+    def stop(self) -> bool:
+        if not self.state["running"]:
+            return False
+        self.state["running"] = False
+        return True
+
+    def status(self) -> dict:
+        return dict(self.state)
+
+    def _claim(self, source, severity, before) -> bool:
+        with self._control_lock:
+            if self._active:   # includes a stopped purge still finishing its batch
+                return False
+            self._active = True
+            self._begin(source, severity, before)
+            return True
+
+    def _begin(self, source, severity, before):
+        self.state.update({
+            "running": True,
+            "method": None,
+            "filters": {
+                "source": source,
+                "severity": severity,
+                "before": before.isoformat() if before else None,
+            },
+            "deleted": 0,
+            "batches": 0,
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "error": None,
+        })
+
+    # ------------------------------------------------------------
+    # WORKER
+    # ------------------------------------------------------------
+    def _run_safely(self, source, severity, before, batch_size, pause_s):
+        try:
+            filtered = source is not None or severity is not None or before is not None
+            if not filtered and self.allow_truncate and engine.dialect.name == "postgresql":
+                self._truncate()
+            else:
+                self._delete_in_batches(source, severity, before, batch_size, pause_s)
+            self._after_purge(filtered)
+        except Exception as e:
+            self.state["error"] = str(e)
+            print(f"Purge error: {e}")
+        finally:
+            self.state["running"] = False
+            self.state["finished_at"] = datetime.utcnow().isoformat()
+            with self._control_lock:
+                self._active = False
+
+    def _truncate(self):
+        self.state["method"] = "truncate"
+        with engine.begin() as conn:
+            # TRUNCATE takes this lock anyway; taking it first makes the count exact
+            conn.execute(text("LOCK TABLE incidents IN ACCESS EXCLUSIVE MODE"))
+            deleted = conn.execute(text("SELECT count(*) FROM incidents")).scalar()
+            conn.execute(text("TRUNCATE TABLE incidents"))
+        self.state["deleted"] = deleted
+        self.state["batches"] = 1
+
+    def _delete_in_batches(self, source, severity, before, batch_size, pause_s):
+        self.state["method"] = "batched"
+        filters = []
+        if source is not None:
+            source_id = dictionary.source_id(source, create=False)
+            if source_id is None:
+                return   # never ingested: nothing can match
+            filters.append(Incident.source_id == source_id)
+        if severity is not None:
+            filters.append(Incident.severity_code == SEVERITY_CODES[severity])
+        if before is not None:
+            filters.append(Incident.timestamp < before)
+
+        last_id = 0
+        db = SessionLocal()
+        try:
+            while self.state["running"]:
+                # Next bounded window of matching ids, found via the primary key
+                ids = [row.id for row in db.query(Incident.id).filter(
+                    Incident.id > last_id, *filters
+                ).order_by(Incident.id).limit(batch_size).all()]
+                if not ids:
+                    break
+
+                deleted = db.query(Incident).filter(
+                    Incident.id >= ids[0], Incident.id <= ids[-1], *filters
+                ).delete(synchronize_session=False)
+                db.commit()
+
+                last_id = ids[-1]
+                self.state["deleted"] += deleted
+                self.state["batches"] += 1
+
+                if pause_s > 0:
+                    time.sleep(pause_s)
+        finally:
+            db.close()
+
+    def _after_purge(self, filtered: bool):
+        correlation_engine.reset()
+        if not filtered:
+            incident_sketches.clear()
+        data_watermark.bump()   # deleted rows do not move max(id): invalidate cached lists
+        notify_change("delete")
+        if filtered and self.state["deleted"]:
+            # Children whose parent was purged become standalone incidents
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "UPDATE incidents SET parent_id = NULL "
+                    "WHERE parent_id IS NOT NULL "
+                    "AND NOT EXISTS (SELECT 1 FROM incidents p WHERE p.id = incidents.parent_id)"
+                ))
+        if self.state["method"] == "truncate":
+            kpi_counters.record_clear()
+        else:
+            kpi_counters.reconcile()
+
+    def purge_expired(self, retention_days: int) -> dict:
+        """Retention: deletes incidents older than ``retention_days`` (0 disables)."""
+        if retention_days <= 0:
+            return {"deleted": 0}
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        try:
+            return {"deleted": self.run(before=cutoff)["deleted"]}
+        except PurgeBusy:
+            return {"deleted": 0}   # another purge is running: next time
+
+
+_settings = get_settings()
+purge_job = PurgeJob(_settings.purge_allow_truncate, _settings.purge_batch_size)
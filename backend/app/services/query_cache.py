@@ -0,0 +1,165 @@
+"""
+Short-TTL query result cache shared by all viewers
+backend/app/services/query_cache.py
+
+Dashboards polled by many users run the same read queries at the same time.
+Results are cached per (namespace, normalized parameters) for a few seconds
+in a bounded LRU, and concurrent identical misses are coalesced: the first
+caller runs the query, the others wait for its result (single-flight).
+
+Entries are dropped explicitly when incident data changes (storage change
+hooks: inserts, purges, backfills). Generation counters (global and per
+namespace) make sure a query that started before an invalidation never
+stores its now-stale result. Other worker processes only see this
+worker's invalidations through the TTL; callers that need cross-worker
+freshness put the data watermark in their parameters and say so
+(``keyed_by_watermark``): an insert moves the watermark, so such
+namespaces are left alone on inserts and only the others are dropped.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Any, Callable, Optional
+
+from app.core.config import get_settings
+from app.services.storage import change_hooks
+
+
+def normalize_params(params: dict) -> str:
+    return json.dumps(params, default=str, sort_keys=True, separators=(",", ":"))
+
+
+class _Flight:
+    def __init__(self):
+        self.done = Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class QueryCache:
+    def __init__(self, ttl_s: float = 5.0, max_entries: int = 256):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()   # key -> (expires_at, value)
+        self._inflight: dict = {}                    # key -> _Flight
+        self._generation = 0                         # bumped by a full invalidation
+        self._generations: dict = {}                 # namespace -> bumped by its invalidations
+        self._watermark_keyed: set = set()           # namespaces whose params carry the watermark
+        self._lock = Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale_discarded": 0,
+        }
+
+    def get_or_compute(self, namespace: str, params: dict, compute: Callable[[], Any],
+                       ttl_s: Optional[float] = None, keyed_by_watermark: bool = False) -> Any:
+        """Cached result for ``(namespace, params)``, else ``compute()`` — run once per key at a time."""
+        ttl_s = self.ttl_s if ttl_s is None else ttl_s
+        if ttl_s <= 0:
+            return compute()
+        key = (namespace, normalize_params(params))
+
+        with self._lock:
+            if keyed_by_watermark:
+                self._watermark_keyed.add(namespace)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self.stats["expired"] += 1
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation_of(namespace)
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if flight.error is None:
+                    if generation == self._generation_of(namespace):
+                        self._store(key, flight.value, ttl_s)
+                    else:
+                        self.stats["stale_discarded"] += 1
+            flight.done.set()
+        return flight.value
+
+    def _store(self, key, value, ttl_s: float):
+        self._entries[key] = (time.monotonic() + ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _generation_of(self, namespace: str) -> tuple:
+        return self._generation, self._generations.get(namespace, 0)
+
+    def _drop(self, namespaces: set):
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for key in [k for k in self._entries if k[0] in namespaces]:
+            del self._entries[key]
+
+    def invalidate(self, namespace: Optional[str] = None):
+        """Drops cached results (of one namespace, or all) and any result still being computed."""
+        with self._lock:
+            if namespace is None:
+                self._generation += 1
+                self._entries.clear()
+            else:
+                self._drop({namespace})
+            self.stats["invalidations"] += 1
+
+    def on_data_change(self, kind: str):
+        if kind != "insert":
+            self.invalidate()
+            return
+        # New rows move the watermark: watermark-keyed results stay valid for their key
+        with self._lock:
+            live = {k[0] for k in self._entries} | {k[0] for k in self._inflight}
+            stale = live - self._watermark_keyed
+            if stale:
+                self._drop(stale)
+                self.stats["invalidations"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+            return {
+                **self.stats,
+                "hit_ratio": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 3) if lookups else None,
+                "size": len(self._entries),
+                "inflight": len(self._inflight),
+                "ttl_s": self.ttl_s,
+                "max_entries": self.max_entries,
+            }
+
+
+_settings = get_settings()
+query_cache = QueryCache(_settings.query_cache_ttl_s, _settings.query_cache_max_entries)
+change_hooks.append(query_cache.on_data_change)
@@ -0,0 +1,162 @@
+"""
+Ingest admission control — token buckets per source and globally
+backend/app/services/rate_limiter.py
+
+A request is admitted only if both its source bucket and the global bucket
+have tokens. Priority lanes bypass the buckets entirely: sources listed in
+``priority_sources`` and sources that recently produced a high/critical
+incident (marked "hot") are never shed, so a real outage is not hidden by
+the limiter it triggers.
+
+Source names come from clients, so every per-source map (buckets, shed
+counts, hot marks) is bounded: at ``_MAX_TRACKED_SOURCES`` idle buckets are
+dropped first, then the least recently used ones.
+"""
+
+import time
+from collections import Counter, OrderedDict
+from threading import Lock
+
+from app.core import runtime_config
+
+# Idle buckets are dropped once this many sources are tracked
+_MAX_TRACKED_SOURCES = 10_000
+# Evicted at once when no bucket is idle, so the scan is not repeated for every new source
+_LRU_EVICTION_BATCH = _MAX_TRACKED_SOURCES // 10
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        # ``now`` may predate a bucket created after it was read: never refill backwards
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def try_consume(self, cost: float, now: float) -> float:
+        """Takes ``cost`` tokens; returns 0 on success, else seconds until enough tokens exist.
+
+        A cost above the capacity (a frame bigger than the burst) takes a full
+        bucket: the bucket can never hold more, so it would otherwise never pass.
+        """
+        cost = min(cost, self.capacity)
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (cost - self.tokens) / self.rate
+
+    def refund(self, cost: float):
+        self.tokens = min(self.capacity, self.tokens + min(cost, self.capacity))
+
+
+class AdmissionController:
+    def __init__(self, limits: dict):
+        self._lock = Lock()
+        self._buckets: OrderedDict = OrderedDict()     # least recently used first
+        self._hot_until: OrderedDict = OrderedDict()   # oldest mark first
+        self.stats = {
+            "admitted": 0,
+            "priority_admitted": 0,
+            "shed": 0,
+            "shed_global": 0,
+        }
+        self.shed_by_source = Counter()
+        self.reconfigure(limits)
+
+    def reconfigure(self, limits: dict):
+        with self._lock:
+            self.limits = dict(limits)
+            self._priority = set(self.limits.get("priority_sources", []))
+            self._global = TokenBucket(self.limits["global_rate"], self.limits["global_burst"])
+            self._buckets.clear()
+
+    def mark_hot(self, source: str):
+        """Puts a source in the priority lane after it produced a high/critical incident."""
+        now = time.monotonic()
+        with self._lock:
+            self._hot_until.pop(source, None)
+            if len(self._hot_until) >= _MAX_TRACKED_SOURCES:
+                self._prune_hot(now)
+                while len(self._hot_until) >= _MAX_TRACKED_SOURCES:
+                    self._hot_until.popitem(last=False)
+            self._hot_until[source] = now + self.limits.get("hot_source_ttl_s", 300)
+
+    def admit(self, source: str, cost: float = 1.0) -> tuple:
+        """Returns (admitted, retry_after_seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            if not self.limits.get("enabled", True):
+                self.stats["admitted"] += 1
+                return True, 0.0
+
+            if source in self._priority or self._hot_until.get(source, 0.0) > now:
+                self.stats["priority_admitted"] += 1
+                return True, 0.0
+
+            bucket = self._buckets.get(source)
+            if bucket is None:
+                if len(self._buckets) >= _MAX_TRACKED_SOURCES:
+                    self._evict(now)
+                bucket = TokenBucket(self.limits["per_source_rate"], self.limits["per_source_burst"])
+                self._buckets[source] = bucket
+            else:
+                self._buckets.move_to_end(source)
+
+            wait = bucket.try_consume(cost, now)
+            if wait > 0:
+                self.stats["shed"] += 1
+                self.shed_by_source[source] += 1
+                return False, wait
+
+            wait = self._global.try_consume(cost, now)
+            if wait > 0:
+                bucket.refund(cost)
+                self.stats["shed"] += 1
+                self.stats["shed_global"] += 1
+                self.shed_by_source[source] += 1
+                return False, wait
+
+            self.stats["admitted"] += 1
+            return True, 0.0
+
+    def _evict(self, now: float):
+        # A bucket that has refilled completely carries no state worth keeping
+        for source, bucket in list(self._buckets.items()):
+            bucket._refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self._buckets[source]
+        # Every bucket busy: drop the least recently used ones
+        if len(self._buckets) >= _MAX_TRACKED_SOURCES:
+            for _ in range(_LRU_EVICTION_BATCH):
+                self._buckets.popitem(last=False)
+        for source in [s for s in self.shed_by_source if s not in self._buckets]:
+            del self.shed_by_source[source]
+        self._prune_hot(now)
+
+    def _prune_hot(self, now: float):
+        for source in [s for s, t in self._hot_until.items() if t <= now]:
+            del self._hot_until[source]
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                **self.stats,
+                "shed_by_source": dict(self.shed_by_source.most_common(20)),
+                "tracked_sources": len(self._buckets),
+                "hot_sources": sorted(s for s, t in self._hot_until.items() if t > now),
+                "limits": self.limits,
+            }
+
+
+admission_controller = AdmissionController(runtime_config.ingest_limits)
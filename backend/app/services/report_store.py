@@ -0,0 +1,144 @@
+"""
+Store of pre-rendered PDF reports
+backend/app/services/report_store.py
+
+The scheduler renders the standard day/week/month reports in the background;
+the reports endpoint serves the latest one that is still fresh enough and
+only renders on demand for custom date ranges (or when no fresh copy exists).
+A "day" report is only reused on the same calendar day, and every stored
+report is dropped when incidents are purged (storage change hook).
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.report import ReportArtifact
+from app.services.storage import change_hooks
+
+PRERENDERED_PERIODS = ("day", "week", "month")
+CALENDAR_PERIODS = ("day",)   # fixed start (midnight), unlike the rolling week/month windows
+
+
+def resolve_period(period: Optional[str], start_date: Optional[str] = None,
+                   end_date: Optional[str] = None, now: Optional[datetime] = None) -> tuple:
+    """Returns (start, end) for a report; raises ValueError for bad input."""
+    now = now or datetime.now()
+
+    if start_date and end_date:
+        # Mode personnalisé
+        return datetime.fromisoformat(start_date), datetime.fromisoformat(end_date)
+    if period == "day":
+        return datetime(now.year, now.month, now.day), now
+    if period == "week":
+        return now - timedelta(days=7), now
+    if period == "month":
+        return now - timedelta(days=30), now
+    if period == "all":
+        return datetime(2020, 1, 1), now   # ancien historique large
+    raise ValueError(f"Période invalide: {period}")
+
+
+class ReportStore:
+    def __init__(self, reports_dir: str, keep_per_period: int = 3):
+        self.reports_dir = reports_dir or os.path.join(tempfile.gettempdir(), "sentinel_reports")
+        self.keep_per_period = keep_per_period
+        self._generation = 0   # bumped by purges: renders started before are not stored
+
+    def latest(self, period: str, max_age_s: int) -> Optional[ReportArtifact]:
+        filters = [
+            ReportArtifact.period == period,
+            ReportArtifact.created_at >= datetime.utcnow() - timedelta(seconds=max_age_s),
+        ]
+        if period in CALENDAR_PERIODS:
+            # Yesterday's 23:50 render is not today's report
+            filters.append(ReportArtifact.start_date == resolve_period(period)[0])
+
+        db = SessionLocal()
+        try:
+            artifact = db.query(ReportArtifact).filter(*filters).order_by(ReportArtifact.created_at.desc()).first()
+        finally:
+            db.close()
+
+        # Metadata can outlive the file (other host, tmp cleanup)
+        if artifact is None or not os.path.exists(artifact.path):
+            return None
+        return artifact
+
+    def prerender(self, period: str) -> dict:
+        from app.services.pdf_report_generator import PDFReportGenerator   # ReportLab on first render
+
+        os.makedirs(self.reports_dir, exist_ok=True)
+        start, end = resolve_period(period)
+        generation = self._generation
+        path = os.path.join(self.reports_dir, f"{period}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.pdf")
+        partial = path + ".part"
+
+        db = SessionLocal()
+        try:
+            began = time.perf_counter()
+            PDFReportGenerator(db).generate_report(start, end, period, pdf_path=partial)
+            elapsed_ms = (time.perf_counter() - began) * 1000
+            if generation != self._generation:
+                # Incidents were purged while rendering: this PDF shows deleted data
+                return {"period": period, "path": None, "generation_ms": round(elapsed_ms, 1), "discarded": True}
+            os.replace(partial, path)   # readers never see a half-written PDF
+
+            db.add(ReportArtifact(
+                period=period,
+                start_date=start,
+                end_date=end,
+                path=path,
+                size_bytes=os.path.getsize(path),
+                generation_ms=round(elapsed_ms, 1),
+            ))
+            db.commit()
+            self._prune(db, period)
+        finally:
+            db.close()
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        return {"period": period, "path": path, "generation_ms": round(elapsed_ms, 1)}
+
+    def prerender_all(self) -> dict:
+        return {period: self.prerender(period)["generation_ms"] for period in PRERENDERED_PERIODS}
+
+    def invalidate(self) -> int:
+        """Deletes every stored report (files and metadata); returns how many."""
+        self._generation += 1
+        db = SessionLocal()
+        try:
+            artifacts = db.query(ReportArtifact).all()
+            for artifact in artifacts:
+                if os.path.exists(artifact.path):
+                    os.remove(artifact.path)
+                db.delete(artifact)
+            db.commit()
+        finally:
+            db.close()
+        return len(artifacts)
+
+    def on_data_change(self, kind: str):
+        if kind == "delete":
+            self.invalidate()
+
+    def _prune(self, db, period: str):
+        stale = db.query(ReportArtifact).filter(
+            ReportArtifact.period == period
+        ).order_by(ReportArtifact.created_at.desc()).offset(self.keep_per_period).all()
+
+        for artifact in stale:
+            if os.path.exists(artifact.path):
+                os.remove(artifact.path)
+            db.delete(artifact)
+        db.commit()
+
+
+_settings = get_settings()
+report_store = ReportStore(_settings.reports_dir, _settings.reports_keep_per_period)
+change_hooks.append(report_store.on_data_change)
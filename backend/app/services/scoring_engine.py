@@ -0,0 +1,126 @@
+"""
+Parallel scoring engine — shards feature matrices across a process pool
+backend/app/services/scoring_engine.py
+
+The input matrix and the output scores live in shared memory, so only
+(offset, length) pairs cross the process boundary. Each worker unpickles the
+fitted model once in its initializer and reuses it for every shard.
+"""
+
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.detectors import IsolationForestDetector, detector_registry
+
+# Per-process model, set once by the pool initializer
+_worker_model = None
+
+
+def _init_worker(model_bytes: bytes) -> None:
+    global _worker_model
+    _worker_model = pickle.loads(model_bytes)
+
+
+def _score_shard(in_name: str, out_name: str, shape: tuple, start: int, stop: int) -> int:
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=in_shm.buf)
+        scores = np.ndarray((shape[0],), dtype=np.float64, buffer=out_shm.buf)
+        scores[start:stop] = _worker_model.decision_function(matrix[start:stop])
+        return stop - start
+    finally:
+        in_shm.close()
+        out_shm.close()
+
+
+class ScoringEngine:
+    def __init__(self, detector: Optional[IsolationForestDetector] = None, workers: int = 0,
+                 min_parallel_rows: int = 4096):
+        self.detector = detector or detector_registry.isolation_forest
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_rows = min_parallel_rows
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_model = None
+        self._lock = Lock()
+
+    # ------------------------------------------------------------
+    # POOL
+    # ------------------------------------------------------------
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Restart the pool whenever the detector was refitted, so workers never
+        # score with a stale model.
+        if self._pool is None or self._pool_model is not self.detector.model:
+            self.close()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(pickle.dumps(self.detector.model),),
+            )
+            self._pool_model = self.detector.model
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._pool_model = None
+
+    # ------------------------------------------------------------
+    # SCORING
+    # ------------------------------------------------------------
+    def score(self, matrix: np.ndarray) -> np.ndarray:
+        """Returns decision_function scores for every row of ``matrix``."""
+        matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        n_rows = matrix.shape[0]
+
+        if self.workers <= 1 or n_rows < self.min_parallel_rows:
+            return self.detector.score_batch(matrix)
+
+        self.detector.fit_for_features(matrix.shape[1])
+
+        in_shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+        out_shm = shared_memory.SharedMemory(create=True, size=n_rows * 8)
+        try:
+            np.ndarray(matrix.shape, dtype=np.float64, buffer=in_shm.buf)[:] = matrix
+
+            # One contiguous shard per worker keeps per-task overhead negligible
+            bounds = np.linspace(0, n_rows, self.workers + 1, dtype=int)
+            with self._lock:
+                pool = self._get_pool()
+                futures = [
+                    pool.submit(_score_shard, in_shm.name, out_shm.name, matrix.shape,
+                                int(start), int(stop))
+                    for start, stop in zip(bounds[:-1], bounds[1:])
+                    if stop > start
+                ]
+                for future in futures:
+                    future.result()
+
+            return np.ndarray((n_rows,), dtype=np.float64, buffer=out_shm.buf).copy()
+        finally:
+            in_shm.close()
+            in_shm.unlink()
+            out_shm.close()
+            out_shm.unlink()
+
+    def predict(self, matrix: np.ndarray) -> tuple:
+        """Returns (scores, is_anomaly) arrays — same rule as IsolationForest.predict."""
+        scores = self.score(matrix)
+        return scores, scores < 0
+
+
+@lru_cache(maxsize=1)
+def get_scoring_engine() -> ScoringEngine:
+    s = get_settings()
+    return ScoringEngine(workers=s.scoring_workers, min_parallel_rows=s.scoring_min_parallel_rows)
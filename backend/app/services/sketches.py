@@ -0,0 +1,223 @@
+"""
+Streaming heavy-hitter sketches over recent ingest
+backend/app/services/sketches.py
+
+"Top noisy sources in the last hour" without touching the database: every
+stored incident updates, in fixed-size time buckets (by arrival time),
+
+  * a Count-Min sketch (frequency estimates, never under-counting),
+  * a Space-Saving summary (the candidate heavy hitters),
+  * a HyperLogLog (distinct keys),
+
+for a few streams: all incidents per source, anomalies per source, and the
+features that drove anomalies (explanations). A window query merges the
+buckets it covers — CMS tables add up, HLL registers take the max — then
+ranks the Space-Saving candidates by their merged CMS estimate. Memory and
+query time depend on the sketch sizes, not on traffic or on the number of
+distinct sources. Sketches are per process, like the KPI counters.
+"""
+
+import hashlib
+import math
+import time
+from collections import Counter
+from functools import lru_cache
+from threading import Lock
+import numpy as np
+
+from app.core.config import get_settings
+
+STREAMS = ("source", "anomaly_source", "anomaly_feature")
+_MASK64 = (1 << 64) - 1
+
+
+@lru_cache(maxsize=65536)
+def _hash(key: str) -> tuple:
+    """Two independent 64-bit hashes (double hashing for the CMS rows, h1 for HLL)."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key: str) -> np.ndarray:
+        h1, h2 = _hash(key)
+        return np.array([((h1 + i * h2) & _MASK64) % self.width for i in range(self.depth)])
+
+    def add(self, key: str, count: int = 1):
+        self.table[self._rows, self._columns(key)] += count
+
+    def estimate(self, key: str) -> int:
+        return int(self.table[self._rows, self._columns(key)].min())
+
+    def merge(self, other: "CountMinSketch"):
+        self.table += other.table
+
+    @property
+    def epsilon(self) -> float:
+        """Over-count is at most epsilon × total with probability 1 - e^-depth."""
+        return math.e / self.width
+
+
+class SpaceSaving:
+    """Top-k candidates with over-estimated counts (Metwally et al.)."""
+
+    def __init__(self, k: int = 50):
+        self.k = k
+        self.counts: dict = {}
+
+    def add(self, key: str, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.k:
+            self.counts[key] = count
+        else:
+            victim = min(self.counts, key=self.counts.get)
+            self.counts[key] = self.counts.pop(victim) + count   # inherits the evicted count
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = 12):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+        self._alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, key: str):
+        h1, _ = _hash(key)
+        index = h1 >> (64 - self.p)
+        rest = h1 & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        raw = self._alpha * self.m * self.m / float(np.sum(np.exp2(-self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return round(self.m * math.log(self.m / zeros))   # linear counting for small sets
+        return round(raw)
+
+
+class StreamSketch:
+    def __init__(self, width: int, depth: int, top_k: int, hll_precision: int):
+        self.total = 0
+        self.cms = CountMinSketch(width, depth)
+        self.top = SpaceSaving(top_k)
+        self.hll = HyperLogLog(hll_precision)
+
+    def add(self, key: str, count: int):
+        self.total += count
+        self.cms.add(key, count)
+        self.top.add(key, count)
+        self.hll.add(key)
+
+
+class SketchWindow:
+    def __init__(self, bucket_s: int = 60, n_buckets: int = 60, width: int = 1024, depth: int = 4,
+                 top_k: int = 50, hll_precision: int = 12):
+        self.bucket_s = bucket_s
+        self.n_buckets = n_buckets
+        self._params = (width, depth, top_k, hll_precision)
+        self._ring: list = [None] * n_buckets   # (bucket id, {stream: StreamSketch})
+        self._lock = Lock()
+        self.stats = {"recorded": 0}
+
+    def _bucket(self, bucket_id: int) -> dict:
+        slot = bucket_id % self.n_buckets
+        entry = self._ring[slot]
+        if entry is None or entry[0] != bucket_id:
+            entry = self._ring[slot] = (bucket_id, {})   # recycles the expired bucket
+        return entry[1]
+
+    def record(self, incidents: list):
+        """Called for every stored batch; groups the batch first, so a frame costs a few updates."""
+        if not incidents:
+            return
+        streams = {name: Counter() for name in STREAMS}
+        for incident in incidents:
+            source = incident.get("source")
+            streams["source"][source] += 1
+            if incident.get("is_anomaly"):
+                streams["anomaly_source"][source] += 1
+                for feature in incident.get("contributions") or {}:   # {feature: z-score}
+                    streams["anomaly_feature"][f"{source}:{feature}"] += 1
+
+        with self._lock:
+            bucket = self._bucket(int(time.time() // self.bucket_s))
+            for name, counts in streams.items():
+                if not counts:
+                    continue
+                sketch = bucket.get(name)
+                if sketch is None:
+                    sketch = bucket[name] = StreamSketch(*self._params)
+                for key, count in counts.items():
+                    sketch.add(str(key), count)
+            self.stats["recorded"] += len(incidents)
+
+    def top(self, stream: str = "source", window_s: int = 3600, n: int = 10) -> dict:
+        """Heavy hitters of ``stream`` over the last ``window_s`` seconds (rounded up to buckets)."""
+        if stream not in STREAMS:
+            raise ValueError(f"unknown stream: {stream}")
+        n_buckets = min(self.n_buckets, max(1, math.ceil(window_s / self.bucket_s)))
+        newest = int(time.time() // self.bucket_s)
+
+        with self._lock:
+            sketches = [
+                entry[1][stream] for entry in self._ring
+                if entry is not None and newest - n_buckets < entry[0] <= newest and stream in entry[1]
+            ]
+            merged = StreamSketch(*self._params)
+            candidates = set()
+            for sketch in sketches:
+                merged.total += sketch.total
+                merged.cms.merge(sketch.cms)
+                merged.hll.merge(sketch.hll)
+                candidates.update(sketch.top.counts)
+            ranked = sorted(((merged.cms.estimate(k), k) for k in candidates), reverse=True)[:n]
+
+        return {
+            "stream": stream,
+            "window_s": n_buckets * self.bucket_s,
+            "buckets": len(sketches),
+            "total": merged.total,
+            "distinct_estimate": merged.hll.estimate() if sketches else 0,
+            "error_bound": math.ceil(merged.cms.epsilon * merged.total),
+            "top": [{"key": key, "count": count} for count, key in ranked],
+        }
+
+    def clear(self):
+        with self._lock:
+            self._ring = [None] * self.n_buckets
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            live = [entry[1] for entry in self._ring if entry is not None]
+            nbytes = sum(
+                s.cms.table.nbytes + s.hll.registers.nbytes for bucket in live for s in bucket.values()
+            )
+        return {
+            **self.stats,
+            "bucket_s": self.bucket_s,
+            "max_window_s": self.bucket_s * self.n_buckets,
+            "live_buckets": len(live),
+            "sketch_bytes": nbytes,
+            "streams": list(STREAMS),
+        }
+
+
+_settings = get_settings()
+incident_sketches = SketchWindow(
+    bucket_s=_settings.sketch_bucket_s,
+    n_buckets=_settings.sketch_buckets,
+    width=_settings.sketch_cms_width,
+    top_k=_settings.sketch_top_k,
+)
@@ -1,22 +1,148 @@
+from typing import Callable, List, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
 from app.db.session import SessionLocal
+from app.models.dictionary import SEVERITY_CODES, dictionary
 from app.models.incident import Incident
+from app.services.correlation import correlation_engine
+from app.services.features import extract_hot_features
+from app.services.kpi_counters import kpi_counters
+from app.services.sketches import incident_sketches
+
+# Called with "insert", "update" or "delete" after a commit that changed incident rows
+change_hooks: List[Callable[[str], None]] = []
+
+
+def notify_change(kind: str):
+    for hook in change_hooks:
+        hook(kind)
+
 
 class IncidentStorage:
 
-    def save(self, incident_data: dict):
+    @staticmethod
+    def _row(incident_data: dict, idempotency_key: Optional[str] = None) -> dict:
+        return {
+            "timestamp": incident_data["timestamp"],
+            "source_id": dictionary.source_id(incident_data["source"]),
+            "values": incident_data["values"],
+            "score": incident_data["score"],
+            "is_anomaly": 1 if incident_data["is_anomaly"] else 0,
+            "contributions": incident_data.get("contributions"),
+            "severity_code": incident_data.get("severity_code", SEVERITY_CODES.get(incident_data["severity"])),
+            "type_code": incident_data.get("type_code"),
+            "message_id": dictionary.message_id(incident_data["message"]),
+            "idempotency_key": idempotency_key,
+            "parent_id": incident_data.get("parent_id"),
+            **extract_hot_features(incident_data["source"], incident_data["values"]),
+        }
+
+    def save(self, incident_data: dict, idempotency_key: Optional[str] = None):
+        db = SessionLocal()
+        try:
+            incident = Incident(**self._row(incident_data, idempotency_key))
+            db.add(incident)
+            db.flush()
+            self._commit_correlated(db, [incident_data], [incident.id])
+            db.refresh(incident)
+            kpi_counters.record_insert([incident_data], [incident.id])
+            incident_sketches.record([incident_data])
+            notify_change("insert")
+            return incident
+        finally:
+            db.close()
+
+    def save_many(self, incidents: list, idempotency_keys: Optional[list] = None) -> list:
+        """Bulk insert in a single transaction; returns the new ids in input order."""
+        if not incidents:
+            return []
+        keys = idempotency_keys or [None] * len(incidents)
         db = SessionLocal()
-        incident = Incident(
-            timestamp=incident_data["timestamp"],
-            source=incident_data["source"],
-            values=incident_data["values"],
-            score=incident_data["score"],
-            is_anomaly=1 if incident_data["is_anomaly"] else 0,
-            severity=incident_data["severity"],
-            type=incident_data["type"],
-            message=incident_data["message"]
-        )
-        db.add(incident)
-        db.commit()
-        db.refresh(incident)
-        db.close()
-        return incident
+        try:
+            ids = db.scalars(
+                insert(Incident).returning(Incident.id, sort_by_parameter_order=True),
+                [self._row(i, k) for i, k in zip(incidents, keys)],
+            ).all()
+            self._commit_correlated(db, incidents, ids)
+            kpi_counters.record_insert(incidents, ids)
+            incident_sketches.record(incidents)
+            notify_change("insert")
+            return list(ids)
+        finally:
+            db.close()
+
+    def save_idempotent(self, incident_data: dict, idempotency_key: str) -> tuple:
+        """Returns (incident, created); an existing row with the same key wins."""
+        try:
+            return self.save(incident_data, idempotency_key), True
+        except IntegrityError:
+            existing = self.find_by_idempotency_key(idempotency_key)
+            if existing is None:
+                raise
+            return existing, False
+
+    def save_journaled(self, records: list) -> tuple:
+        """Bulk insert of replayed journal records, skipping keys already stored.
+
+        Returns (inserted incidents, their ids, number of duplicates skipped).
+        """
+        keys = [r["key"] for r in records if r["key"]]
+        existing = set()
+        if keys:
+            db = SessionLocal()
+            try:
+                existing = set(db.scalars(
+                    select(Incident.idempotency_key).where(Incident.idempotency_key.in_(keys))
+                ))
+            finally:
+                db.close()
+
+        fresh, seen = [], set()
+        for record in records:
+            key = record["key"]
+            if key and (key in existing or key in seen):
+                continue
+            seen.add(key)
+            fresh.append(record)
+
+        incidents = [r["incident"] for r in fresh]
+        ids = self.save_many(incidents, [r["key"] for r in fresh])
+        return incidents, ids, len(records) - len(fresh)
+
+    def find_by_idempotency_key(self, idempotency_key: str) -> Optional[Incident]:
+        db = SessionLocal()
+        try:
+            return db.query(Incident).filter(Incident.idempotency_key == idempotency_key).first()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _commit_correlated(db, incidents: list, ids: list) -> None:
+        """Registers the new rows with the correlation engine and commits them together
+        with the late parent links and parent occurrence counters."""
+        try:
+            links, occurrences = correlation_engine.register(incidents, ids)
+            # Core executemany: plain UPDATE ... WHERE id = ? without ORM synchronization
+            conn = db.connection()
+            if links:
+                conn.execute(
+                    update(Incident).where(Incident.id == bindparam("child_id"))
+                    .values(parent_id=bindparam("new_parent_id")),
+                    [{"child_id": c, "new_parent_id": p} for c, p in links.items()],
+                )
+            if occurrences:
+                conn.execute(
+                    update(Incident).where(Incident.id == bindparam("parent"))
+                    .values(
+                        occurrences=func.coalesce(Incident.occurrences, 1) + bindparam("delta"),
+                        last_seen=bindparam("seen"),
+                    ),
+                    [{"parent": p, "delta": d, "seen": ts} for p, (d, ts) in occurrences.items()],
+                )
+            db.commit()
+        except Exception:
+            # The window index may now point at rows that were never stored
+            correlation_engine.reset()
+            raise
@@ -0,0 +1,145 @@
+"""
+Synthetic sensor data — realistic per-source generators
+backend/app/services/synthetic_data.py
+
+Used by the admin generator, the load generator and the detector benchmark.
+"""
+
+import random
+
+
+# ---------------------------------------------------------------------------
+# Realistic per-type data generators
+# Each returns (source: str, values: dict) with 4 numeric features.
+# "Normal" values are tight clusters; "anomaly" values are clear outliers.
+# ---------------------------------------------------------------------------
+
+def _payment(anomaly: bool):
+    if anomaly:
+        return "sensor-payment", {
+            "amount":           round(random.uniform(3000, 50000), 2),
+            "response_time_ms": random.randint(2000, 8000),
+            "failed_attempts":  random.randint(3, 10),
+            "num_items":        random.randint(1, 3),
+        }
+    return "sensor-payment", {
+        "amount":           round(random.uniform(5, 500), 2),
+        "response_time_ms": random.randint(80, 500),
+        "failed_attempts":  0,
+        "num_items":        random.randint(1, 10),
+    }
+
+
+def _login(anomaly: bool):
+    if anomaly:
+        return "sensor-login", {
+            "attempt_count":     random.randint(10, 50),
+            "session_duration_s": random.randint(1, 5),
+            "failed_count_24h":  random.randint(5, 20),
+            "new_device":        1,
+        }
+    return "sensor-login", {
+        "attempt_count":     1,
+        "session_duration_s": random.randint(120, 3600),
+        "failed_count_24h":  random.randint(0, 1),
+        "new_device":        0,
+    }
+
+
+def _api(anomaly: bool):
+    if anomaly:
+        return "sensor-api", {
+            "response_time_ms": random.randint(5000, 30000),
+            "error_rate_pct":   round(random.uniform(30, 100), 1),
+            "requests_per_min": random.randint(500, 5000),
+            "timeout_count":    random.randint(5, 50),
+        }
+    return "sensor-api", {
+        "response_time_ms": random.randint(50, 300),
+        "error_rate_pct":   round(random.uniform(0, 2), 1),
+        "requests_per_min": random.randint(10, 100),
+        "timeout_count":    0,
+    }
+
+
+def _database(anomaly: bool):
+    if anomaly:
+        return "sensor-database", {
+            "query_time_ms":      random.randint(5000, 30000),
+            "rows_affected":      random.randint(50000, 1000000),
+            "pool_usage_pct":     round(random.uniform(90, 100), 1),
+            "deadlocks":          random.randint(1, 10),
+        }
+    return "sensor-database", {
+        "query_time_ms":      random.randint(10, 200),
+        "rows_affected":      random.randint(1, 1000),
+        "pool_usage_pct":     round(random.uniform(10, 50), 1),
+        "deadlocks":          0,
+    }
+
+
+def _mail(anomaly: bool):
+    if anomaly:
+        return "sensor-mail", {
+            "send_time_ms":      random.randint(5000, 20000),
+            "recipient_count":   random.randint(1000, 50000),
+            "spam_score_pct":    round(random.uniform(70, 100), 1),
+            "bounce_rate_pct":   round(random.uniform(30, 90), 1),
+        }
+    return "sensor-mail", {
+        "send_time_ms":      random.randint(100, 500),
+        "recipient_count":   random.randint(1, 10),
+        "spam_score_pct":    round(random.uniform(0, 10), 1),
+        "bounce_rate_pct":   round(random.uniform(0, 3), 1),
+    }
+
+
+def _checkout(anomaly: bool):
+    if anomaly:
+        return "sensor-checkout", {
+            "cart_value":          round(random.uniform(5000, 50000), 2),
+            "payment_time_s":      random.randint(60, 300),
+            "retry_count":         random.randint(3, 10),
+            "failed_payment_24h":  random.randint(5, 20),
+        }
+    return "sensor-checkout", {
+        "cart_value":          round(random.uniform(10, 300), 2),
+        "payment_time_s":      random.randint(2, 10),
+        "retry_count":         0,
+        "failed_payment_24h":  random.randint(0, 1),
+    }
+
+
+def _search(anomaly: bool):
+    if anomaly:
+        return "sensor-search", {
+            "query_time_ms":      random.randint(5000, 20000),
+            "results_count":      0,
+            "query_length":       random.randint(500, 5000),
+            "cache_miss_rate_pct": round(random.uniform(80, 100), 1),
+        }
+    return "sensor-search", {
+        "query_time_ms":      random.randint(20, 200),
+        "results_count":      random.randint(5, 100),
+        "query_length":       random.randint(3, 50),
+        "cache_miss_rate_pct": round(random.uniform(0, 20), 1),
+    }
+
+
+def _upload(anomaly: bool):
+    if anomaly:
+        return "sensor-upload", {
+            "file_size_mb":      round(random.uniform(500, 5000), 1),
+            "upload_duration_s": random.randint(600, 3600),
+            "error_count":       random.randint(1, 10),
+            "retry_count":       random.randint(3, 10),
+        }
+    return "sensor-upload", {
+        "file_size_mb":      round(random.uniform(0.1, 50), 1),
+        "upload_duration_s": random.randint(1, 30),
+        "error_count":       0,
+        "retry_count":       0,
+    }
+
+
+TYPE_GENERATORS = [_payment, _login, _api, _database, _mail, _checkout, _search, _upload]
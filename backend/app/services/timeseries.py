@@ -0,0 +1,136 @@
+"""
+Incident time series from bucketed aggregates
+backend/app/services/timeseries.py
+
+One GROUP BY (time bucket, source) query feeds every time-series chart of a
+period. PostgreSQL buckets with ``date_trunc``; other databases (SQLite in
+dev) use the equivalent ``strftime``/``date`` expressions. The bucket
+size is chosen from the period length so a chart has at most
+``MAX_BUCKETS`` points; an explicit unit that would need more is refused.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Integer, func, select
+from sqlalchemy.orm import Session
+
+from app.models.dictionary import SEVERITY_CODES, dictionary
+from app.models.incident import Incident
+
+MAX_BUCKETS = 200
+
+# unit → approximate length in seconds, smallest first
+BUCKET_UNITS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 31 * 86400,
+}
+
+_SQLITE_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m-01",
+}
+
+
+def choose_bucket(start: datetime, end: datetime) -> str:
+    span = max((end - start).total_seconds(), 1)
+    for unit, seconds in BUCKET_UNITS.items():
+        if span / seconds <= MAX_BUCKETS:
+            return unit
+    return "month"
+
+
+def truncate(ts: datetime, unit: str) -> datetime:
+    if unit == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if unit == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())   # Monday, as date_trunc('week')
+    return day.replace(day=1)
+
+
+def next_bucket(ts: datetime, unit: str) -> datetime:
+    if unit == "month":
+        return ts.replace(year=ts.year + ts.month // 12, month=ts.month % 12 + 1)
+    return ts + timedelta(seconds=BUCKET_UNITS[unit])
+
+
+def bucket_expr(dialect: str, unit: str):
+    if dialect == "postgresql":
+        return func.date_trunc(unit, Incident.timestamp)
+    if unit == "week":
+        return func.date(Incident.timestamp, "-6 days", "weekday 1")
+    return func.strftime(_SQLITE_FORMATS[unit], Incident.timestamp)
+
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def incident_timeseries(db: Session, start: datetime, end: datetime,
+                        unit: Optional[str] = None, top_sources: int = 5) -> dict:
+    """Incidents per bucket (total, high/critical, per source), zero-filled.
+
+    ``by_source`` keeps the ``top_sources`` busiest sources of the period.
+    Raises ValueError when ``unit`` would need more than ``MAX_BUCKETS`` buckets.
+    """
+    in_range = (Incident.timestamp >= start, Incident.timestamp <= end)
+
+    # Long periods ("all") start at the first incident, not at the nominal start
+    first = db.execute(select(func.min(Incident.timestamp)).where(*in_range)).scalar()
+    if first is None:
+        return {"unit": unit or choose_bucket(start, end), "buckets": [], "total": [], "high": [], "by_source": {}}
+    first = max(_as_datetime(first), start)
+    unit = unit or choose_bucket(first, end)
+    needed = (end - truncate(first, unit)).total_seconds() / BUCKET_UNITS[unit]
+    if needed > MAX_BUCKETS:
+        raise ValueError(
+            f"{unit} buckets over this period would need {needed:.0f} points (max {MAX_BUCKETS}); "
+            f"use a larger unit such as {choose_bucket(first, end)}"
+        )
+
+    bucket = bucket_expr(db.get_bind().dialect.name, unit).label("bucket")
+    rows = db.execute(
+        select(
+            bucket,
+            Incident.source_id,
+            func.count(Incident.id),
+            func.sum(func.cast(Incident.severity_code >= SEVERITY_CODES["high"], Integer)),
+        ).where(*in_range).group_by(bucket, Incident.source_id)
+    ).all()
+
+    buckets = []
+    ts = truncate(first, unit)
+    while ts <= end:
+        buckets.append(ts)
+        ts = next_bucket(ts, unit)
+    position = {b: n for n, b in enumerate(buckets)}
+
+    total = [0] * len(buckets)
+    high = [0] * len(buckets)
+    per_source: dict = {}
+    for value, source_id, count, high_count in rows:
+        n = position.get(_as_datetime(value))
+        if n is None:
+            continue
+        total[n] += count
+        high[n] += high_count or 0
+        per_source.setdefault(source_id, [0] * len(buckets))[n] += count
+
+    busiest = sorted(per_source.items(), key=lambda item: -sum(item[1]))[:top_sources]
+    return {
+        "unit": unit,
+        "buckets": buckets,
+        "total": total,
+        "high": high,
+        "by_source": {dictionary.source_name(source_id): series for source_id, series in busiest},
+    }
@@ -0,0 +1,67 @@
+"""
+Data watermark for conditional GETs on incident data
+backend/app/services/watermark.py
+
+(max incident id, delete generation): the id moves on every insert, the
+generation is bumped by anything that deletes or rewrites existing rows
+(purges, backfills). Both come from one query on indexed data, shared by
+every worker, so it is safe to answer "not modified" from it.
+"""
+
+import time
+from threading import Lock
+from typing import Tuple
+
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models.incident import Incident
+from app.models.job_state import JobState
+
+GENERATION_NAME = "data_generation"
+
+
+class DataWatermark:
+    def __init__(self):
+        self._lock = Lock()
+        self._last = None
+        self._changed_at = time.time()
+
+    def current(self) -> Tuple[int, int]:
+        db = SessionLocal()
+        try:
+            max_id, state = db.execute(select(
+                select(func.max(Incident.id)).scalar_subquery(),
+                select(JobState.state).where(JobState.name == GENERATION_NAME).scalar_subquery(),
+            )).one()
+        finally:
+            db.close()
+        value = (max_id or 0, (state or {}).get("generation", 0))
+
+        with self._lock:
+            if value != self._last:
+                self._last = value
+                self._changed_at = time.time()
+        return value
+
+    def last_modified(self) -> float:
+        """When this process first saw the current watermark (Last-Modified)."""
+        return self._changed_at
+
+    def bump(self) -> int:
+        """Marks existing rows as changed; call after deletes or in-place rewrites."""
+        db = SessionLocal()
+        try:
+            state = db.get(JobState, GENERATION_NAME)
+            if state is None:
+                state = JobState(name=GENERATION_NAME, state={"generation": 0})
+                db.add(state)
+            generation = (state.state or {}).get("generation", 0) + 1
+            state.state = {"generation": generation}
+            db.commit()
+            return generation
+        finally:
+            db.close()
+
+
+data_watermark = DataWatermark()
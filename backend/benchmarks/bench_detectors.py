@@ -0,0 +1,87 @@
+"""
+Benchmark — detector backends on the synthetic sensor data
+backend/benchmarks/bench_detectors.py
+
+For every source in TYPE_GENERATORS, streams labelled points (normal +
+injected anomalies) through each backend in ingest-sized batches and
+reports throughput and detection quality (precision / recall / F1 of the
+``score < 0`` rule).
+
+Usage (from backend/):
+    python -m benchmarks.bench_detectors --points 5000 --anomaly-rate 5 --batch 1
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.services.detectors import DETECTOR_BACKENDS, feature_matrix
+from app.services.synthetic_data import TYPE_GENERATORS
+
+
+def _dataset(gen, n_points: int, anomaly_rate: float):
+    labels = np.array([random.random() < anomaly_rate for _ in range(n_points)])
+    # A clean warm-up prefix, as a detector would see after deployment
+    labels[:200] = False
+    rows = []
+    for is_anomaly in labels:
+        source, values = gen(bool(is_anomaly))
+        rows.append(values)
+    # Same column layout (sorted feature names) as ingest, the explainer and the backfill
+    return source, feature_matrix(rows), labels
+
+
+def _quality(flags: np.ndarray, labels: np.ndarray) -> tuple:
+    tp = int((flags & labels).sum())
+    fp = int((flags & ~labels).sum())
+    fn = int((~flags & labels).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=5000, help="points per source")
+    parser.add_argument("--anomaly-rate", type=float, default=5.0, help="percent of injected anomalies")
+    parser.add_argument("--batch", type=int, default=1, help="points per score_batch call (1 = JSON ingest)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    datasets = [_dataset(gen, args.points, args.anomaly_rate / 100) for gen in TYPE_GENERATORS]
+
+    print(f"{'backend':<18} {'source':<16} {'points/sec':>12} {'precision':>10} {'recall':>8} {'f1':>6}")
+    for backend, factory in DETECTOR_BACKENDS.items():
+        totals = {"seconds": 0.0, "flags": [], "labels": []}
+        for source, matrix, labels in datasets:
+            detector = factory()
+            flags = np.empty(len(matrix), dtype=bool)
+
+            start = time.perf_counter()
+            for offset in range(0, len(matrix), args.batch):
+                chunk = matrix[offset:offset + args.batch]
+                _, chunk_flags = detector.predict_batch(chunk)
+                flags[offset:offset + len(chunk)] = chunk_flags
+            elapsed = time.perf_counter() - start
+
+            precision, recall, f1 = _quality(flags, labels)
+            print(f"{backend:<18} {source:<16} {len(matrix) / elapsed:>12,.0f} "
+                  f"{precision:>10.2f} {recall:>8.2f} {f1:>6.2f}")
+            totals["seconds"] += elapsed
+            totals["flags"].append(flags)
+            totals["labels"].append(labels)
+
+        precision, recall, f1 = _quality(np.concatenate(totals["flags"]), np.concatenate(totals["labels"]))
+        n_points = sum(len(f) for f in totals["flags"])
+        print(f"{backend:<18} {'ALL':<16} {n_points / totals['seconds']:>12,.0f} "
+              f"{precision:>10.2f} {recall:>8.2f} {f1:>6.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark — points/sec of the parallel scoring engine across worker counts
+backend/benchmarks/bench_parallel_scoring.py
+
+Usage (from backend/):
+    python -m benchmarks.bench_parallel_scoring --rows 200000
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.services.detectors import IsolationForestDetector
+from app.services.scoring_engine import ScoringEngine
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    matrix = np.random.normal(0, 1, (args.rows, args.features))
+    detector = IsolationForestDetector()
+    detector.fit_for_features(args.features)
+
+    worker_counts = sorted({1, *[w for w in (2, 4, 8, 16, 32) if w <= args.max_workers], args.max_workers})
+
+    print(f"{'workers':>8} {'seconds':>10} {'points/sec':>14} {'speed-up':>10}")
+    baseline = None
+    for workers in worker_counts:
+        engine = ScoringEngine(detector=detector, workers=workers, min_parallel_rows=1)
+        engine.score(matrix[: workers * 10])   # warm-up: spawn pool, load model
+
+        start = time.perf_counter()
+        engine.score(matrix)
+        elapsed = time.perf_counter() - start
+        engine.close()
+
+        rate = args.rows / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {elapsed:>10.3f} {rate:>14,.0f} {rate / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark — PDF report rendering: pages/sec and peak memory
+backend/benchmarks/bench_pdf_report.py
+
+For each size, fills a scratch SQLite database with that many incidents
+(``--high-pct`` of them high/critical, so they all land in the appendix),
+then renders the full-period report in a fresh interpreter and reports
+wall time, pages, pages/sec, PDF size and peak RSS of the rendering
+process. With the streamed appendix, peak RSS should stay roughly flat as
+the number of incidents grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_report --sizes 10000,100000 --high-pct 20
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def populate(n_incidents: int, high_pct: float):
+    """Runs in a child whose DATABASE_URL points at the scratch database."""
+    from sqlalchemy import insert
+
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.models.dictionary import SEVERITY_CODES, dictionary
+    from app.models.incident import Incident
+    from app.services.incident_manager import MESSAGE_TEMPLATES, TYPE_NAMES
+    from app.services.synthetic_data import TYPE_GENERATORS
+
+    Base.metadata.create_all(bind=engine)
+    dictionary.seed(TYPE_NAMES, MESSAGE_TEMPLATES)
+    message_ids = [dictionary.message_id(m) for m in MESSAGE_TEMPLATES]
+
+    start = datetime.now() - timedelta(days=30)
+    step = timedelta(days=30) / n_incidents
+    rows = []
+    with engine.begin() as conn:
+        for n in range(n_incidents):
+            source, values = random.choice(TYPE_GENERATORS)(random.random() < high_pct)
+            high = random.random() < high_pct
+            rows.append({
+                "timestamp": start + n * step,
+                "source_id": dictionary.source_id(source),
+                "values": values,
+                "score": random.uniform(-0.3, 0.2),
+                "is_anomaly": int(high),
+                "severity_code": random.choice((SEVERITY_CODES["high"], SEVERITY_CODES["critical"])) if high
+                else random.choice((SEVERITY_CODES["low"], SEVERITY_CODES["medium"])),
+                "message_id": random.choice(message_ids),
+            })
+            if len(rows) == 5000:
+                conn.execute(insert(Incident), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Incident), rows)
+
+
+def render(pdf_path: str) -> dict:
+    from app.db.session import SessionLocal
+    from app.services.pdf_report_generator import PDFReportGenerator
+
+    db = SessionLocal()
+    try:
+        generator = PDFReportGenerator(db)
+        start, end = datetime.now() - timedelta(days=31), datetime.now()
+        started = time.perf_counter()
+        generator.generate_report(start, end, "all", pdf_path=pdf_path)
+        elapsed = time.perf_counter() - started
+        appendix_rows = generator._summary(start, end)["high"]
+    finally:
+        db.close()
+    return {
+        "appendix_rows": appendix_rows,
+        "seconds": elapsed,
+        "pages": generator.page_count,
+        "pdf_bytes": os.path.getsize(pdf_path),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,   # KiB on Linux
+    }
+
+
+def run_child(db_path: str, *args) -> str:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_pdf_report", *args],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"child failed:\n{proc.stderr[-2000:]}")
+    return proc.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated incident counts")
+    parser.add_argument("--high-pct", type=float, default=20.0, help="percent of high/critical incidents")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--populate", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--render", metavar="PDF", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.populate is not None:
+        random.seed(args.seed)
+        populate(args.populate, args.high_pct / 100)
+        return
+    if args.render:
+        print(json.dumps(render(args.render)))
+        return
+
+    print(f"{'incidents':>10} {'appendix':>9} {'pages':>6} {'seconds':>8} {'pages/sec':>10} "
+          f"{'PDF MB':>7} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory(prefix="bench_pdf_") as scratch:
+        for size in (int(s) for s in args.sizes.split(",")):
+            db_path = os.path.join(scratch, f"incidents_{size}.db")
+            run_child(db_path, "--populate", str(size), "--high-pct", str(args.high_pct),
+                      "--seed", str(args.seed))
+            result = json.loads(run_child(db_path, "--render", os.path.join(scratch, f"report_{size}.pdf")))
+            print(f"{size:>10} {result['appendix_rows']:>9} {result['pages']:>6} "
+                  f"{result['seconds']:>8.1f} {result['pages'] / result['seconds']:>10.1f} "
+                  f"{result['pdf_bytes'] / 1e6:>7.1f} {result['max_rss_mb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark — application import time, with a start-up budget
+backend/benchmarks/bench_startup.py
+
+Imports ``app.main`` in fresh interpreters under ``-X importtime`` and
+reports the slowest modules and the total per top-level package. Fails
+(exit 1) when the best wall time exceeds ``--budget-ms`` or when a module
+that must stay lazy (scikit-learn, ReportLab) is imported at start-up.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 2000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+LAZY_PACKAGES = ("sklearn", "reportlab", "scipy")
+
+
+def import_once(env: dict) -> tuple:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        sys.exit(f"import app.main failed:\n{proc.stderr[-2000:]}")
+    return elapsed_ms, proc.stderr
+
+
+def parse_importtime(output: str) -> list:
+    """[(module, self_us, cumulative_us)] from -X importtime output."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")   # importing must not need a database
+
+    timings = []
+    output = ""
+    for _ in range(args.runs):
+        elapsed_ms, output = import_once(env)
+        timings.append(elapsed_ms)
+    rows = parse_importtime(output)
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: -r[2])[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
+
+    by_package = defaultdict(int)
+    for module, self_us, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+    print(f"\n{'self ms':>9}  package")
+    for package, self_us in sorted(by_package.items(), key=lambda p: -p[1])[:10]:
+        print(f"{self_us / 1000:>9.1f}  {package}")
+
+    best = min(timings)
+    print(f"\ninterpreter + import app.main: best {best:.0f} ms, "
+          f"median {sorted(timings)[len(timings) // 2]:.0f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    if best > args.budget_ms:
+        failures.append(f"start-up {best:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    eager = sorted({m.split(".")[0] for m, _, _ in rows if m.split(".")[0] in LAZY_PACKAGES})
+    if eager:
+        failures.append(f"imported at start-up but must stay lazy: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
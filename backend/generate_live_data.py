@@ -1,80 +1,269 @@
-import requests
+"""
+Générateur de charge / données live pour l'API d'ingestion
+backend/generate_live_data.py
+
+Async HTTP client (httpx + asyncio): N workers send realistic per-source
+points (the generators of app/services/synthetic_data.py, as the admin
+generator) at a target rate, either one JSON point per request or binary
+frames of --batch points on /v1/ingest/frame. At the end it prints a
+throughput summary and an HDR-style latency histogram.
+
+With --rate, requests are scheduled open-loop and latency is measured
+from the scheduled send time, so a slow server shows up as latency
+instead of silently lowering the offered load (coordinated omission).
+
+Usage (from backend/, API started locally):
+    python generate_live_data.py                         # 1 point/s until Ctrl+C
+    python generate_live_data.py --rate 200 --concurrency 32 --duration 30
+    python generate_live_data.py --mode frame --batch 500 --rate 20 --duration 30
+"""
+
+import argparse
+import asyncio
+import math
+import os
 import random
+import sys
 import time
+from collections import Counter
 from datetime import datetime, timezone
 
-API_URL = "http://localhost:8000/v1/ingest/"
-
-SOURCES = ["sensor-mail", "sensor-payment", "sensor-api", "sensor-database"]
-
-def generate_incident():
-    is_anomaly = random.random() < 0.3
-    
-    if is_anomaly:
-        temperature = random.uniform(7000, 9000)
-        humidity = random.uniform(0, 30)
-    else:
-        temperature = random.uniform(5800, 6500)
-        humidity = random.uniform(40, 70)
-    
-    return {
-        "source": random.choice(SOURCES),
-        "timestamp": datetime.now(timezone.utc).isoformat(),  # Fix du warning
-        "values": {
-            "temperature": round(temperature, 2),
-            "humidity": round(humidity, 2)
-        }
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.frame_codec import FRAME_CONTENT_TYPE, encode_frame   # noqa: E402
+from app.services.synthetic_data import TYPE_GENERATORS                 # noqa: E402
+
+
+# ------------------------------------------------------------
+# HISTOGRAMME DE LATENCE (HDR-style)
+# ------------------------------------------------------------
+class LatencyHistogram:
+    """Log-linear buckets: 3 significant digits over any range, O(1) record."""
+
+    SUB_BUCKET_BITS = 10   # 1024 linear sub-buckets per power of two → < 0.1% error
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+        self.min_us = math.inf
+        self.max_us = 0
+        self.sum_us = 0
+
+    def record(self, seconds: float):
+        us = max(1, int(seconds * 1e6))
+        shift = max(0, us.bit_length() - self.SUB_BUCKET_BITS)
+        self.counts[(us >> shift) << shift] += 1
+        self.total += 1
+        self.sum_us += us
+        self.min_us = min(self.min_us, us)
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, pct: float) -> int:
+        if not self.total:
+            return 0
+        rank = math.ceil(pct / 100 * self.total)
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return min(value, self.max_us)
+        return self.max_us
+
+    def distribution(self, ticks_per_half: int = 2) -> list:
+        """(percentile, value_us) at HDR-style ticks: 0, 50, 75, 87.5, ... up to 100."""
+        points, pct, step = [], 0.0, 50.0
+        while pct < 99.999 and (100 - pct) / 100 * self.total >= 1:   # stop at the sample's resolution
+            for _ in range(ticks_per_half):
+                points.append((pct, self.percentile(max(pct, 0.0001))))
+                pct += step / ticks_per_half
+            step /= 2
+        points.append((100.0, self.max_us))
+        return points
+
+
+# ------------------------------------------------------------
+# GÉNÉRATION DES REQUÊTES
+# ------------------------------------------------------------
+def json_request(anomaly_rate: float) -> tuple:
+    source, values = random.choice(TYPE_GENERATORS)(random.random() < anomaly_rate)
+    body = {
+        "source": source,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "values": values,
     }
+    return "/v1/ingest/", {"json": body}, 1
+
+
+def frame_request(anomaly_rate: float, batch: int) -> tuple:
+    # One frame = one source: all points from the same generator
+    gen = random.choice(TYPE_GENERATORS)
+    points = [gen(random.random() < anomaly_rate) for _ in range(batch)]
+    source, first = points[0]
+    names = list(first)
+    now = time.time()
+    timestamps = now - np.arange(batch)[::-1] * 1e-3
+    matrix = [[values[name] for name in names] for _, values in points]
+    payload = encode_frame(source, names, timestamps, matrix)
+    return "/v1/ingest/frame", {"content": payload, "headers": {"Content-Type": FRAME_CONTENT_TYPE}}, batch
+
+
+class LoadRun:
+    def __init__(self, args):
+        self.args = args
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.points = 0
+        self.sent = 0
+        self.severities = Counter()
+
+    async def worker(self, client: httpx.AsyncClient, queue: asyncio.Queue):
+        args = self.args
+        while True:
+            scheduled = await queue.get()
+            if scheduled is None:
+                return
+            if args.mode == "frame":
+                path, kwargs, n_points = frame_request(args.anomaly_rate / 100, args.batch)
+            else:
+                path, kwargs, n_points = json_request(args.anomaly_rate / 100)
+
+            started = scheduled if scheduled else time.perf_counter()
+            try:
+                response = await client.post(path, **kwargs)
+            except httpx.TimeoutException:
+                self.errors["timeout"] += 1
+                continue
+            except httpx.TransportError as e:
+                self.errors[type(e).__name__] += 1
+                continue
+            finally:
+                self.sent += 1
+            self.histogram.record(time.perf_counter() - started)
+            self.statuses[response.status_code] += 1
+            if response.status_code in (200, 202):
+                self.points += n_points
+                if args.verbose and args.mode == "json":
+                    incident = response.json().get("incident") or {}
+                    self.severities[incident.get("severity", "?")] += 1
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] {incident.get('severity', '?'):8} | "
+                          f"{incident.get('source', ''):16} | score {incident.get('score', 0):6.2f}")
+
+    async def schedule(self, queue: asyncio.Queue, deadline: float):
+        """Open-loop: one entry per request at the target rate (0 = as fast as workers go)."""
+        rate = self.args.rate
+        start = time.perf_counter()
+        n = 0
+        while deadline == 0 or time.perf_counter() < deadline:
+            if rate > 0:
+                due = start + n / rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await queue.put(due)
+            else:
+                await queue.put(0)
+            n += 1
+        for _ in range(self.args.concurrency):
+            await queue.put(None)
+
+    async def progress(self, started: float):
+        while True:
+            await asyncio.sleep(self.args.progress_s)
+            elapsed = time.perf_counter() - started
+            print(f"{elapsed:6.0f}s  sent {self.sent:>8}  ok {self.statuses[200] + self.statuses[202]:>8}  "
+                  f"{self.sent / elapsed:8.1f} req/s  {self.points / elapsed:9.1f} points/s  "
+                  f"p99 {self.histogram.percentile(99) / 1000:8.1f} ms")
+
+    async def run(self) -> float:
+        args = self.args
+        queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 4)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        started = time.perf_counter()
+        deadline = started + args.duration if args.duration > 0 else 0
+
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+            workers = [asyncio.create_task(self.worker(client, queue)) for _ in range(args.concurrency)]
+            reporter = asyncio.create_task(self.progress(started)) if args.progress_s > 0 else None
+            try:
+                await self.schedule(queue, deadline)
+                await asyncio.gather(*workers)
+            finally:
+                if reporter:
+                    reporter.cancel()
+                for task in workers:
+                    task.cancel()
+        return time.perf_counter() - started
+
+    def summary(self, elapsed: float):
+        h = self.histogram
+        ok = self.statuses[200] + self.statuses[202]
+        print("\n" + "=" * 70)
+        print(f"mode {self.args.mode}"
+              + (f" (batch {self.args.batch})" if self.args.mode == "frame" else "")
+              + f", concurrency {self.args.concurrency}, target "
+              + (f"{self.args.rate:g} req/s" if self.args.rate > 0 else "unbounded"))
+        print(f"duration      {elapsed:10.1f} s")
+        print(f"requests      {self.sent:10}   ({self.sent / elapsed:.1f} req/s)")
+        print(f"accepted      {ok:10}   (200: {self.statuses[200]}, 202 journaled: {self.statuses[202]})")
+        print(f"points        {self.points:10}   ({self.points / elapsed:.1f} points/s)")
+        other = {s: c for s, c in self.statuses.items() if s not in (200, 202)}
+        if other:
+            print(f"other status  {dict(sorted(other.items()))}   (429 = shed by admission control)")
+        if self.errors:
+            print(f"errors        {dict(self.errors)}")
+        if self.severities:
+            print(f"severities    {dict(self.severities)}")
+        if not h.total:
+            return
+
+        print(f"\nlatency (ms)  min {h.min_us / 1000:.2f}  mean {h.sum_us / h.total / 1000:.2f}  "
+              f"p50 {h.percentile(50) / 1000:.2f}  p90 {h.percentile(90) / 1000:.2f}  "
+              f"p99 {h.percentile(99) / 1000:.2f}  p99.9 {h.percentile(99.9) / 1000:.2f}  "
+              f"max {h.max_us / 1000:.2f}")
+        print(f"\n{'Value (ms)':>12} {'Percentile':>12} {'TotalCount':>11} {'1/(1-Percentile)':>17}")
+        for pct, value in h.distribution():
+            count = min(h.total, math.ceil(pct / 100 * h.total))
+            inverse = f"{1 / (1 - pct / 100):.2f}" if pct < 100 else "inf"
+            print(f"{value / 1000:>12.3f} {pct / 100:>12.6f} {count:>11} {inverse:>17}")
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Load generator for the ingest API")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--mode", choices=("json", "frame"), default="json",
+                        help="json: one point per POST /v1/ingest/; frame: --batch points per POST /v1/ingest/frame")
+    parser.add_argument("--batch", type=int, default=100, help="points per frame (frame mode)")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent requests in flight")
+    parser.add_argument("--rate", type=float, default=1.0, help="target requests/sec (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=0, help="seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--anomaly-rate", type=float, default=30.0, help="percent of anomalous points")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--progress-s", type=float, default=5.0, help="progress line interval (0 = off)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="print every incident (json mode)")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
     print("🚀 GÉNÉRATEUR D'INCIDENTS LIVE")
     print("=" * 70)
-    print(f"📡 Endpoint: {API_URL}")
+    print(f"📡 Endpoint: {args.url}  ({args.mode})")
     print("🔴 Ctrl+C pour arrêter\n")
-    
-    count = 0
-    errors = 0
-    
+
+    run = LoadRun(args)
+    started = time.perf_counter()
     try:
-        while True:
-            incident = generate_incident()
-            
-            try:
-                # Timeout plus long
-                response = requests.post(API_URL, json=incident, timeout=60)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    inc = data.get("incident", {})
-                    severity = inc.get("severity", "?")
-                    score = inc.get("score", 0)
-                    
-                    icons = {"high": "🔴", "medium": "🟡", "low": "🟢"}
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] {icons.get(severity, '⚪')} "
-                          f"{severity:6} | {incident['source']:15} | Score: {score:6.2f}")
-                    count += 1
-                    errors = 0  # Reset compteur erreurs
-                else:
-                    print(f"❌ HTTP {response.status_code}: {response.text[:100]}")
-                    errors += 1
-                    
-            except requests.exceptions.Timeout:
-                print(f"⏱️  Timeout - Le backend est lent. Incident ignoré.")
-                errors += 1
-            except requests.exceptions.ConnectionError:
-                print(f"❌ Connexion impossible. Le backend tourne-t-il ?")
-                errors += 1
-                if errors > 3:
-                    print("\n⚠️  Trop d'erreurs. Arrêt.")
-                    break
-            except Exception as e:
-                print(f"❌ Erreur: {e}")
-                errors += 1
-            
-            time.sleep(3)  # Pause entre chaque incident
-            
+        elapsed = asyncio.run(run.run())
     except KeyboardInterrupt:
-        print(f"\n🛑 Arrêté. {count} incidents générés avec succès.")
+        elapsed = time.perf_counter() - started
+        print("\n🛑 Arrêté.")
+    run.summary(max(elapsed, 1e-9))
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
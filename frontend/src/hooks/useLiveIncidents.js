@@ -10,6 +10,7 @@ export function useLiveIncidents(options = {}) {
   const {
     refreshInterval = 5000,
     autoRefresh = true,
+    grouped = false, // true: one row per correlated problem (parent incidents only)
   } = resolvedOptions;
 
   const { isLive, toggleLive } = useLive();
@@ -24,7 +25,7 @@ export function useLiveIncidents(options = {}) {
 
   const fetchIncidents = useCallback(async () => {
     try {
-      const response = await fetch(buildApiUrl("/incidents/"));
+      const response = await fetch(buildApiUrl(grouped ? "/incidents/?grouped=true" : "/incidents/"));
       if (!response.ok) throw new Error("Erreur reseau");
 
       const data = await response.json();
@@ -46,7 +47,7 @@ export function useLiveIncidents(options = {}) {
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [grouped]);
 
   useEffect(() => {
     fetchIncidents();
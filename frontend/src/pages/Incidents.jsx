@@ -32,7 +32,7 @@ export default function Incidents() {
     lastUpdate,
     newIncidentsCount,
     refresh,
-  } = useLiveIncidents({ refreshInterval: 10000, autoRefresh: true });
+  } = useLiveIncidents({ refreshInterval: 10000, autoRefresh: true, grouped: true });
 
   const [filteredIncidents, setFilteredIncidents] = useState([]);
   const [selectedIncident, setSelectedIncident] = useState(null);
@@ -295,6 +295,11 @@ export default function Incidents() {
                           Anomaly
                         </span>
                       )}
+                      {incident.occurrences > 1 && (
+                        <span className="px-2.5 py-0.5 bg-amber-500/10 border border-amber-500/30 rounded-full text-xs font-semibold text-amber-400">
+                          ×{incident.occurrences}
+                        </span>
+                      )}
                     </div>
                     <p className="text-slate-200 font-medium text-sm leading-snug mb-2 truncate">{incident.message}</p>
                     <div className="flex items-center gap-4 text-xs text-slate-500">
@@ -384,6 +389,12 @@ export default function Incidents() {
                 { label: "Timestamp", value: formatDateTime(selectedIncident.timestamp) },
                 { label: "ML Score",  value: formatScore(selectedIncident.score), mono: true, highlight: true },
                 { label: "Status",    value: selectedIncident.is_anomaly ? "Anomaly" : "Normal" },
+                ...(selectedIncident.occurrences > 1
+                  ? [
+                      { label: "Occurrences", value: selectedIncident.occurrences, mono: true },
+                      { label: "Last seen",   value: formatDateTime(selectedIncident.last_seen) },
+                    ]
+                  : []),
               ].map(({ label, value, mono, highlight }) => (
                 <div key={label} className="rounded-xl border border-slate-700/60 p-4 bg-slate-900/40">
                   <div className="text-xs uppercase tracking-wider text-slate-500 mb-1">{label}</div>